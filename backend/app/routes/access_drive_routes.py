@@ -6,7 +6,7 @@ logging out, and cleaning up services after requests.
 """
 
 from flask import Blueprint, session, jsonify, request, g
-from app.utils.drive_utils import get_drive_core
+from app.utils.drive_utils import get_drive_core, drive_core_cache
 from app.services.google_drive.drive_service import DriveService
 
 drive_bp = Blueprint('drive', __name__)
@@ -126,10 +126,12 @@ def logout():
     """
     Log out the current user.
 
-    This function clears the session, effectively logging out the user.
+    This function drops the user's cached Drive client and clears the session,
+    effectively logging out the user.
 
     Returns:
     - A JSON object with a success message.
     """
+    drive_core_cache.invalidate(session.get('user_id'))
     session.clear()
     return jsonify({"message": "Logged out successfully"})
\ No newline at end of file
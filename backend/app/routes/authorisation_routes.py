@@ -12,20 +12,17 @@ from datetime import datetime, timezone
 from oauthlib.oauth2.rfc6749.errors import OAuth2Error
 from app.services.google_drive.auth_service import AuthService
 from app.services.google_drive.core import DriveCore
-from app.services.natural_language.file_extractor import FileExtractor
+from app.services.natural_language.file_extractor import FileExtractor, parser_pool
 from app.services.natural_language.chat_service import ChatService
-from app.utils.drive_utils import get_drive_core
+from app.utils.drive_utils import (get_drive_core, get_user_credentials, set_user_credentials,
+                                   delete_user_credentials, credential_cache, drive_core_cache, token_manager)
 from googleapiclient.errors import Error as GoogleApiError
 from google.auth.exceptions import RefreshError
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
 from config import Config
 import requests
-import redis
 import json
 
-redis_client = redis.StrictRedis.from_url(Config.REDIS_TOKEN_URL, decode_responses=True)
-
 auth_bp = Blueprint('auth', __name__)
 auth_service = AuthService(Config)
 
@@ -105,7 +102,10 @@ def oauth2callback():
         if not user_id:
             return jsonify({"error": "Failed to retrieve user ID"}), 500
 
-        redis_client.set(f'user:{user_id}:token', json.dumps(credentials_dict))
+        credentials_json = json.dumps(credentials_dict)
+        set_user_credentials(user_id, credentials_json)
+        drive_core_cache.put(user_id, credentials_json, drive_core)
+        token_manager.track(user_id, credentials.expiry)
 
         session['user_email'] = user_email
         session['user_id'] = user_id
@@ -114,7 +114,7 @@ def oauth2callback():
         chat_service = current_app.extensions.get('chat_service')
         if chat_service:
             chat_service.drive_core = drive_core
-            chat_service.file_extractor = FileExtractor(drive_core=drive_core)
+            chat_service.file_extractor = FileExtractor(drive_core=drive_core, sandbox=parser_pool)
         else:
             current_app.extensions['chat_service'] = ChatService(drive_core)
 
@@ -144,8 +144,7 @@ def check_auth():
     user_id = session.get('user_id')
     if user_id:
         try:
-            credentials_dict = json.loads(redis_client.get(f'user:{user_id}:token'))
-            drive_core = DriveCore(credentials_dict)
+            drive_core = get_drive_core(session)
             if drive_core:
                 session['last_active'] = datetime.now(timezone.utc).isoformat()
                 return jsonify({"authenticated": True})
@@ -160,8 +159,10 @@ def refresh_token():
     """
     Refresh the user's OAuth2 token.
 
-    This function attempts to refresh the user's OAuth2 token if it has expired.
-    If successful, it updates the Redis store with the new credentials.
+    This function refreshes the user's OAuth2 token through the token manager, which
+    stores the new token in Redis. Tokens are normally refreshed in the background
+    before they expire; if a refresh is already running for the user, its outcome is
+    reported instead of refreshing twice.
 
     Returns:
         flask.Response: A JSON response indicating the result of the refresh attempt.
@@ -169,12 +170,9 @@ def refresh_token():
     user_id = session.get('user_id')
     if user_id:
         try:
-            credentials_dict = json.loads(redis_client.get(f'user:{user_id}:token'))
-            credentials = Credentials(**credentials_dict)
-            if credentials.expired and credentials.refresh_token:
-                credentials.refresh(Request())
-                updated_credentials_dict = auth_service.credentials_to_dict(credentials)
-                redis_client.set(f'user:{user_id}:token', json.dumps(updated_credentials_dict))
+            if token_manager.refresh(user_id, force=True, wait=True):
+                credential_cache.invalidate(user_id)
+                drive_core_cache.invalidate(user_id)
                 return jsonify({"message": "Token refreshed successfully"})
         except Exception:
             pass
@@ -194,15 +192,20 @@ def logout():
     user_id = session.get('user_id')
     if user_id:
         try:
-            credentials_dict = json.loads(redis_client.get(f'user:{user_id}:token'))
+            credentials_dict = json.loads(get_user_credentials(user_id))
             credentials = Credentials(**credentials_dict)
             if credentials.valid:
                 requests.post('https://oauth2.googleapis.com/revoke',
                               params={'token': credentials.token},
                               headers={'content-type': 'application/x-www-form-urlencoded'})
-            redis_client.delete(f'user:{user_id}:token')
         except Exception:
             pass
+        try:
+            delete_user_credentials(user_id)
+        except Exception:
+            pass
+        token_manager.untrack(user_id)
+        drive_core_cache.invalidate(user_id)
     session.clear()
     return jsonify({"message": "Logged out successfully"})
 
@@ -8,6 +8,7 @@ query processing and document management in the vector store.
 from flask import Blueprint, request, jsonify, session, current_app, make_response
 from app.services.natural_language.chat_service import ChatService
 from app.utils.drive_utils import get_drive_core
+from config import Config
 
 chat_bp = Blueprint('chat', __name__)
 
@@ -109,6 +110,31 @@ def manage_document():
     except Exception as e:
         return jsonify({"error": "An error occurred while managing the document"}), 500
 
+@chat_bp.route('/upload-and-index', methods=['POST'])
+def upload_and_index_document():
+    """
+    Upload a file to Google Drive and add it to the chat in one step.
+
+    Expects a multipart/form-data request with 'file' and optional 'folderId'. The file's
+    text is extracted from the uploaded bytes, so it is not downloaded back from Drive.
+
+    Returns:
+        flask.Response: JSON response with the uploaded file's details and whether it was indexed.
+    """
+    chat_service = current_app.extensions['chat_service']
+    try:
+        file = request.files.get('file')
+        if file is None or not file.filename:
+            return jsonify({"error": "No file provided"}), 400
+
+        folder_id = request.form.get('folderId', 'root')
+        result = chat_service.upload_and_index_file(file.read(), file.filename, file.mimetype, folder_id)
+        return jsonify(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 401
+    except Exception as e:
+        return jsonify({"error": "An error occurred while uploading the document"}), 500
+
 @chat_bp.route('/update-document-selection', methods=['POST'])
 def update_document_selection():
     """
@@ -135,6 +161,30 @@ def update_document_selection():
     except Exception as e:
         return jsonify({"error": "An error occurred while updating document selection"}), 500
 
+@chat_bp.route('/metrics', methods=['GET'])
+def get_usage_metrics():
+    """
+    Report token, call and latency usage of the language model and embeddings.
+
+    Users see their own usage. Users listed in ``METRICS_ADMIN_USER_IDS`` also see usage of
+    every endpoint and the service metrics.
+
+    Query Parameters:
+        hours (int, optional): The number of most recent hours to aggregate. Defaults to 24.
+
+    Returns:
+        flask.Response: JSON response with the usage metrics or an error message.
+    """
+    chat_service = current_app.extensions['chat_service']
+    try:
+        hours = max(1, min(request.args.get('hours', default=24, type=int), Config.USAGE_RETENTION_HOURS))
+        is_admin = session.get('user_id') in Config.METRICS_ADMIN_USER_IDS
+        return jsonify(chat_service.get_usage_metrics(hours, include_global=is_admin))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 401
+    except Exception as e:
+        return jsonify({"error": "An error occurred while reading usage metrics"}), 500
+
 @chat_bp.route('', defaults={'path': ''})
 @chat_bp.route('/<path:path>', methods=['OPTIONS'])
 def handle_options(path):
@@ -1,14 +1,21 @@
 """Module for managing Pinecone database operations."""
 
 import math
-from typing import Dict, Any, List
+import time
+import uuid
+from typing import Dict, Any, List, Iterable
 from pinecone import Pinecone as PineconeClient
 from langchain_openai import OpenAIEmbeddings
 
+from app.utils.token_utils import count_tokens
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
 class PineconeManager:
     """Manages operations related to Pinecone vector database."""
 
-    def __init__(self, api_key: str, environment: str, index_name: str, openai_api_key: str = None):
+    def __init__(self, api_key: str, environment: str, index_name: str, openai_api_key: str = None,
+                 usage_tracker=None):
         """
         Initialize the PineconeManager.
 
@@ -17,10 +24,30 @@ class PineconeManager:
             environment (str): The Pinecone environment.
             index_name (str): The name of the Pinecone index.
             openai_api_key (str, optional): The OpenAI API key for embeddings.
+            usage_tracker (UsageTracker, optional): Records the tokens and latency of embedding calls.
         """
         self.pc = PineconeClient(api_key=api_key, environment=environment)
         self.index = self.pc.Index(index_name)
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-ada-002", openai_api_key=openai_api_key)
+        self.embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL, openai_api_key=openai_api_key)
+        self.usage_tracker = usage_tracker
+
+    def embed(self, text: str) -> List[float]:
+        """
+        Embed a piece of text, recording the call's usage.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The embedding vector.
+        """
+        start = time.monotonic()
+        embedding = self.embeddings.embed_query(text)
+        if self.usage_tracker is not None:
+            self.usage_tracker.record('embedding', model=EMBEDDING_MODEL,
+                                      prompt_tokens=count_tokens(text, model=EMBEDDING_MODEL),
+                                      latency=time.monotonic() - start)
+        return embedding
 
     def split_content(self, content: str, chunk_size: int = 38000) -> List[str]:
         """
@@ -56,7 +83,7 @@ class PineconeManager:
 
             for i, chunk in enumerate(content_chunks):
                 chunk_id = f"{base_id}_chunk_{i}" if i > 0 else base_id
-                embedding = self.embeddings.embed_query(chunk)
+                embedding = self.embed(chunk)
                 metadata = {
                     "googleDriveFileId": base_id,
                     "lastModified": document['lastModified'],
@@ -65,6 +92,8 @@ class PineconeManager:
                     "chunkIndex": i,
                     "totalChunks": len(content_chunks)
                 }
+                if document.get('mimeType'):
+                    metadata["mimeType"] = document['mimeType']
                 self.index.upsert(vectors=[(chunk_id, embedding, metadata)], namespace=user_id)
                 vectors_upserted += 1
 
@@ -72,6 +101,109 @@ class PineconeManager:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def upsert_document_stream(self, document: Dict[str, Any], parts: Iterable[str], user_id: str,
+                               chunk_size: int = 38000) -> Dict[str, Any]:
+        """
+        Upsert a document whose text arrives incrementally, embedding each chunk as soon as it fills.
+
+        Chunks after the first are written unselected, under IDs unique to this write, while
+        the text is still arriving, so queries never see a partially stored document and any
+        stored version stays intact. The first chunk is stored under the document ID only once
+        every part has been consumed: any previous version is then deleted, the new chunks
+        are marked with the final chunk count and the document's selection status, and tagged
+        as truncated if ``document['truncated']`` has been set by then. If extraction fails
+        midway, the chunks already written are removed and the previous version is kept.
+
+        Args:
+            document (Dict[str, Any]): The document to upsert, including 'id', 'lastModified' and 'isSelected'.
+            parts (Iterable[str]): The document's text in order, such as one string per page.
+            user_id (str): The ID of the user who owns the document.
+            chunk_size (int): Maximum size of each chunk in bytes.
+
+        Returns:
+            Dict[str, Any]: A dictionary indicating success, the number of vectors upserted and the full 'content'.
+        """
+        base_id = document['id']
+        revision = uuid.uuid4().hex[:8]
+        chunks = []
+        contents = []
+
+        def write_chunk(chunk: str) -> None:
+            chunk_index = len(chunks)
+            chunk_id = f"{base_id}_{revision}_chunk_{chunk_index}" if chunk_index else base_id
+            metadata = {
+                "googleDriveFileId": base_id,
+                "lastModified": document['lastModified'],
+                "isSelected": False,
+                "content": chunk,
+                "chunkIndex": chunk_index,
+                "totalChunks": 0
+            }
+            if document.get('mimeType'):
+                metadata["mimeType"] = document['mimeType']
+            vector = (chunk_id, self.embed(chunk), metadata)
+            if chunk_index:
+                self.index.upsert(vectors=[vector], namespace=user_id)
+            chunks.append(vector)
+
+        def staged_ids() -> List[str]:
+            # The first chunk is held back until the document is committed
+            return [chunk_id for chunk_id, _, _ in chunks[1:]]
+
+        try:
+            pending = b''
+            for position, part in enumerate(parts):
+                contents.append(part)
+                pending += (b"\n\n" if position else b'') + part.encode('utf-8')
+                while len(pending) >= chunk_size:
+                    # Cut on a character boundary; a split multi-byte character stays pending
+                    chunk = pending[:chunk_size].decode('utf-8', errors='ignore')
+                    pending = pending[len(chunk.encode('utf-8')):]
+                    write_chunk(chunk)
+            if pending:
+                write_chunk(pending.decode('utf-8', errors='ignore'))
+
+            if not chunks or not "".join(contents).strip():
+                self._delete_vectors(staged_ids(), user_id)
+                return {"success": False, "vectors_upserted": 0, "content": ""}
+
+            new_ids = set(staged_ids())
+            previous_ids = [vector_id for vector_id in self._document_vector_ids(base_id, user_id)
+                            if vector_id not in new_ids]
+            if previous_ids:
+                self.index.delete(ids=previous_ids, namespace=user_id)
+
+            final_metadata = {"totalChunks": len(chunks), "isSelected": document['isSelected']}
+            if document.get('truncated'):
+                final_metadata["truncated"] = True
+            for chunk_id in staged_ids():
+                self.index.update(id=chunk_id, set_metadata=final_metadata, namespace=user_id)
+            # Readers skip documents missing chunks, so the document appears once its first chunk is stored
+            head_id, head_values, head_metadata = chunks[0]
+            self.index.upsert(vectors=[(head_id, head_values, {**head_metadata, **final_metadata})], namespace=user_id)
+            return {"success": True, "vectors_upserted": len(chunks), "content": "\n\n".join(contents)}
+        except Exception as e:
+            self._delete_vectors(staged_ids(), user_id)
+            return {"success": False, "error": str(e)}
+
+    def _document_vector_ids(self, file_id: str, user_id: str) -> List[str]:
+        results = self.index.query(
+            vector=[0] * 1536,  # Dummy vector, not used for filtering
+            top_k=10000,
+            include_metadata=True,
+            filter={"googleDriveFileId": file_id},
+            namespace=user_id
+        )
+        return [match['id'] for match in results['matches']]
+
+    def _delete_vectors(self, vector_ids: List[str], user_id: str) -> None:
+        if not vector_ids:
+            return
+        try:
+            self.index.delete(ids=vector_ids, namespace=user_id)
+        except Exception:
+            pass
+
     def update_document_selection(self, file_id: str, is_selected: bool, user_id: str) -> bool:
         """
         Update the selection status of a document and all its chunks.
@@ -100,6 +232,25 @@ class PineconeManager:
         except Exception:
             return False
 
+    def update_document_summary(self, file_id: str, user_id: str, summary: str, keywords: List[str]) -> bool:
+        """
+        Store a document's summary and keywords alongside its first chunk.
+
+        Args:
+            file_id (str): The Google Drive file ID of the document.
+            user_id (str): The ID of the user who owns the document.
+            summary (str): The document summary.
+            keywords (List[str]): The document keywords.
+
+        Returns:
+            bool: True if the update was successful, False otherwise.
+        """
+        try:
+            self.index.update(id=file_id, set_metadata={"summary": summary, "keywords": keywords}, namespace=user_id)
+            return True
+        except Exception:
+            return False
+
     def delete_document(self, file_id: str, user_id: str) -> bool:
         """
         Delete a document and all its chunks from the Pinecone index.
@@ -112,38 +263,34 @@ class PineconeManager:
             bool: True if the deletion was successful, False otherwise.
         """
         try:
-            results = self.index.query(
-                vector=[0] * 1536,  # Dummy vector, not used for filtering
-                top_k=10000,
-                include_metadata=True,
-                filter={"googleDriveFileId": file_id},
-                namespace=user_id
-            )
-            
-            chunk_ids = [match['id'] for match in results['matches']]
+            chunk_ids = self._document_vector_ids(file_id, user_id)
             self.index.delete(ids=chunk_ids, namespace=user_id)
             
             return True
         except Exception:
             return False
         
-    def get_selected_documents(self, user_id: str) -> List[Dict[str, Any]]:
+    def get_selected_documents(self, user_id: str, include_values: bool = False) -> List[Dict[str, Any]]:
         """
         Retrieve all selected documents for a given user, reconstructing split documents.
 
         Args:
             user_id (str): The ID of the user.
+            include_values (bool): Whether to also return each document's chunks with their
+                embeddings under a 'chunks' key.
 
         Returns:
             List[Dict[str, Any]]: A list of selected documents and their metadata.
         """
         try:
+            query_args = {"include_values": True} if include_values else {}
             results = self.index.query(
                 vector=[0] * 1536,
                 top_k=10000,
                 include_metadata=True,
                 filter={"isSelected": True},
-                namespace=user_id
+                namespace=user_id,
+                **query_args
             )
             
             documents = {}
@@ -153,16 +300,31 @@ class PineconeManager:
                 if base_id not in documents:
                     documents[base_id] = {
                         'id': base_id,
-                        'content': [''] * total_chunks,
+                        'content': [None] * total_chunks,
                         'lastModified': match['metadata']['lastModified'],
-                        'isSelected': match['metadata']['isSelected']
+                        'isSelected': match['metadata']['isSelected'],
+                        'mimeType': match['metadata'].get('mimeType')
                     }
                 chunk_index = int(match['metadata'].get('chunkIndex', 0))
                 documents[base_id]['content'][chunk_index] = match['metadata']['content']
+                if 'summary' in match['metadata']:
+                    documents[base_id]['summary'] = match['metadata']['summary']
+                    documents[base_id]['keywords'] = match['metadata'].get('keywords', [])
+                if include_values:
+                    documents[base_id].setdefault('chunks', []).append({
+                        'index': chunk_index,
+                        'content': match['metadata']['content'],
+                        'values': match.get('values')
+                    })
             
             reconstructed_docs = []
             for doc in documents.values():
+                if any(part is None for part in doc['content']):
+                    # A document being replaced has not stored all its chunks yet
+                    continue
                 doc['content'] = ''.join(doc['content'])
+                if include_values:
+                    doc['chunks'].sort(key=lambda chunk: chunk['index'])
                 reconstructed_docs.append({'metadata': doc})
             
             return reconstructed_docs
@@ -218,4 +380,29 @@ class PineconeManager:
                 return results['vectors'][file_id]['metadata']
             return {}
         except Exception:
-            return {}
\ No newline at end of file
+            return {}
+
+    def get_multiple_document_metadata(self, file_ids: List[str], user_id: str, batch_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve metadata for several documents with multi-ID fetches.
+
+        Args:
+            file_ids (List[str]): The Google Drive file IDs of the documents.
+            user_id (str): The ID of the user who owns the documents.
+            batch_size (int): Maximum number of IDs per fetch request.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: A mapping of each file ID to its metadata, an empty dict if not found,
+                or None if the lookup failed.
+        """
+        metadata = {file_id: {} for file_id in file_ids}
+        unique_ids = list(metadata.keys())
+        try:
+            for start in range(0, len(unique_ids), batch_size):
+                results = self.index.fetch(ids=unique_ids[start:start + batch_size], namespace=user_id)
+                if results:
+                    for file_id, vector in results['vectors'].items():
+                        metadata[file_id] = vector['metadata']
+            return metadata
+        except Exception:
+            return {file_id: None for file_id in unique_ids}
@@ -55,7 +55,7 @@ class AuthService:
         Returns:
             dict: User information from Google's OAuth2 service.
         """
-        service = build('oauth2', 'v2', credentials=drive_core.credentials)
+        service = build('oauth2', 'v2', http=drive_core.http)
         return service.userinfo().get().execute()
 
     @staticmethod
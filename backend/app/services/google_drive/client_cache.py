@@ -0,0 +1,129 @@
+"""
+This module provides the DriveCoreCache class, a per-worker cache of authorised DriveCore clients.
+
+Building a DriveCore on every request means parsing the stored credentials and building
+Google API services each time. The cache keeps one DriveCore per user, keyed by a
+fingerprint of the user's stored token, so a request only reads the token from Redis.
+A new token, from a refresh or a new login, changes the fingerprint and replaces the
+cached client; logging out removes it.
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from app.services.google_drive.core import DriveCore
+
+
+class DriveCoreCache:
+    """
+    A thread-safe least-recently-used cache of DriveCore instances, one per user.
+    """
+
+    def __init__(self, max_size: int = 256, on_create: Optional[Callable[[str, DriveCore], None]] = None):
+        """
+        Initialize the DriveCoreCache.
+
+        Args:
+            max_size (int): Maximum number of users whose clients are kept.
+            on_create (Callable[[str, DriveCore], None], optional): Called with the user ID and
+                DriveCore whenever a client is created for a new user or token.
+        """
+        self.max_size = max_size
+        self.on_create = on_create
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def fingerprint(credentials_json: str) -> str:
+        """
+        Fingerprint a user's stored credentials.
+
+        Args:
+            credentials_json (str): The credentials JSON as stored in Redis.
+
+        Returns:
+            str: A digest that changes whenever the stored token changes.
+        """
+        return hashlib.sha256(credentials_json.encode('utf-8')).hexdigest()
+
+    def get(self, user_id: str, credentials_json: str) -> DriveCore:
+        """
+        Get the cached DriveCore for a user's current credentials, creating it on a miss.
+
+        Args:
+            user_id (str): The user's ID.
+            credentials_json (str): The user's credentials JSON as stored in Redis.
+
+        Returns:
+            DriveCore: The user's DriveCore.
+
+        Raises:
+            json.JSONDecodeError: If the credentials are not valid JSON.
+            TypeError: If the credentials are of an unexpected type.
+            Exception: If the DriveCore cannot be created.
+        """
+        fingerprint = self.fingerprint(credentials_json)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(user_id)
+                self._metrics["hits"] += 1
+                return entry[1]
+            self._metrics["misses"] += 1
+
+        drive_core = DriveCore(json.loads(credentials_json))
+        self._store(user_id, fingerprint, drive_core)
+        if self.on_create is not None:
+            self.on_create(user_id, drive_core)
+        return drive_core
+
+    def put(self, user_id: str, credentials_json: str, drive_core: DriveCore) -> None:
+        """
+        Cache a DriveCore already created for a user's credentials, e.g. right after login.
+
+        Args:
+            user_id (str): The user's ID.
+            credentials_json (str): The credentials JSON as stored in Redis.
+            drive_core (DriveCore): The DriveCore created from those credentials.
+        """
+        self._store(user_id, self.fingerprint(credentials_json), drive_core)
+
+    def _store(self, user_id: str, fingerprint: str, drive_core: DriveCore) -> None:
+        with self._lock:
+            self._entries[user_id] = (fingerprint, drive_core)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._metrics["evictions"] += 1
+
+    def invalidate(self, user_id: Optional[str]) -> None:
+        """
+        Drop a user's cached DriveCore, e.g. when their token is refreshed or revoked.
+
+        Args:
+            user_id (str): The user's ID. None is ignored.
+        """
+        if user_id is None:
+            return
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._metrics["invalidations"] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Report cache effectiveness in this worker.
+
+        Returns:
+            Dict[str, Any]: Hit, miss, eviction and invalidation counts, the hit ratio and the
+                number of cached users.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["size"] = len(self._entries)
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_ratio"] = metrics["hits"] / lookups if lookups else 0.0
+        return metrics
@@ -2,19 +2,22 @@
 This module provides the DriveCore class for Google Drive operations.
 
 It includes functionality to initialize Google Drive and People API services
-and perform operations such as listing folder contents.
+and perform operations such as listing folder contents. Services are built on
+first use, so a DriveCore is cheap to create and to keep cached between requests.
+All of a DriveCore's services share one transport on the worker's pooled connections.
 """
 
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from app.services.google_drive.http_transport import PooledAuthorizedHttp
 
 class DriveCore:
     """
     A core class for Google Drive operations.
 
-    This class initializes Google Drive and People API services and provides
-    methods for interacting with Google Drive.
+    This class holds the user's credentials, builds the Google Drive, People and
+    Sheets API services on first use, and provides methods for interacting with Google Drive.
     """
 
     def __init__(self, credentials):
@@ -36,11 +39,61 @@ class DriveCore:
             else:
                 raise TypeError("credentials must be either a dict or a Credentials object")
             
-            self.drive_service = build('drive', 'v3', credentials=self.credentials)
-            self.people_service = build('people', 'v1', credentials=self.credentials)
+            self._http = None
+            self._drive_service = None
+            self._people_service = None
+            self._sheets_service = None
         except Exception as e:
             raise Exception(f"Error during DriveCore initialization: {str(e)}")
 
+    @property
+    def http(self):
+        """
+        The user's authorised transport on the shared connection pool, created on first use.
+        """
+        if self._http is None:
+            self._http = PooledAuthorizedHttp(self.credentials)
+        return self._http
+
+    @property
+    def drive_service(self):
+        """
+        The Google Drive API service, built on first use.
+        """
+        if self._drive_service is None:
+            self._drive_service = build('drive', 'v3', http=self.http)
+        return self._drive_service
+
+    @drive_service.setter
+    def drive_service(self, service):
+        self._drive_service = service
+
+    @property
+    def people_service(self):
+        """
+        The Google People API service, built on first use.
+
+        Only fetching the user's profile needs it, so most requests never build it.
+        """
+        if self._people_service is None:
+            self._people_service = build('people', 'v1', http=self.http)
+        return self._people_service
+
+    @people_service.setter
+    def people_service(self, service):
+        self._people_service = service
+
+    @property
+    def sheets_service(self):
+        """
+        The Google Sheets API service, built on first use.
+
+        Only text extraction from Google Sheets needs it, to list a spreadsheet's tabs.
+        """
+        if self._sheets_service is None:
+            self._sheets_service = build('sheets', 'v4', http=self.http)
+        return self._sheets_service
+
     def list_folder_contents(self, folder_id, page_token=None):
         """
         List the contents of a Google Drive folder.
@@ -0,0 +1,255 @@
+"""
+This module provides the CredentialCache class, a per-process cache of users' stored OAuth credentials.
+
+Every authenticated request needs the user's credentials from ``user:{id}:token``. The
+cache keeps recently read credentials in memory for a short TTL, so most requests make
+no Redis round trip for them. A listener thread subscribes to Redis keyspace
+notifications for the token keys and drops a user's entry as soon as any worker
+changes, deletes or expires it. If notifications are unavailable, or the listener is
+disconnected, the TTL bounds how long a stale token can be served.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.utils.redis_client import token_key
+
+logger = logging.getLogger(__name__)
+
+# Keyspace events for generic commands (DEL), string commands (SET) and expiry
+_REQUIRED_EVENTS = 'g$x'
+
+
+class CredentialCache:
+    """
+    A thread-safe, TTL-bound least-recently-used cache of stored credentials JSON, per user.
+    """
+
+    def __init__(self, redis_client, ttl: float = 30, max_size: int = 1024, retry_delay: float = 5):
+        """
+        Initialize the CredentialCache.
+
+        Args:
+            redis_client: A Redis client with ``decode_responses=True``.
+            ttl (float): Seconds an entry is served for without being read from Redis again.
+                0 disables the cache.
+            max_size (int): Maximum number of users whose credentials are kept.
+            retry_delay (float): Seconds before a disconnected listener resubscribes.
+        """
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.max_size = max_size
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Incremented on every invalidation, so a read that raced one is not cached
+        self._generation = 0
+        self._metrics = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._stop = threading.Event()
+        self._thread = None
+        self.listening = False
+
+    @staticmethod
+    def token_key(user_id: str) -> str:
+        """
+        Get the Redis key of a user's stored credentials.
+
+        Args:
+            user_id (str): The user's ID.
+
+        Returns:
+            str: The key.
+        """
+        return token_key(user_id)
+
+    @property
+    def channel_pattern(self) -> str:
+        """str: The keyspace notification channels of every user's token key."""
+        db = self.redis_client.connection_pool.connection_kwargs.get('db', 0)
+        return f'__keyspace@{db}__:{self.token_key("*")}'
+
+    def get(self, user_id: str) -> Optional[str]:
+        """
+        Get a user's stored credentials, from memory if read recently.
+
+        Args:
+            user_id (str): The user's ID.
+
+        Returns:
+            Optional[str]: The credentials JSON, or None if the user has none stored.
+
+        Raises:
+            redis.exceptions.RedisError: If the credentials are not cached and Redis is unavailable.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self._metrics["hits"] += 1
+                return entry[0]
+            self._metrics["misses"] += 1
+            generation = self._generation
+
+        credentials_json = self.redis_client.get(self.token_key(user_id))
+        if credentials_json is not None and self.ttl > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._store(user_id, credentials_json, now)
+        return credentials_json
+
+    def set(self, user_id: str, credentials_json: str) -> None:
+        """
+        Store a user's credentials in Redis and in this process.
+
+        Args:
+            user_id (str): The user's ID.
+            credentials_json (str): The credentials JSON.
+
+        Raises:
+            redis.exceptions.RedisError: If Redis is unavailable.
+        """
+        self.redis_client.set(self.token_key(user_id), credentials_json)
+        if self.ttl > 0:
+            with self._lock:
+                self._generation += 1
+                self._store(user_id, credentials_json, time.monotonic())
+
+    def delete(self, user_id: str) -> None:
+        """
+        Delete a user's credentials from Redis and from this process.
+
+        Args:
+            user_id (str): The user's ID.
+
+        Raises:
+            redis.exceptions.RedisError: If Redis is unavailable.
+        """
+        self.invalidate(user_id)
+        self.redis_client.delete(self.token_key(user_id))
+
+    def _store(self, user_id: str, credentials_json: str, now: float) -> None:
+        # Callers hold the lock
+        self._entries[user_id] = (credentials_json, now + self.ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """
+        Drop a user's cached credentials, or every user's.
+
+        Args:
+            user_id (str, optional): The user's ID. If None, the whole cache is cleared.
+        """
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            elif self._entries.pop(user_id, None) is not None:
+                self._metrics["invalidations"] += 1
+
+    def handle_notification(self, message: Dict[str, Any]) -> None:
+        """
+        Invalidate the user named by a keyspace notification for their token key.
+
+        Args:
+            message (Dict[str, Any]): A pub/sub message whose channel is
+                ``__keyspace@{db}__:user:{id}:token``.
+        """
+        channel = message.get('channel') or ''
+        if isinstance(channel, bytes):
+            channel = channel.decode('utf-8')
+        key = channel.split(':', 1)[1] if ':' in channel else ''
+        if key.startswith('user:') and key.endswith(':token'):
+            self.invalidate(key[len('user:'):-len(':token')])
+
+    def enable_notifications(self) -> bool:
+        """
+        Enable the keyspace notifications the cache relies on, keeping any already enabled.
+
+        Returns:
+            bool: True if they are enabled, False if the server does not allow CONFIG SET,
+                as on some managed Redis services, where they must be enabled by its settings.
+        """
+        try:
+            flags = self.redis_client.config_get('notify-keyspace-events').get('notify-keyspace-events', '')
+            events = set(flags)
+            missing = '' if 'A' in events else ''.join(e for e in _REQUIRED_EVENTS if e not in events)
+            if 'K' not in events:
+                missing = 'K' + missing
+            if missing:
+                self.redis_client.config_set('notify-keyspace-events', flags + missing)
+            return True
+        except RedisError as e:
+            logger.warning(f"Could not enable keyspace notifications; cached credentials "
+                           f"expire after {self.ttl}s instead: {str(e)}")
+            return False
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(self.channel_pattern)
+                # Entries read before subscribing may have missed an invalidation
+                self.invalidate()
+                self.listening = True
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.handle_notification(message)
+            except RedisError as e:
+                logger.warning(f"Credential cache lost its Redis subscription: {str(e)}")
+            finally:
+                self.listening = False
+                try:
+                    pubsub.close()
+                except RedisError:
+                    pass
+            self.invalidate()
+            self._stop.wait(self.retry_delay)
+
+    def start(self) -> None:
+        """
+        Enable keyspace notifications and start listening for them in a daemon thread.
+        Calling it again has no effect.
+        """
+        if self.ttl <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self.enable_notifications()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name='credential-cache', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the listener thread.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the thread to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Report cache effectiveness in this process.
+
+        Returns:
+            Dict[str, Any]: Hit, miss and invalidation counts, the hit ratio, the number of
+                cached users and whether invalidations are being received.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["size"] = len(self._entries)
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_ratio"] = metrics["hits"] / lookups if lookups else 0.0
+        metrics["listening"] = self.listening
+        return metrics
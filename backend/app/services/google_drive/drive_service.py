@@ -3,12 +3,13 @@
 from google.auth.transport.requests import Request
 from flask import g
 from .core import DriveCore
-from googleapiclient.discovery import build
 from google.auth.exceptions import RefreshError
 
 class DriveService:
     """Service for handling Google Drive operations."""
 
+    FILE_DETAILS_FIELDS = "id, name, mimeType, size, hasThumbnail, thumbnailLink, modifiedTime, createdTime, viewedByMeTime, sharedWithMeTime, owners, parents, shared, md5Checksum, version"
+
     def __init__(self, drive_core):
         """
         Initialize the DriveService.
@@ -20,25 +21,34 @@ class DriveService:
 
     def get_services(self):
         """
-        Get or create Google Drive and People services.
+        Get the user's Google Drive and People services.
+
+        The services belong to the DriveCore, which is cached per user across requests,
+        so they are built at most once per token instead of on every request.
 
         Returns:
             tuple: A tuple containing the Drive service and People service.
         """
-        if 'drive_service' in g and 'people_service' in g:
-            return g.drive_service, g.people_service
+        self._refresh_credentials()
+        return self.drive_core.drive_service, self.drive_core.people_service
+
+    def get_drive_service(self):
+        """
+        Get the user's Google Drive service, without building the People service.
+
+        Returns:
+            Resource: The Drive service.
+        """
+        self._refresh_credentials()
+        return self.drive_core.drive_service
 
+    def _refresh_credentials(self):
         if self.drive_core.credentials.expired and self.drive_core.credentials.refresh_token:
             try:
                 self.drive_core.credentials.refresh(Request())
             except RefreshError as e:
                 raise Exception(f"Error refreshing credentials: {str(e)}")
 
-        g.drive_service = build('drive', 'v3', credentials=self.drive_core.credentials)
-        g.people_service = build('people', 'v1', credentials=self.drive_core.credentials)
-
-        return g.drive_service, g.people_service
-
     def list_folder_contents(self, folder_id, page_token=None, page_size=1000):
         """
         List contents of a Google Drive folder.
@@ -51,7 +61,7 @@ class DriveService:
         Returns:
             tuple: A tuple containing the list of files and the next page token.
         """
-        drive_service, _ = self.get_services()
+        drive_service = self.get_drive_service()
         query = f"'{folder_id}' in parents and trashed = false"
         if folder_id == 'root':
             query = "trashed = false"
@@ -94,7 +104,7 @@ class DriveService:
         Returns:
             tuple: A tuple containing the web view link and mime type.
         """
-        drive_service, _ = self.get_services()
+        drive_service = self.get_drive_service()
         try:
             file = drive_service.files().get(fileId=file_id, fields="webViewLink,mimeType").execute()
             return file.get('webViewLink'), file.get('mimeType')
@@ -111,30 +121,71 @@ class DriveService:
         Returns:
             dict: A dictionary containing file details.
         """
-        drive_service, _ = self.get_services()
+        drive_service = self.get_drive_service()
         try:
             file = drive_service.files().get(
                 fileId=file_id,
-                fields="id, name, mimeType, size, hasThumbnail, thumbnailLink, modifiedTime, createdTime, viewedByMeTime, sharedWithMeTime, owners, parents, shared"
+                fields=self.FILE_DETAILS_FIELDS
             ).execute()
-            return {
-                "id": file.get('id'),
-                "name": file.get('name'),
-                "mimeType": file.get('mimeType'),
-                "size": file.get('size'),
-                "hasThumbnail": file.get('hasThumbnail', False),
-                "thumbnailLink": file.get('thumbnailLink'),
-                "modifiedTime": file.get('modifiedTime'),
-                "createdTime": file.get('createdTime'),
-                "viewedByMeTime": file.get('viewedByMeTime'),
-                "sharedWithMeTime": file.get('sharedWithMeTime'),
-                "owners": file.get('owners', []),
-                "parents": file.get('parents', []),
-                "shared": file.get('shared', False)
-            }
+            return self._format_file_details(file)
         except Exception as e:
             raise Exception(f"Error retrieving file details: {str(e)}")
 
+    def get_multiple_file_details(self, file_ids, batch_size=100):
+        """
+        Get details of several files using batched Drive API requests.
+
+        Each batch of up to ``batch_size`` lookups is sent as a single HTTP request.
+        Files that cannot be retrieved are mapped to None.
+
+        Args:
+            file_ids (list): IDs of the files.
+            batch_size (int, optional): Number of lookups per batch request. The Drive API allows at most 100.
+
+        Returns:
+            dict: A dictionary mapping each file ID to its details, or None if the lookup failed.
+        """
+        drive_service = self.get_drive_service()
+        details = {file_id: None for file_id in file_ids}
+
+        def handle_response(request_id, response, exception):
+            if exception is None:
+                details[request_id] = self._format_file_details(response)
+
+        unique_ids = list(details.keys())
+        try:
+            for start in range(0, len(unique_ids), batch_size):
+                batch = drive_service.new_batch_http_request(callback=handle_response)
+                for file_id in unique_ids[start:start + batch_size]:
+                    batch.add(
+                        drive_service.files().get(fileId=file_id, fields=self.FILE_DETAILS_FIELDS),
+                        request_id=file_id
+                    )
+                batch.execute()
+            return details
+        except Exception as e:
+            raise Exception(f"Error retrieving file details: {str(e)}")
+
+    @staticmethod
+    def _format_file_details(file):
+        return {
+            "id": file.get('id'),
+            "name": file.get('name'),
+            "mimeType": file.get('mimeType'),
+            "size": file.get('size'),
+            "hasThumbnail": file.get('hasThumbnail', False),
+            "thumbnailLink": file.get('thumbnailLink'),
+            "modifiedTime": file.get('modifiedTime'),
+            "createdTime": file.get('createdTime'),
+            "viewedByMeTime": file.get('viewedByMeTime'),
+            "sharedWithMeTime": file.get('sharedWithMeTime'),
+            "owners": file.get('owners', []),
+            "parents": file.get('parents', []),
+            "shared": file.get('shared', False),
+            "md5Checksum": file.get('md5Checksum'),
+            "version": file.get('version')
+        }
+
     def cleanup_services(self):
         """Clean up and close Drive and People services."""
         drive_service = g.pop('drive_service', None)
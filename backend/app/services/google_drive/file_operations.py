@@ -45,15 +45,32 @@ class DriveFileOperations:
             dict: A dictionary containing the uploaded file ID or an error message.
         """
         try:
-            file_metadata = {'name': os.path.basename(file.filename), 'parents': [parent_id]}
-            media = MediaIoBaseUpload(io.BytesIO(file.read()),
-                                      mimetype=file.content_type,
-                                      resumable=True)
-            file = self.drive_service.files().create(body=file_metadata, media_body=media, fields='id').execute()
+            file = self.create_file(file.read(), file.filename, file.content_type, parent_id)
             return {"id": file.get('id')} 
         except Exception as e:
             return {"error": str(e)}, 400
 
+    def create_file(self, content, file_name, mime_type, parent_id, fields='id'):
+        """
+        Create a file in Google Drive from content already in memory.
+
+        Args:
+            content (bytes): The file content.
+            file_name (str): The name of the file; any directory part is dropped.
+            mime_type (str): The MIME type of the content.
+            parent_id (str): The ID of the parent folder.
+            fields (str, optional): The fields of the created file to return.
+
+        Returns:
+            dict: The created file with the requested fields.
+
+        Raises:
+            googleapiclient.errors.HttpError: If the upload fails.
+        """
+        file_metadata = {'name': os.path.basename(file_name), 'parents': [parent_id]}
+        media = MediaIoBaseUpload(io.BytesIO(content), mimetype=mime_type, resumable=True)
+        return self.drive_service.files().create(body=file_metadata, media_body=media, fields=fields).execute()
+
     def create_doc(self, folder_id):
         """
         Create a new Google Doc.
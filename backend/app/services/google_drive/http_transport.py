@@ -0,0 +1,178 @@
+"""
+This module provides a pooled, keep-alive HTTP transport for the Google API clients.
+
+``googleapiclient`` gives every built service its own httplib2 transport by default, so
+connections to googleapis.com are not reused across requests and a service cannot be
+shared between threads. Here every service sends its calls through one
+``requests``/urllib3 connection pool per worker, which is thread-safe and keeps
+connections alive. Each user's credentials are applied by a ``google.auth``
+AuthorizedSession, wrapped in the httplib2-style interface the API client expects.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httplib2
+from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config import Config
+
+
+class _ConnectionCounter:
+    """Counts new connections opened by the pools of a PooledHTTPAdapter."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+
+    def increment(self) -> None:
+        with self.lock:
+            self.connections += 1
+
+
+def _counting_pool_class(base, counter: _ConnectionCounter):
+    """Subclass a urllib3 connection pool so every new connection is counted."""
+    class CountingConnectionPool(base):
+        def _new_conn(self):
+            counter.increment()
+            return super()._new_conn()
+    return CountingConnectionPool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    A requests adapter whose urllib3 pools are shared by every session it is mounted on,
+    and which counts requests and new connections to measure connection reuse.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, max_retries: int = 0):
+        """
+        Initialize the PooledHTTPAdapter.
+
+        Args:
+            pool_connections (int): Number of hosts to keep connection pools for.
+            pool_maxsize (int): Maximum number of idle connections kept per host.
+            max_retries (int): Retries for failed connections; the API client retries requests itself.
+        """
+        self._counter = _ConnectionCounter()
+        self._requests = 0
+        self._requests_lock = threading.Lock()
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self._counter),
+            'https': _counting_pool_class(HTTPSConnectionPool, self._counter),
+        }
+
+    def send(self, request, **kwargs):
+        with self._requests_lock:
+            self._requests += 1
+        return super().send(request, **kwargs)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Report connection reuse in this worker.
+
+        Returns:
+            Dict[str, Any]: The number of requests sent, new connections opened, and the
+                fraction of requests that reused an open connection.
+        """
+        with self._requests_lock:
+            requests_sent = self._requests
+        with self._counter.lock:
+            connections = self._counter.connections
+        return {
+            "pool_maxsize": self._pool_maxsize,
+            "requests": requests_sent,
+            "connections_opened": connections,
+            "reuse_ratio": max(requests_sent - connections, 0) / requests_sent if requests_sent else 0.0
+        }
+
+
+class PooledAuthorizedHttp:
+    """
+    An httplib2-compatible transport that sends a user's Google API calls through the shared pool.
+
+    Pass it to ``googleapiclient.discovery.build`` as ``http``. The AuthorizedSession adds the
+    user's access token to each call and refreshes it when it expires or is rejected.
+    """
+
+    def __init__(self, credentials, adapter: Optional[HTTPAdapter] = None, timeout: Optional[float] = None):
+        """
+        Initialize the PooledAuthorizedHttp.
+
+        Args:
+            credentials (google.auth.credentials.Credentials): The user's credentials.
+            adapter (HTTPAdapter, optional): The adapter holding the connection pools.
+                Defaults to the worker's shared adapter.
+            timeout (float, optional): Seconds to wait for a connection or response.
+                Defaults to ``GOOGLE_HTTP_TIMEOUT``.
+        """
+        self.credentials = credentials
+        self.timeout = timeout if timeout is not None else Config.GOOGLE_HTTP_TIMEOUT
+        self.session = AuthorizedSession(credentials)
+        adapter = adapter if adapter is not None else shared_adapter
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, uri: str, method: str = 'GET', body=None, headers: Optional[Dict[str, str]] = None,
+                redirections: int = 5, connection_type=None) -> Tuple[httplib2.Response, bytes]:
+        """
+        Send a request, with the same signature and return value as ``httplib2.Http.request``.
+
+        Only GET and HEAD requests follow redirects, so the "308 Resume Incomplete" responses
+        of resumable uploads reach the API client, as with its default transport.
+
+        Args:
+            uri (str): The request URI.
+            method (str): The HTTP method.
+            body (Union[str, bytes], optional): The request body.
+            headers (Dict[str, str], optional): The request headers.
+            redirections (int): Redirects to follow; 0 disables them.
+            connection_type: Ignored; accepted for httplib2 compatibility.
+
+        Returns:
+            Tuple[httplib2.Response, bytes]: The response status and headers, and the body.
+        """
+        response = self.session.request(
+            method, uri, data=body, headers=headers, timeout=self.timeout,
+            allow_redirects=bool(redirections) and method in ('GET', 'HEAD')
+        )
+        info = {key.lower(): value for key, value in response.headers.items()}
+        content = response.content
+        if info.get('content-encoding') in ('gzip', 'deflate'):
+            # requests has already decompressed the body; report it the way httplib2 does
+            info['-content-encoding'] = info.pop('content-encoding')
+            info['content-length'] = str(len(content))
+        info['status'] = str(response.status_code)
+        result = httplib2.Response(info)
+        result.reason = response.reason
+        return result, content
+
+    def close(self) -> None:
+        """
+        Release the session without closing the shared connection pools.
+        """
+        self.session.adapters.clear()
+        self.session.close()
+
+
+# Keep-alive connection pools shared by every user's API clients in this worker
+shared_adapter = PooledHTTPAdapter(
+    pool_connections=Config.GOOGLE_HTTP_POOL_CONNECTIONS,
+    pool_maxsize=Config.GOOGLE_HTTP_POOL_MAXSIZE
+)
+
+
+def get_transport_metrics() -> Dict[str, Any]:
+    """
+    Report connection reuse of the shared Google API transport in this worker.
+
+    Returns:
+        Dict[str, Any]: See ``PooledHTTPAdapter.get_metrics``.
+    """
+    return shared_adapter.get_metrics()
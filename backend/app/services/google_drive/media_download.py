@@ -0,0 +1,248 @@
+"""
+This module provides chunked Google Drive downloads with bounded memory use.
+
+Media is downloaded in chunks into a SpooledDownload, which keeps small files in memory
+and spills larger ones to a temporary file on disk. Parsers read the result through
+zero-copy views: the in-memory buffer itself, or a read-only memory map of the file.
+"""
+
+import io
+import os
+import mmap
+import tempfile
+from contextlib import contextmanager
+from typing import Optional, Union
+
+from googleapiclient.http import MediaIoBaseDownload
+
+
+class SpooledDownload(io.RawIOBase):
+    """
+    A write-once, then read-only file that spills from memory to disk above a threshold.
+
+    While downloading, data is appended with ``write``. After ``finish`` the object is a
+    seekable, readable stream; on disk it reads from a memory map instead of copying the
+    file into memory. Close it, or use it as a context manager, to remove the spill file.
+    """
+
+    def __init__(self, spool_threshold: int = 32 * 1024 * 1024, directory: Optional[str] = None):
+        """
+        Initialize the SpooledDownload.
+
+        Args:
+            spool_threshold (int): Bytes kept in memory before spilling to disk.
+            directory (str, optional): Directory for the spill file. Defaults to the system temp directory.
+        """
+        super().__init__()
+        self.spool_threshold = spool_threshold
+        self.directory = directory
+        self.path = None
+        self.size = 0
+        self.truncated = False
+        self._buffer = io.BytesIO()
+        self._file = None
+        self._map = None
+        self._reader = None
+
+    @property
+    def on_disk(self) -> bool:
+        """bool: Whether the content has spilled to a temporary file."""
+        return self.path is not None
+
+    def writable(self) -> bool:
+        return self._reader is None
+
+    def readable(self) -> bool:
+        return self._reader is not None
+
+    def seekable(self) -> bool:
+        return self._reader is not None
+
+    def write(self, data) -> int:
+        if self._file is None and self._buffer.tell() + len(data) > self.spool_threshold:
+            self._rollover()
+        target = self._file if self._file is not None else self._buffer
+        written = target.write(data)
+        self.size += written
+        return written
+
+    def trim_partial_line(self) -> None:
+        """
+        Drop everything after the last newline, e.g. a line cut off by a partial download.
+
+        Must be called before ``finish``. Content without any newline is left as is.
+        """
+        target = self._file if self._file is not None else self._buffer
+        tail_start = max(self.size - 65536, 0)
+        target.seek(tail_start)
+        newline = target.read().rfind(b'\n')
+        if newline != -1:
+            self.size = tail_start + newline + 1
+            target.truncate(self.size)
+        target.seek(0, io.SEEK_END)
+
+    def _rollover(self) -> None:
+        descriptor, self.path = tempfile.mkstemp(prefix='drive-download-', dir=self.directory)
+        self._file = os.fdopen(descriptor, 'w+b')
+        self._file.write(self._buffer.getbuffer())
+        self._buffer = None
+
+    def finish(self) -> 'SpooledDownload':
+        """
+        Switch from writing to reading, positioned at the start of the content.
+
+        Returns:
+            SpooledDownload: This download, for chaining.
+        """
+        if self._file is not None:
+            self._file.flush()
+            if os.fstat(self._file.fileno()).st_size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._reader = self._map
+            else:
+                self._reader = io.BytesIO()
+        else:
+            self._reader = self._buffer
+        self._reader.seek(0)
+        return self
+
+    def read(self, size: int = -1) -> bytes:
+        return self._reader.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self._reader.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._reader.readline(size)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._reader.seek(offset, whence)
+        return self._reader.tell()
+
+    def tell(self) -> int:
+        return self._reader.tell()
+
+    def getbuffer(self) -> memoryview:
+        """
+        Return a zero-copy view of the whole content.
+
+        Returns:
+            memoryview: A view of the in-memory buffer or of the memory-mapped spill file.
+                Release it before closing the download.
+        """
+        if self._map is not None:
+            return memoryview(self._map)
+        return self._reader.getbuffer()
+
+    def getvalue(self) -> bytes:
+        """
+        Return a copy of the whole content.
+
+        Returns:
+            bytes: The content.
+        """
+        with self.getbuffer() as view:
+            return bytes(view)
+
+    def source(self) -> Union[bytes, str]:
+        """
+        Describe the content for a parser running in another process.
+
+        Returns:
+            Union[bytes, str]: The path of the spill file, or the content itself while it is
+                small enough to be held in memory.
+        """
+        return self.path if self.on_disk else self.getvalue()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A parser still holds a view; the map is unmapped when the view is released
+                pass
+        if self._file is not None:
+            self._file.close()
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+        super().close()
+
+
+def download_media(request, spool_threshold: int = 32 * 1024 * 1024, chunk_size: int = 8 * 1024 * 1024,
+                   directory: Optional[str] = None, max_bytes: Optional[int] = None) -> SpooledDownload:
+    """
+    Download a Drive media or export request in chunks.
+
+    Each chunk is fetched with an HTTP Range request, so with ``max_bytes`` only the
+    leading bytes of a large file are transferred. Such a partial download ends at the
+    last complete line and is marked as truncated.
+
+    Args:
+        request: A ``get_media`` or ``export_media`` request.
+        spool_threshold (int): Bytes kept in memory before spilling to disk.
+        chunk_size (int): Bytes requested per chunk.
+        directory (str, optional): Directory for the spill file.
+        max_bytes (int, optional): Stop once this many bytes have been downloaded.
+
+    Returns:
+        SpooledDownload: The downloaded content, positioned at its start.
+    """
+    download = SpooledDownload(spool_threshold, directory)
+    if max_bytes is not None:
+        chunk_size = max(min(chunk_size, max_bytes), 1)
+    try:
+        downloader = MediaIoBaseDownload(download, request, chunksize=chunk_size)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+            if not done and max_bytes is not None and download.size >= max_bytes:
+                download.truncated = True
+                download.trim_partial_line()
+                break
+    except Exception:
+        download.close()
+        raise
+    return download.finish()
+
+
+@contextmanager
+def open_source(source: Union[bytes, str]):
+    """
+    Open content described by ``SpooledDownload.source`` as a readable stream.
+
+    Args:
+        source (Union[bytes, str]): The content itself, or the path of a spill file.
+
+    Yields:
+        A seekable, readable binary stream over the content.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            yield file
+    else:
+        yield io.BytesIO(source)
+
+
+def as_buffer(file) -> Union[memoryview, bytes]:
+    """
+    Get a bytes-like view of a stream's whole content, without copying where possible.
+
+    Args:
+        file: A BytesIO, SpooledDownload, file on disk or other readable stream.
+
+    Returns:
+        Union[memoryview, bytes]: The content; files on disk are memory-mapped read-only.
+    """
+    if hasattr(file, 'getbuffer'):
+        return file.getbuffer()
+    if isinstance(file, io.BufferedReader) and os.fstat(file.fileno()).st_size:
+        return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    file.seek(0)
+    return file.read()
@@ -0,0 +1,319 @@
+"""
+This module provides the TokenManager class for refreshing OAuth tokens before they expire.
+
+Each user's token expiry is tracked in a Redis sorted set. A background thread in every
+web worker refreshes tokens shortly before they expire, so no user request pays for a
+refresh. Users' last activity is tracked alongside, and users inactive for longer than
+a session lasts are dropped rather than refreshed; if they return, their token is
+refreshed when it is next used and tracked again. A per-user Redis lock stops workers
+refreshing the same token at once, and refreshed tokens are written back to
+``user:{id}:token`` only if the stored token has not changed in the meantime.
+"""
+
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from redis.exceptions import LockError, RedisError, WatchError
+
+from app.services.google_drive.auth_service import AuthService
+from app.utils.redis_client import token_key
+
+logger = logging.getLogger(__name__)
+
+
+def _expiry_timestamp(expiry: Optional[datetime]) -> Optional[float]:
+    """Convert a google-auth expiry, a naive UTC datetime, to a Unix timestamp."""
+    if expiry is None:
+        return None
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    return expiry.timestamp()
+
+
+class TokenManager:
+    """
+    Track token expiries and refresh tokens ahead of time, in the background.
+    """
+
+    def __init__(self, redis_client, refresh_margin: int = 300, poll_interval: float = 30,
+                 lock_timeout: int = 30, retry_delay: int = 60, batch_size: int = 50,
+                 idle_timeout: int = 1800, touch_interval: float = 60, namespace: str = 'token'):
+        """
+        Initialize the TokenManager.
+
+        Args:
+            redis_client: A Redis client with ``decode_responses=True``.
+            refresh_margin (int): Seconds before expiry at which a token is refreshed.
+            poll_interval (float): Seconds between checks for tokens due a refresh.
+            lock_timeout (int): Seconds after which an unreleased refresh lock expires.
+            retry_delay (int): Seconds before a refresh that failed is retried.
+            batch_size (int): Maximum number of tokens refreshed per check.
+            idle_timeout (int): Seconds without activity after which a user's token is no
+                longer refreshed.
+            touch_interval (float): Minimum seconds between activity writes for one user
+                from this worker.
+            namespace (str): Prefix for the keys written by the manager.
+        """
+        self.redis_client = redis_client
+        self.refresh_margin = refresh_margin
+        self.poll_interval = poll_interval
+        self.lock_timeout = lock_timeout
+        self.retry_delay = retry_delay
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self.touch_interval = touch_interval
+        self.namespace = namespace
+        self._stop = threading.Event()
+        self._thread = None
+        self._metrics_lock = threading.Lock()
+        self._metrics = {"refreshed": 0, "failed": 0, "revoked": 0, "locked": 0, "conflicts": 0, "inactive": 0}
+        # When this worker last recorded each user's activity
+        self._touched: Dict[str, float] = {}
+
+    @property
+    def expiries_key(self) -> str:
+        """str: The sorted set of user IDs scored by token expiry."""
+        return f"{self.namespace}:expiries"
+
+    @property
+    def activity_key(self) -> str:
+        """str: The sorted set of tracked user IDs scored by their last activity."""
+        return f"{self.namespace}:activity"
+
+    @staticmethod
+    def token_key(user_id: str) -> str:
+        """
+        Get the Redis key of a user's stored credentials.
+
+        Args:
+            user_id (str): The user's ID.
+
+        Returns:
+            str: The key.
+        """
+        return token_key(user_id)
+
+    def _count(self, metric: str) -> None:
+        with self._metrics_lock:
+            self._metrics[metric] += 1
+
+    def track(self, user_id: str, expiry: Optional[datetime] = None) -> None:
+        """
+        Record when a user's token expires, and that the user is active.
+
+        Args:
+            user_id (str): The user's ID.
+            expiry (datetime, optional): The token's expiry, as set on google-auth credentials.
+                If unknown, the token is refreshed on the next check, which records its expiry,
+                unless an expiry is already tracked.
+        """
+        timestamp = _expiry_timestamp(expiry)
+        now = time.time()
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.zadd(self.activity_key, {user_id: now})
+            if timestamp is None:
+                pipe.zadd(self.expiries_key, {user_id: now}, nx=True)
+            else:
+                pipe.zadd(self.expiries_key, {user_id: timestamp})
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Could not track token expiry for user {user_id}: {str(e)}")
+
+    def touch(self, user_id: str) -> None:
+        """
+        Record that a user is active, at most once per ``touch_interval`` from this worker.
+
+        A user who was dropped for inactivity is tracked again, and their token refreshed
+        on the next check.
+
+        Args:
+            user_id (str): The user's ID.
+        """
+        now = time.monotonic()
+        with self._metrics_lock:
+            if now - self._touched.get(user_id, float('-inf')) < self.touch_interval:
+                return
+            self._touched[user_id] = now
+            if len(self._touched) > 4096:
+                # Forget users this worker has not seen recently
+                self._touched = {key: value for key, value in self._touched.items()
+                                 if now - value < self.touch_interval}
+        self.track(user_id)
+
+    def untrack(self, user_id: str) -> None:
+        """
+        Stop refreshing a user's token, e.g. on logout.
+
+        Args:
+            user_id (str): The user's ID.
+        """
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.zrem(self.expiries_key, user_id)
+            pipe.zrem(self.activity_key, user_id)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Could not untrack token for user {user_id}: {str(e)}")
+
+    def due_user_ids(self, now: Optional[float] = None) -> List[str]:
+        """
+        List users whose tokens expire within the refresh margin.
+
+        Args:
+            now (float, optional): The current Unix time. Defaults to the time of the call.
+
+        Returns:
+            List[str]: Up to ``batch_size`` user IDs, soonest expiry first.
+        """
+        now = time.time() if now is None else now
+        return self.redis_client.zrangebyscore(
+            self.expiries_key, '-inf', now + self.refresh_margin, start=0, num=self.batch_size
+        )
+
+    def refresh(self, user_id: str, force: bool = False, wait: bool = False) -> bool:
+        """
+        Refresh a user's token and store it, unless another worker is already doing so.
+
+        Args:
+            user_id (str): The user's ID.
+            force (bool): Refresh even if the tracked expiry is not yet within the margin,
+                or the user has been inactive.
+            wait (bool): If another worker is refreshing the token, wait for it to finish
+                and report its outcome, refreshing again if the token is still due.
+
+        Returns:
+            bool: True if this call, or the one it waited for, left a fresh token stored.
+                False if it failed, or if another worker was refreshing and ``wait`` is False.
+        """
+        lock = self.redis_client.lock(f"{self.namespace}:refresh:{user_id}", timeout=self.lock_timeout,
+                                      blocking=False)
+        if not lock.acquire(blocking=False):
+            self._count("locked")
+            if not wait or not lock.acquire(blocking=True, blocking_timeout=self.lock_timeout):
+                return False
+            # The other worker's refresh moved the tracked expiry past the margin if it succeeded
+            force = False
+        try:
+            return self._refresh_locked(user_id, force)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass
+
+    def _refresh_locked(self, user_id: str, force: bool) -> bool:
+        if not force:
+            # Another worker may have refreshed the token since it was found due
+            score = self.redis_client.zscore(self.expiries_key, user_id)
+            if score is not None and score > time.time() + self.refresh_margin:
+                return True
+            last_active = self.redis_client.zscore(self.activity_key, user_id)
+            if last_active is None or last_active < time.time() - self.idle_timeout:
+                self._count("inactive")
+                self.untrack(user_id)
+                return False
+
+        token_key = self.token_key(user_id)
+        with self.redis_client.pipeline() as pipe:
+            try:
+                pipe.watch(token_key)
+                credentials_json = pipe.get(token_key)
+                if not credentials_json:
+                    # The user logged out
+                    pipe.unwatch()
+                    self.untrack(user_id)
+                    return False
+
+                credentials = Credentials(**json.loads(credentials_json))
+                if not credentials.refresh_token:
+                    pipe.unwatch()
+                    self.untrack(user_id)
+                    return False
+                credentials.refresh(Request())
+
+                expiry = _expiry_timestamp(credentials.expiry) or time.time() + 3600
+                pipe.multi()
+                pipe.set(token_key, json.dumps(AuthService.credentials_to_dict(credentials)))
+                pipe.zadd(self.expiries_key, {user_id: expiry})
+                pipe.execute()
+                self._count("refreshed")
+                return True
+            except WatchError:
+                # The token was replaced, by a login or logout, while refreshing
+                self._count("conflicts")
+                return True
+            except RefreshError as e:
+                logger.warning(f"Token for user {user_id} can no longer be refreshed: {str(e)}")
+                self._count("revoked")
+                self.untrack(user_id)
+                return False
+            except Exception as e:
+                logger.error(f"Failed to refresh token for user {user_id}: {str(e)}")
+                self._count("failed")
+                try:
+                    self.redis_client.zadd(self.expiries_key, {user_id: time.time() + self.retry_delay})
+                except RedisError:
+                    pass
+                return False
+
+    def refresh_due(self) -> int:
+        """
+        Refresh every token that expires within the refresh margin.
+
+        Returns:
+            int: The number of tokens that were due.
+        """
+        user_ids = self.due_user_ids()
+        for user_id in user_ids:
+            self.refresh(user_id)
+        return len(user_ids)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh_due()
+            except Exception as e:
+                logger.error(f"Background token refresh failed: {str(e)}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        """
+        Start refreshing tokens in a daemon thread. Calling it again has no effect.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='token-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the thread to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Report refresh outcomes in this worker.
+
+        Returns:
+            Dict[str, Any]: Counts of refreshed, failed and revoked tokens, refreshes skipped
+                because another worker held the lock, write-backs lost to a newer token, and
+                users dropped for inactivity.
+        """
+        with self._metrics_lock:
+            return dict(self._metrics)
@@ -7,19 +7,51 @@ for processing queries and handling documents.
 
 import os
 import re
+import logging
 import time
 import random
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 import markdown
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
-from langchain_openai import ChatOpenAI
 from langchain.memory import ConversationBufferMemory
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
 from openai import RateLimitError
 
-from app.services.natural_language.file_extractor import FileExtractor
+from app.services.natural_language.file_extractor import FileExtractor, parser_pool
+from app.services.natural_language.context_packer import ContextPacker
+from app.services.natural_language.document_summariser import DocumentSummariser
+from app.services.natural_language.extraction_budget import ExtractionBudget
+from app.services.natural_language.extraction_cache import ExtractionCache
+from app.services.natural_language.ingest_planner import IngestPlanner, SKIP, RESELECT, REINDEX
+from app.services.natural_language.model_router import ModelRouter, parse_model_chain
+from app.services.natural_language.near_duplicate_filter import NearDuplicateFilter
+from app.services.natural_language.tabular_query_engine import TabularQueryEngine
+from app.services.natural_language.text_normaliser import TextNormaliser, NormalisationStats
 from app.services.database.pinecone_manager_service import PineconeManager
 from app.services.google_drive.core import DriveCore
 from app.services.google_drive.drive_service import DriveService
+from app.services.google_drive.file_operations import DriveFileOperations
+from app.services.google_drive.http_transport import get_transport_metrics
+from app.services.usage.usage_tracker import UsageTracker
+from app.utils.single_flight import SingleFlight
+from app.utils.redis_client import get_redis_client, get_pool_metrics
+from app.utils.token_utils import count_tokens
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Uploads from the chat interface run here while the request thread extracts their text
+_upload_executor = ThreadPoolExecutor(max_workers=Config.UPLOAD_WORKERS, thread_name_prefix='drive-upload')
+
+UPLOADED_FILE_FIELDS = 'id, name, mimeType, modifiedTime, md5Checksum, version'
+
+QUERY_INSTRUCTIONS = (
+    "Use the provided context, the chat history, and your own knowledge to answer the user's question. "
+    "You are allowed to give verbatim answers from the documents when requested."
+)
 
 def retry_with_exponential_backoff(
     func,
@@ -75,20 +107,23 @@ class ChatService:
         self.user_id = user_id
 
         if self.drive_core:
-            self.file_extractor = FileExtractor(drive_core=self.drive_core)
+            self.file_extractor = FileExtractor(drive_core=self.drive_core, sandbox=parser_pool)
+
+        self.redis_client = get_redis_client()
+        self.usage_tracker = UsageTracker(self.redis_client, retention_hours=Config.USAGE_RETENTION_HOURS)
 
-        self.llm = ChatOpenAI(
+        self.llm = ModelRouter(
+            parse_model_chain(Config.LLM_MODEL_CHAIN, Config.LLM_TIMEOUT),
             temperature=0.3,
-            model_name="gpt-4o-mini",
-            max_tokens=None,
-            timeout=None,
-            max_retries=2
+            cooldown=Config.LLM_FAILOVER_COOLDOWN,
+            usage_tracker=self.usage_tracker
         )
         
         self.pinecone_manager = PineconeManager(
             api_key=self.pinecone_api_key,
             environment=self.pinecone_environment,
-            index_name=self.pinecone_index_name
+            index_name=self.pinecone_index_name,
+            usage_tracker=self.usage_tracker
         )
         
         self.memory = ConversationBufferMemory(
@@ -98,6 +133,27 @@ class ChatService:
             return_messages=True
         )
 
+        self.ingest_single_flight = SingleFlight(
+            self.redis_client,
+            namespace='ingest',
+            lock_timeout=Config.INGEST_LOCK_TIMEOUT,
+            wait_timeout=Config.INGEST_LOCK_TIMEOUT + 30
+        )
+        self.extraction_cache = self._create_extraction_cache()
+        self.document_summariser = DocumentSummariser(self.llm, self.redis_client, usage_tracker=self.usage_tracker)
+        self.tabular_query_engine = TabularQueryEngine(self.llm)
+        self.context_packer = ContextPacker(Config.CONTEXT_TOKEN_BUDGET, Config.MMR_RELEVANCE_WEIGHT)
+        self.near_duplicate_filter = NearDuplicateFilter()
+        self.text_normaliser = TextNormaliser()
+
+    @staticmethod
+    def _create_extraction_cache() -> ExtractionCache:
+        max_bytes = Config.EXTRACTION_CACHE_MAX_MB * 1024 * 1024
+        if Config.EXTRACTION_CACHE_BACKEND == 'redis' and Config.REDIS_TOKEN_URL:
+            # Entries are compressed bytes, so this client must not decode responses
+            return ExtractionCache(get_redis_client(decode_responses=False), max_bytes=max_bytes)
+        return ExtractionCache(directory=Config.EXTRACTION_CACHE_DIR, max_bytes=max_bytes)
+
     def post_process_output(self, text: str) -> str:
         """
         Post-process the output text to convert markdown to HTML and apply custom formatting.
@@ -161,7 +217,7 @@ class ChatService:
         """
         self.drive_core = drive_core
         self.drive_service = DriveService(drive_core)
-        self.file_extractor = FileExtractor(drive_core=self.drive_core)
+        self.file_extractor = FileExtractor(drive_core=self.drive_core, sandbox=parser_pool)
 
     @retry_with_exponential_backoff
     def query(self, question: str) -> str:
@@ -190,24 +246,16 @@ class ChatService:
             raise ValueError("User ID is not set. Call set_user_id() before querying.")
 
         try:
-            selected_documents = self.pinecone_manager.get_selected_documents(self.user_id)
-            selected_documents = [doc for doc in selected_documents if doc['metadata'].get('isSelected', False)]
+            selected_documents = self.pinecone_manager.get_selected_documents(self.user_id, include_values=True)
+            selected_documents = sorted(
+                (doc for doc in selected_documents if doc['metadata'].get('isSelected', False)),
+                key=lambda doc: doc['metadata'].get('id') or ''
+            )
             
-            context = "\n\n".join([doc['metadata'].get('content', '') for doc in selected_documents])
-            
-            chat_history = self.memory.chat_memory.messages
-            prompt = f"""Use the following pieces of context, the chat history, and your own knowledge to answer the question at the end. You are allowed to give verbatim answers from the documents when requested.
-
-            Context:
-            {context}
+            document_context, question_context = self._build_context(selected_documents, question)
+            messages = self._build_messages(document_context, question, question_context)
 
-            Chat History:
-            {chat_history}
-
-            Question: {question}
-            Helpful Answer:"""
-
-            response = self.llm.invoke(prompt)
+            response = self.llm.invoke(messages, question=question)
             
             response_content = response.content if hasattr(response, 'content') else str(response)
             
@@ -219,6 +267,184 @@ class ChatService:
         except Exception as e:
             raise
 
+    def _build_messages(self, document_context: str, question: str, question_context: str = '') -> List[BaseMessage]:
+        """
+        Assemble the chat messages for a query in a stable, cache-friendly order.
+
+        The fixed instructions come first, then the document context, then the chat history
+        and finally the question. Consecutive turns over the same documents therefore share
+        a long identical prefix, which the API can serve from its prompt cache. Context that
+        depends on the question is sent with the question, after that prefix.
+
+        Args:
+            document_context (str): The context that depends only on the selected documents,
+                built from documents sorted by ID.
+            question (str): The question being answered.
+            question_context (str, optional): The context selected or computed for this question.
+
+        Returns:
+            List[BaseMessage]: The messages to send to the language model.
+        """
+        if question_context:
+            question = f"Context for this question:\n{question_context}\n\nQuestion: {question}"
+        return [
+            SystemMessage(content=QUERY_INSTRUCTIONS),
+            SystemMessage(content=f"Context:\n{document_context}"),
+            *self.memory.chat_memory.messages,
+            HumanMessage(content=question)
+        ]
+
+    def _build_context(self, selected_documents: List[Dict[str, Any]], question: str) -> Tuple[str, str]:
+        """
+        Combine the selected documents into the context for a query.
+
+        Spreadsheets are represented by their schema, sample rows and the result of any
+        computation the question needs, rather than by their flattened cells; the plans of
+        all their computations are requested from the language model at once. Passages
+        repeated across other documents, such as successive versions of one file, are kept
+        only from the most recently modified document. The remaining text is then summarised
+        or packed into the token budget by _build_text_context.
+
+        The context is split in two so the prompt prefix stays identical between questions:
+        the document context depends only on the selected documents, while computed
+        spreadsheet results and chunks packed for relevance to the question go in the
+        question context.
+
+        Args:
+            selected_documents (List[Dict[str, Any]]): The selected documents with their metadata,
+                sorted by ID.
+            question (str): The question being answered.
+
+        Returns:
+            Tuple[str, str]: The document context and the question context.
+        """
+        document_parts = []
+        question_parts = []
+        text_documents = []
+        spreadsheets = {}
+        for doc in selected_documents:
+            metadata = doc['metadata']
+            if self.tabular_query_engine.is_tabular(metadata.get('mimeType')) and self.drive_core:
+                try:
+                    frames = self._load_frames(metadata)
+                    spreadsheets[metadata.get('id')] = frames
+                    document_parts.append(
+                        self.tabular_query_engine.describe_spreadsheet(frames, title=metadata.get('id')))
+                    continue
+                except Exception:
+                    pass
+            text_documents.append(doc)
+
+        if spreadsheets:
+            try:
+                results = self.tabular_query_engine.compute(question, spreadsheets)
+                question_parts.extend(results[title] for title in spreadsheets if title in results)
+            except Exception as e:
+                logger.warning(f"Could not compute spreadsheet results for the question: {str(e)}")
+
+        text_documents, removed_tokens = self.near_duplicate_filter.filter_documents(text_documents)
+        if removed_tokens:
+            logger.info(f"Removed {removed_tokens} tokens of near-duplicate passages from the query context")
+
+        text_context, packed_context = self._build_text_context(text_documents, question)
+        if text_context:
+            document_parts.append(text_context)
+        if packed_context:
+            question_parts.append(packed_context)
+        return "\n\n".join(document_parts), "\n\n".join(question_parts)
+
+    def _build_text_context(self, text_documents: List[Dict[str, Any]], question: str) -> Tuple[str, str]:
+        """
+        Combine non-tabular documents into context, using summaries or packed chunks when large.
+
+        When many documents are selected and their full text exceeds the configured token
+        threshold, each is represented by its ingest-time summary and keywords; documents
+        without a summary yet are included in full. Otherwise, if the chunks do not fit the
+        context token budget, they are packed into it by maximal marginal relevance when
+        embeddings are available.
+
+        Args:
+            text_documents (List[Dict[str, Any]]): The selected non-tabular documents.
+            question (str): The question being answered.
+
+        Returns:
+            Tuple[str, str]: The context that depends only on the documents, and the chunks
+                packed for the question. One of them is empty.
+        """
+        contents = [doc['metadata'].get('content', '') for doc in text_documents]
+        total_tokens = sum(count_tokens(content) for content in contents)
+
+        if len(text_documents) >= Config.SUMMARY_CONTEXT_MIN_DOCUMENTS and total_tokens > Config.SUMMARY_CONTEXT_TOKEN_THRESHOLD:
+            parts = []
+            for doc, content in zip(text_documents, contents):
+                metadata = doc['metadata']
+                if metadata.get('summary'):
+                    keywords = ", ".join(metadata.get('keywords', []))
+                    parts.append(f"Document {metadata.get('id')} summary: {metadata['summary']}\nKeywords: {keywords}")
+                else:
+                    parts.append(content)
+            return "\n\n".join(parts), ''
+
+        packed_context = self._pack_chunks(text_documents, question)
+        if packed_context is not None:
+            return '', packed_context
+        return "\n\n".join(contents), ''
+
+    def _pack_chunks(self, text_documents: List[Dict[str, Any]], question: str) -> Optional[str]:
+        """
+        Pack the documents' chunks into the context token budget by maximal marginal relevance.
+
+        Args:
+            text_documents (List[Dict[str, Any]]): Documents whose metadata includes their chunks and embeddings.
+            question (str): The question being answered.
+
+        Returns:
+            str: The packed context, or None if chunk embeddings are unavailable or every
+                chunk fits the budget.
+        """
+        chunks = [(position, chunk)
+                  for position, doc in enumerate(text_documents)
+                  for chunk in doc['metadata'].get('chunks', [])]
+        if len(chunks) < 2 or any(not chunk.get('values') for _, chunk in chunks):
+            return None
+
+        token_counts = [count_tokens(chunk['content']) for _, chunk in chunks]
+        naive_tokens = sum(token_counts)
+        if naive_tokens <= self.context_packer.token_budget:
+            return None
+
+        query_embedding = self.pinecone_manager.embed(question)
+        selected = self.context_packer.pack(query_embedding, [chunk['values'] for _, chunk in chunks], token_counts)
+
+        packed = {}
+        for index in selected:
+            position, chunk = chunks[index]
+            packed.setdefault(position, []).append(chunk['content'])
+
+        packed_tokens = sum(token_counts[index] for index in selected)
+        logger.info(
+            f"Packed {len(selected)} of {len(chunks)} chunks into {packed_tokens} tokens, "
+            f"saving {naive_tokens - packed_tokens} of {naive_tokens} tokens over naive concatenation"
+        )
+        return "\n\n".join("\n\n".join(packed[position]) for position in sorted(packed))
+
+    def _load_frames(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Load a selected spreadsheet's sheets through the tabular query engine's cache.
+
+        Args:
+            metadata (Dict[str, Any]): The spreadsheet's document metadata.
+
+        Returns:
+            Dict[str, Any]: Sheet names mapped to DataFrames.
+        """
+        file_id = metadata.get('id')
+        return self.tabular_query_engine.get_frames(
+            file_id,
+            metadata.get('lastModified'),
+            lambda: self.file_extractor.extract_dataframes_from_drive_file(file_id, metadata['mimeType'])
+        )
+
     def clear_memory(self):
         """
         Clear the conversation memory and reset document selection.
@@ -235,7 +461,9 @@ class ChatService:
         if self.user_id:
             self.pinecone_manager.update_all_selected_documents(self.user_id, False)
 
-    def process_and_add_file(self, file_id: str, file_name: str) -> bool:
+    def process_and_add_file(self, file_id: str, file_name: str,
+                             file_details: Optional[Dict[str, Any]] = None,
+                             existing_metadata: Optional[Dict[str, Any]] = None) -> bool:
         """
         Process a file by extracting its text and then add it to or update it in the vector store.
 
@@ -243,9 +471,16 @@ class ChatService:
         a new version if the lastModified time is newer. Otherwise, it just updates
         the isSelected flag.
 
+        Concurrent calls for the same user, file and version are deduplicated: the first
+        caller does the work while the others wait for and return its result.
+
         Args:
             file_id (str): The ID of the file in Google Drive.
             file_name (str): The name of the file to be processed.
+            file_details (Dict[str, Any], optional): Drive metadata already retrieved for the file.
+                Fetched from Drive if not provided.
+            existing_metadata (Dict[str, Any], optional): Stored document metadata already retrieved
+                for the file. Fetched from Pinecone if not provided.
 
         Returns:
             bool: True if the file was successfully processed and added/updated in the vector store,
@@ -260,39 +495,212 @@ class ChatService:
             raise ValueError("DriveService is not set. Cannot process file.")
 
         try:
-            file_details = self.drive_service.get_file_details(file_id)
+            if file_details is None:
+                file_details = self.drive_service.get_file_details(file_id)
             new_last_modified = file_details.get('modifiedTime')
-            
-            existing_metadata = self.pinecone_manager.get_document_metadata(file_id, self.user_id)
-            
-            if existing_metadata:
-                existing_last_modified = existing_metadata.get('lastModified')
-                if existing_last_modified == new_last_modified:
-                    return self.pinecone_manager.update_document_selection(file_id, True, self.user_id)
-                else:
-                    self.pinecone_manager.delete_document(file_id, self.user_id)
-            
-            extracted_text = self.file_extractor.extract_text_from_drive_file(file_id, file_name)
-            
-            if not extracted_text:
-                return False
-            
-            document = {
-                "id": file_id,
-                "user_id": self.user_id,
-                "content": extracted_text,
-                "lastModified": new_last_modified,
-                "isSelected": True 
-            }
-            result = self.pinecone_manager.upsert_document(document, self.user_id)
-            return result['success']
+            user_id = self.user_id
+
+            return self.ingest_single_flight.do(
+                f"{user_id}:{file_id}:{new_last_modified}",
+                lambda: self._ingest_file(file_id, file_name, file_details, user_id, existing_metadata)
+            )
         except Exception:
             return False
 
+    @staticmethod
+    def _new_extraction_budget() -> ExtractionBudget:
+        """
+        Create the extraction budget for one document from the configured limits.
+
+        Returns:
+            ExtractionBudget: A fresh budget; limits configured as 0 are not applied.
+        """
+        return ExtractionBudget(
+            max_tokens=Config.EXTRACTION_MAX_TOKENS or None,
+            max_pages=Config.EXTRACTION_MAX_PAGES or None,
+            max_bytes=Config.EXTRACTION_MAX_BYTES or None
+        )
+
+    @staticmethod
+    def _tag_truncation(pages: Iterable[str], budget: ExtractionBudget, document: Dict[str, Any]) -> Iterator[str]:
+        """
+        Pass pages through, then mark the document as truncated if its budget ran out.
+
+        The document is tagged before the vector store finalises its chunks.
+        """
+        yield from pages
+        if budget.truncated:
+            document["truncated"] = True
+
+    def _ingest_file(self, file_id: str, file_name: str, file_details: Dict[str, Any], user_id: str,
+                     existing_metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Extract a file and store it in the vector store unless the stored version is current.
+
+        A stored older version stays in place until the new one is completely stored, so a
+        failed extraction leaves the document as it was.
+
+        Text already extracted for this file version, by any user, is taken from the
+        extraction cache instead of downloading and parsing the file again.
+
+        Args:
+            file_id (str): The ID of the file in Google Drive.
+            file_name (str): The name of the file to be processed.
+            file_details (Dict[str, Any]): The file's current Drive metadata.
+            user_id (str): The ID of the user whose namespace receives the document.
+            existing_metadata (Dict[str, Any], optional): Stored document metadata, fetched if not provided.
+
+        Returns:
+            bool: True if the document is stored and selected, False otherwise.
+        """
+        new_last_modified = file_details.get('modifiedTime')
+        if existing_metadata is None:
+            existing_metadata = self.pinecone_manager.get_document_metadata(file_id, user_id)
+
+        if existing_metadata and existing_metadata.get('lastModified') == new_last_modified:
+            return self.pinecone_manager.update_document_selection(file_id, True, user_id)
+
+        document = self._new_document(file_id, user_id, file_details)
+        cache_key = self.extraction_cache.key_for(file_id, file_details)
+        cached_text = self.extraction_cache.get(cache_key)
+        if cached_text is not None:
+            # Cached text was normalised when it was first extracted
+            result = self.pinecone_manager.upsert_document_stream(document, [cached_text], user_id)
+            if result['success']:
+                self.document_summariser.summarise_in_background(file_id, user_id, result['content'], self.pinecone_manager)
+            return result['success']
+
+        budget = self._new_extraction_budget()
+        normalisation = NormalisationStats()
+        pages = self.file_extractor.iter_text_from_drive_file(
+            file_id, file_name, mime_type=file_details.get('mimeType'), budget=budget
+        )
+        pages = self.text_normaliser.normalise(
+            pages, normalisation, tokens_before=lambda: budget.tokens,
+            **FileExtractor.normalisation_options(file_details.get('mimeType'))
+        )
+        pages = self._tag_truncation(pages, budget, document)
+        return self._index_extracted_text(document, pages, cache_key, budget, normalisation)
+
+    @staticmethod
+    def _new_document(file_id: str, user_id: str, file_details: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the stored document record for a file version, selected for chat."""
+        document = {
+            "id": file_id,
+            "user_id": user_id,
+            "lastModified": file_details.get('modifiedTime'),
+            "isSelected": True
+        }
+        if file_details.get('mimeType'):
+            document["mimeType"] = file_details['mimeType']
+        return document
+
+    def _index_extracted_text(self, document: Dict[str, Any], pages: Iterable[str], cache_key: Optional[str],
+                              budget: ExtractionBudget, normalisation: NormalisationStats) -> bool:
+        """
+        Store freshly extracted, normalised text in the vector store, cache it and start its summary.
+
+        Args:
+            document (Dict[str, Any]): The document record from ``_new_document``.
+            pages (Iterable[str]): The normalised text of the document.
+            cache_key (str, optional): The extraction cache key for the file version.
+            budget (ExtractionBudget): The budget the text was extracted within.
+            normalisation (NormalisationStats): Filled in as the pages are normalised.
+
+        Returns:
+            bool: True if the document was stored.
+        """
+        file_id, user_id = document["id"], document["user_id"]
+        result = self.pinecone_manager.upsert_document_stream(document, pages, user_id)
+        if result['success']:
+            logger.info(
+                f"Normalised document {file_id}: {normalisation.tokens_before} -> "
+                f"{normalisation.tokens_after} tokens ({normalisation.reduction_ratio:.1%} fewer)"
+            )
+            if not budget.truncated:
+                # Truncated text depends on the budget in force, so it is not shared
+                self.extraction_cache.put(cache_key, result['content'])
+            self.document_summariser.summarise_in_background(file_id, user_id, result['content'], self.pinecone_manager)
+        return result['success']
+
+    def upload_and_index_file(self, content: bytes, file_name: str, mime_type: Optional[str],
+                              parent_id: str = 'root') -> Dict[str, Any]:
+        """
+        Upload a file to Google Drive and add it to the vector store without downloading it again.
+
+        The upload runs on a background thread while the text is extracted from the content
+        already in memory. The document is then indexed under the file ID and modification
+        time returned by the upload, so a later add-to-chat finds it current.
+
+        Args:
+            content (bytes): The file content.
+            file_name (str): The name of the file.
+            mime_type (str, optional): The MIME type of the content. Guessed from the file name
+                if missing or generic.
+            parent_id (str, optional): The ID of the Drive folder to upload into. Defaults to 'root'.
+
+        Returns:
+            Dict[str, Any]: The uploaded file's 'id', 'name', 'mimeType' and 'modifiedTime', and
+                'indexed', which is False if the file type cannot be extracted or indexing failed.
+
+        Raises:
+            ValueError: If user_id is not set or if DriveCore is not set.
+            Exception: If the upload to Drive fails.
+        """
+        if not self.user_id:
+            raise ValueError("User ID is not set. Call set_user_id() before uploading files.")
+        if not self.drive_core:
+            raise ValueError("DriveCore is not set. Cannot upload file.")
+
+        if not mime_type or mime_type == 'application/octet-stream':
+            mime_type = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+        user_id = self.user_id
+        upload = _upload_executor.submit(
+            DriveFileOperations(self.drive_core).create_file,
+            content, file_name, mime_type, parent_id, fields=UPLOADED_FILE_FIELDS
+        )
+
+        budget = self._new_extraction_budget()
+        normalisation = NormalisationStats()
+        try:
+            pages = list(self.text_normaliser.normalise(
+                self.file_extractor.iter_text_from_upload(BytesIO(content), mime_type, budget), normalisation,
+                tokens_before=lambda: budget.tokens, **FileExtractor.normalisation_options(mime_type)
+            ))
+        except Exception as e:
+            logger.warning(f"Could not extract uploaded file {file_name}: {str(e)}")
+            pages = None
+
+        file_details = upload.result()
+        file_id = file_details['id']
+        uploaded = {
+            "id": file_id,
+            "name": file_details.get('name', file_name),
+            "mimeType": file_details.get('mimeType', mime_type),
+            "modifiedTime": file_details.get('modifiedTime'),
+            "indexed": False
+        }
+        if pages is None:
+            return uploaded
+
+        document = self._new_document(file_id, user_id, file_details)
+        if budget.truncated:
+            document["truncated"] = True
+        try:
+            uploaded["indexed"] = self._index_extracted_text(
+                document, pages, self.extraction_cache.key_for(file_id, file_details), budget, normalisation
+            )
+        except Exception as e:
+            logger.error(f"Failed to index uploaded file {file_id}: {str(e)}")
+        return uploaded
+
     def process_and_add_multiple_files(self, file_ids: List[str], file_names: List[str]) -> Dict[str, Any]:
         """
         Process multiple files and add them to the vector store.
 
+        Drive metadata and stored document metadata for all files are looked up in bulk
+        first, so files whose stored version is current never trigger a download.
+
         Args:
             file_ids (List[str]): The IDs of the files in Google Drive.
             file_names (List[str]): The names of the files to be processed.
@@ -310,9 +718,29 @@ class ChatService:
 
         successful_uploads = 0
         total_files = len(file_ids)
+        file_names_by_id = dict(zip(file_ids, file_names))
 
-        for file_id, file_name in zip(file_ids, file_names):
-            success = self.process_and_add_file(file_id, file_name)
+        try:
+            plan = IngestPlanner(self.drive_service, self.pinecone_manager).plan(file_ids, self.user_id)
+        except Exception:
+            plan = [{"file_id": file_id, "action": REINDEX, "file_details": None, "existing_metadata": None}
+                    for file_id in file_ids]
+
+        for entry in plan:
+            file_id = entry['file_id']
+            if entry['action'] == SKIP:
+                success = True
+            elif entry['action'] == RESELECT:
+                success = self.pinecone_manager.update_document_selection(file_id, True, self.user_id)
+            elif entry['action'] == REINDEX:
+                success = self.process_and_add_file(
+                    file_id,
+                    file_names_by_id[file_id],
+                    file_details=entry['file_details'],
+                    existing_metadata=entry['existing_metadata']
+                )
+            else:
+                success = False
             if success:
                 successful_uploads += 1
 
@@ -338,6 +766,8 @@ class ChatService:
         if not self.user_id:
             raise ValueError("User ID is not set. Call set_user_id() before updating document selection.")
 
+        if not is_selected:
+            self.ingest_single_flight.forget(f"{self.user_id}:{file_id}")
         return self.pinecone_manager.update_document_selection(file_id, is_selected, self.user_id)
 
     def delete_document(self, file_id: str) -> bool:
@@ -356,4 +786,45 @@ class ChatService:
         if not self.user_id:
             raise ValueError("User ID is not set. Call set_user_id() before deleting documents.")
 
-        return self.pinecone_manager.delete_document(file_id, self.user_id)
\ No newline at end of file
+        self.ingest_single_flight.forget(f"{self.user_id}:{file_id}")
+        return self.pinecone_manager.delete_document(file_id, self.user_id)
+
+    def get_usage_metrics(self, hours: int = 24, include_global: bool = False) -> Dict[str, Any]:
+        """
+        Report model and embedding usage for the current user, and optionally for the service.
+
+        Args:
+            hours (int): The number of most recent hours to aggregate.
+            include_global (bool): Also report usage of every endpoint, across all users, and
+                service metrics. Only for administrators.
+
+        Returns:
+            Dict[str, Any]: The current user's usage. With ``include_global``, also usage per
+                endpoint, model routing statistics, ingest deduplication counters, parser pool
+                utilisation, extraction cache hits, the tokens saved by text normalisation,
+                Google API connection reuse and Redis connection pool saturation.
+
+        Raises:
+            ValueError: If user_id is not set.
+        """
+        if not self.user_id:
+            raise ValueError("User ID is not set. Call set_user_id() before reading usage metrics.")
+
+        metrics = {
+            "window_hours": hours,
+            "user": self.usage_tracker.get_usage('user', self.user_id, hours)
+        }
+        if not include_global:
+            return metrics
+
+        return {
+            **metrics,
+            "endpoints": self.usage_tracker.get_endpoint_usage(hours),
+            "models": self.llm.get_metrics(),
+            "ingest": self.ingest_single_flight.get_metrics(),
+            "parser": parser_pool.get_metrics(),
+            "extraction_cache": self.extraction_cache.get_metrics(),
+            "normalisation": self.text_normaliser.get_metrics(),
+            "google_http": get_transport_metrics(),
+            "redis": get_pool_metrics()
+        }
@@ -0,0 +1,83 @@
+"""
+This module provides the ContextPacker class for selecting query context within a token budget.
+
+Chunks are chosen greedily by maximal marginal relevance (MMR): each pick balances similarity
+to the question against similarity to the chunks already picked, so near-duplicate passages
+do not crowd out distinct ones.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+
+class ContextPacker:
+    """
+    Pick a relevant, diverse subset of chunks that fits a token budget.
+
+    Relevance and redundancy are computed with matrix operations over the chunk
+    embeddings, so packing costs one matrix product regardless of chunk count.
+    """
+
+    def __init__(self, token_budget: int, relevance_weight: float = 0.7, redundancy_threshold: float = 0.95):
+        """
+        Initialize the ContextPacker.
+
+        Args:
+            token_budget (int): Maximum number of tokens of packed context.
+            relevance_weight (float): MMR trade-off between relevance (1.0) and diversity (0.0).
+            redundancy_threshold (float): Chunks at least this similar to an already packed
+                chunk are treated as duplicates and never packed.
+        """
+        self.token_budget = token_budget
+        self.relevance_weight = relevance_weight
+        self.redundancy_threshold = redundancy_threshold
+
+    @staticmethod
+    def _normalise(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def pack(self, query_embedding: Sequence[float], chunk_embeddings: Sequence[Sequence[float]],
+             token_counts: Sequence[int]) -> List[int]:
+        """
+        Select chunks by maximal marginal relevance until the token budget is filled.
+
+        Args:
+            query_embedding (Sequence[float]): The embedding of the question.
+            chunk_embeddings (Sequence[Sequence[float]]): One embedding per candidate chunk.
+            token_counts (Sequence[int]): The token count of each candidate chunk.
+
+        Returns:
+            List[int]: Indices of the selected chunks, in ascending order.
+        """
+        if len(chunk_embeddings) == 0:
+            return []
+
+        embeddings = self._normalise(np.asarray(chunk_embeddings, dtype=np.float32))
+        query = self._normalise(np.asarray(query_embedding, dtype=np.float32))
+        tokens = np.asarray(token_counts, dtype=np.int64)
+
+        relevance = embeddings @ query
+        similarity = embeddings @ embeddings.T
+
+        selected = []
+        available = np.ones(len(tokens), dtype=bool)
+        max_similarity = np.zeros(len(tokens), dtype=np.float32)
+        remaining = self.token_budget
+
+        while True:
+            candidates = available & (tokens <= remaining)
+            if not candidates.any():
+                break
+
+            scores = self.relevance_weight * relevance - (1 - self.relevance_weight) * max_similarity
+            best = int(np.argmax(np.where(candidates, scores, -np.inf)))
+
+            selected.append(best)
+            available[best] = False
+            remaining -= int(tokens[best])
+            max_similarity = np.maximum(max_similarity, similarity[:, best])
+            available &= max_similarity < self.redundancy_threshold
+
+        return sorted(selected)
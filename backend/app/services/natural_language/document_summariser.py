@@ -0,0 +1,155 @@
+"""
+This module provides the DocumentSummariser class for computing compact document summaries.
+
+Summaries and keywords are computed at ingest time, off the request path, and cached by
+content hash so identical content is only ever summarised once.
+"""
+
+import re
+import json
+import hashlib
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours yourself yourselves
+none nan true false page sheet
+""".split())
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='summariser')
+
+
+class DocumentSummariser:
+    """
+    Compute and cache a short summary and keyword list for a document's content.
+
+    The summary is produced by the language model from the leading part of the document.
+    Keywords are extracted locally from term frequencies, so they cost no model tokens.
+    """
+
+    def __init__(self, llm, redis_client=None, max_input_chars=12000, max_keywords=10, cache_ttl=30 * 24 * 3600,
+                 usage_tracker=None):
+        """
+        Initialize the DocumentSummariser.
+
+        Args:
+            llm: A ModelRouter, or a language model exposing ``invoke(prompt, user_id=None)``.
+            redis_client: A Redis client with ``decode_responses=True`` used as the summary cache, or None.
+            max_input_chars (int): Maximum number of characters of content sent to the model.
+            max_keywords (int): Maximum number of keywords to keep.
+            cache_ttl (int): Seconds a cached summary is kept.
+            usage_tracker (UsageTracker, optional): Records summary cache hits.
+        """
+        self.llm = llm
+        self.redis_client = redis_client
+        self.max_input_chars = max_input_chars
+        self.max_keywords = max_keywords
+        self.cache_ttl = cache_ttl
+        self.usage_tracker = usage_tracker
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """
+        Compute the cache key hash for a piece of content.
+
+        Args:
+            content (str): The document content.
+
+        Returns:
+            str: The SHA-256 hex digest of the content.
+        """
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def extract_keywords(self, content: str) -> List[str]:
+        """
+        Extract the most frequent meaningful terms from the content.
+
+        Args:
+            content (str): The document content.
+
+        Returns:
+            List[str]: Up to ``max_keywords`` keywords, most frequent first.
+        """
+        words = re.findall(r"[a-zA-Z][a-zA-Z\-]{2,}", content.lower())
+        counts = Counter(word for word in words if word not in STOPWORDS)
+        return [word for word, _ in counts.most_common(self.max_keywords)]
+
+    def summarise(self, content: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return the summary and keywords for the content, using the cache when possible.
+
+        Args:
+            content (str): The document content.
+            user_id (str, optional): The user to attribute the model call or cache hit to.
+                Defaults to the session user.
+
+        Returns:
+            Dict[str, Any]: A dictionary with 'summary', 'keywords' and 'contentHash'.
+        """
+        content_hash = self.content_hash(content)
+        cache_key = f"summary:{content_hash}"
+
+        if self.redis_client is not None:
+            try:
+                cached = self.redis_client.get(cache_key)
+                if cached:
+                    if self.usage_tracker is not None:
+                        self.usage_tracker.record('summary', cache_hit=True, user_id=user_id)
+                    return json.loads(cached)
+            except RedisError:
+                pass
+
+        excerpt = content[:self.max_input_chars]
+        prompt = f"""Summarise the following document in at most three sentences. Mention its purpose, the main entities involved and any key figures or dates. Reply with the summary only.
+
+        Document:
+        {excerpt}"""
+        response = self.llm.invoke(prompt, user_id=user_id)
+        summary = response.content if hasattr(response, 'content') else str(response)
+
+        result = {
+            "summary": summary.strip(),
+            "keywords": self.extract_keywords(content),
+            "contentHash": content_hash
+        }
+
+        if self.redis_client is not None:
+            try:
+                self.redis_client.set(cache_key, json.dumps(result), ex=self.cache_ttl)
+            except RedisError:
+                pass
+
+        return result
+
+    def summarise_in_background(self, file_id: str, user_id: str, content: str, pinecone_manager):
+        """
+        Summarise a document in a background thread and store the result with its vectors.
+
+        Args:
+            file_id (str): The Google Drive file ID of the document.
+            user_id (str): The ID of the user who owns the document.
+            content (str): The document content.
+            pinecone_manager (PineconeManager): The manager used to store the summary.
+
+        Returns:
+            concurrent.futures.Future: The future for the background task.
+        """
+        def task():
+            try:
+                result = self.summarise(content, user_id=user_id)
+                pinecone_manager.update_document_summary(file_id, user_id, result['summary'], result['keywords'])
+            except Exception as e:
+                logger.warning(f"Failed to summarise document {file_id}: {str(e)}")
+
+        return _executor.submit(task)
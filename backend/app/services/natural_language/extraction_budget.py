@@ -0,0 +1,113 @@
+"""
+This module provides the ExtractionBudget class for stopping extraction early.
+
+Only a bounded amount of a document's text is ever useful to the chat context and the
+embedding pipeline, so extraction stops once a budget of tokens, pages or bytes is spent
+and the document is marked as truncated.
+"""
+
+from typing import Iterable, Iterator, Optional, Tuple
+
+from app.utils.token_utils import count_tokens, CHARS_PER_TOKEN
+
+TRUNCATION_MARKER = "[truncated: extraction budget reached]"
+
+
+class ExtractionBudget:
+    """
+    Limit the text taken from one document by tokens, pages or bytes.
+
+    A budget is single-use: create one per document. Limits left as None are not applied.
+    The tokens, pages and bytes taken so far are counted whether or not they are limited,
+    so later stages can reuse the counts instead of tokenizing the text again.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_pages: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        """
+        Initialize the ExtractionBudget.
+
+        Args:
+            max_tokens (int, optional): Maximum number of tokens of text.
+            max_pages (int, optional): Maximum number of pages, or parts for documents without pages.
+            max_bytes (int, optional): Maximum size of the text in UTF-8 bytes.
+        """
+        self.max_tokens = max_tokens
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.tokens = 0
+        self.pages = 0
+        self.bytes = 0
+        self.truncated = False
+
+    def download_limit(self) -> Optional[int]:
+        """
+        Estimate how many leading bytes of a plain text file can be within the budget.
+
+        Returns:
+            int: The number of bytes worth downloading, or None if the budget sets no size limit.
+                Token limits are converted generously, so the precise cut is made on the text.
+        """
+        limits = []
+        if self.max_bytes is not None:
+            limits.append(self.max_bytes)
+        if self.max_tokens is not None:
+            # Allow for multi-byte characters on top of the usual characters per token
+            limits.append(self.max_tokens * CHARS_PER_TOKEN * 2)
+        return min(limits) if limits else None
+
+    def _fit(self, text: str) -> Tuple[str, int]:
+        """Cut ``text`` to what is left of the byte and token limits, returning it with its token count."""
+        if self.max_bytes is not None:
+            remaining = self.max_bytes - self.bytes
+            encoded = text.encode('utf-8')
+            if len(encoded) > remaining:
+                text = encoded[:max(remaining, 0)].decode('utf-8', errors='ignore')
+
+        tokens = count_tokens(text)
+        if self.max_tokens is not None:
+            remaining = self.max_tokens - self.tokens
+            while tokens > remaining and text:
+                # Shrink proportionally, ending on whitespace where possible, until the text fits
+                cut = max(int(len(text) * remaining / tokens), 0)
+                space = text.rfind(' ', 0, cut)
+                text = text[:space if space > cut // 2 else cut]
+                tokens = count_tokens(text)
+        return text, tokens
+
+    def limit(self, parts: Iterable[str]) -> Iterator[str]:
+        """
+        Yield a document's text parts until the budget is spent.
+
+        When the budget runs out, the last part is cut to fit, a truncation marker is yielded,
+        ``truncated`` is set and the source iterator is closed so no further text is extracted.
+
+        Args:
+            parts (Iterable[str]): The document's text in order, such as one string per page.
+
+        Yields:
+            str: The text parts within the budget.
+        """
+        iterator = iter(parts)
+        try:
+            for part in iterator:
+                if self.max_pages is not None and self.pages >= self.max_pages:
+                    self.truncated = True
+                    break
+
+                fitted, tokens = self._fit(part)
+                self.pages += 1
+                self.bytes += len(fitted.encode('utf-8'))
+                self.tokens += tokens
+                if fitted:
+                    yield fitted
+                if len(fitted) < len(part):
+                    self.truncated = True
+                    break
+
+            if self.truncated:
+                yield TRUNCATION_MARKER
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
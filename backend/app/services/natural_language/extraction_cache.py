@@ -0,0 +1,311 @@
+"""
+This module provides the ExtractionCache class for reusing extracted document text.
+
+Extracted text is keyed by file ID and content version, compressed, and stored either in
+Redis or on local disk with size-bounded least-recently-used eviction. A file version that
+has been extracted once, by any user, never has to be downloaded or parsed again.
+"""
+
+import os
+import time
+import zlib
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.utils.redis_client import execute_batched
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction output changes, so text cached by older code is not reused
+EXTRACTION_FORMAT_VERSION = 5
+
+
+class _RedisStore:
+    """
+    Compressed entries in Redis, with access times in a sorted set for LRU eviction.
+
+    Entries do not expire; they stay until evicted, so the sizes in the bookkeeping hash
+    always describe stored entries. A counter holds their total size, so a write only
+    reads the least recently used entries when the total is over the limit.
+    """
+
+    def __init__(self, redis_client, namespace: str, max_bytes: int, evict_batch_size: int = 100):
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.evict_batch_size = evict_batch_size
+        self.lru_key = f"{namespace}:lru"
+        self.sizes_key = f"{namespace}:sizes"
+        self.total_key = f"{namespace}:total"
+        self._counter_checked = False
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.namespace}:entry:{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.get(self._entry_key(key))
+        pipe.zadd(self.lru_key, {key: time.time()}, xx=True)
+        data, _ = pipe.execute()
+        if data is None:
+            # The entry may have been dropped by Redis itself, e.g. under memory pressure
+            self._remove([key])
+        return data
+
+    def put(self, key: str, data: bytes) -> int:
+        self._ensure_counter()
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hget(self.sizes_key, key)
+        pipe.hset(self.sizes_key, key, len(data))
+        pipe.incrby(self.total_key, len(data))
+        pipe.set(self._entry_key(key), data)
+        pipe.zadd(self.lru_key, {key: time.time()})
+        previous_size, _, total, _, _ = pipe.execute()
+        if previous_size is not None:
+            # Each transaction reads the size it replaced, so concurrent writes of one key
+            # subtract every replaced size exactly once
+            total = self.redis_client.decrby(self.total_key, int(previous_size))
+        return self._evict(total) if total > self.max_bytes else 0
+
+    def _ensure_counter(self) -> None:
+        # Entries stored before the counter existed are added to it once
+        if self._counter_checked:
+            return
+        if not self.redis_client.exists(self.total_key):
+            total = sum(int(size) for size in self.redis_client.hvals(self.sizes_key))
+            self.redis_client.set(self.total_key, total, nx=True)
+        self._counter_checked = True
+
+    def _remove(self, keys) -> int:
+        """Remove entries and their bookkeeping, returning the bytes freed by this call."""
+        def remove(pipe, key):
+            pipe.hget(self.sizes_key, key)
+            pipe.hdel(self.sizes_key, key)
+            pipe.zrem(self.lru_key, key)
+            pipe.delete(self._entry_key(key))
+        replies = execute_batched(self.redis_client, keys, remove, transaction=True)
+        # Each size is read atomically with its removal, and only the caller whose HDEL
+        # removed it subtracts it, if several race
+        freed = sum(int(replies[i]) for i in range(0, len(replies), 4) if replies[i] is not None and replies[i + 1])
+        if freed:
+            self.redis_client.decrby(self.total_key, freed)
+        return freed
+
+    def _evict(self, total: int) -> int:
+        # Read the least recently used entries a batch at a time until enough are found
+        # to bring the total under the limit, then remove them
+        victims = []
+        start = 0
+        while total > self.max_bytes:
+            keys = self.redis_client.zrange(self.lru_key, start, start + self.evict_batch_size - 1)
+            if not keys:
+                break
+            keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+            for key, size in zip(keys, self.redis_client.hmget(self.sizes_key, keys)):
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= int(size or 0)
+            start += len(keys)
+        if victims:
+            self._remove(victims)
+        return len(victims)
+
+
+class _DiskStore:
+    """
+    Compressed entries as files, with file modification times used for LRU eviction.
+
+    The total size of the entries is kept in memory, so a write only lists the directory
+    when the total is over the limit, or every ``reconcile_interval`` seconds to pick up
+    entries written or removed by other processes. Eviction frees space down to
+    ``low_water`` of the limit, so the next writes do not list the directory again.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, reconcile_interval: float = 60, low_water: float = 0.9):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.reconcile_interval = reconcile_interval
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+        self._scanned_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.z')
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as entry:
+                data = entry.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: bytes) -> int:
+        path = self._path(key)
+        try:
+            previous_size = os.stat(path).st_size
+        except FileNotFoundError:
+            previous_size = 0
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, 'wb') as entry:
+            entry.write(data)
+        os.replace(temporary_path, path)
+
+        with self._lock:
+            stale = self._total is None or time.monotonic() - self._scanned_at >= self.reconcile_interval
+            if not stale:
+                self._total += len(data) - previous_size
+            if not stale and self._total <= self.max_bytes:
+                return 0
+        return self._evict()
+
+    def _evict(self) -> int:
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith('.z'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * self.low_water
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    evicted += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+        with self._lock:
+            self._total = total
+            self._scanned_at = time.monotonic()
+        return evicted
+
+
+class ExtractionCache:
+    """
+    Cache extracted document text by file ID and content version.
+
+    Binary files are versioned by their ``md5Checksum`` and Google-native files, which have
+    no checksum, by their ``version``. Entries are zlib-compressed. Failures of the
+    underlying store are logged and treated as misses, so extraction always proceeds.
+    """
+
+    def __init__(self, redis_client=None, directory: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024,
+                 namespace: str = 'extraction', compression_level: int = 6):
+        """
+        Initialize the ExtractionCache.
+
+        Args:
+            redis_client: A Redis client with ``decode_responses=False``. If given, entries are stored in Redis.
+            directory (str, optional): The directory entries are stored in when no Redis client is given.
+            max_bytes (int): Maximum total size of the compressed entries.
+            namespace (str): Prefix for the Redis keys.
+            compression_level (int): zlib compression level.
+
+        Raises:
+            ValueError: If neither a Redis client nor a directory is given.
+        """
+        if redis_client is not None:
+            self.store = _RedisStore(redis_client, namespace, max_bytes)
+        elif directory:
+            self.store = _DiskStore(directory, max_bytes)
+        else:
+            raise ValueError("ExtractionCache needs a Redis client or a directory")
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+
+    @staticmethod
+    def key_for(file_id: str, file_details: Dict[str, Any]) -> Optional[str]:
+        """
+        Build the cache key for a file version.
+
+        Args:
+            file_id (str): The Google Drive file ID.
+            file_details (Dict[str, Any]): The file's Drive metadata, including 'md5Checksum' or 'version'.
+
+        Returns:
+            str: The cache key, or None if the metadata identifies no content version.
+        """
+        if file_details.get('md5Checksum'):
+            version = f"md5-{file_details['md5Checksum']}"
+        elif file_details.get('version'):
+            version = f"v-{file_details['version']}"
+        else:
+            return None
+        return f"{file_id}:{version}:f{EXTRACTION_FORMAT_VERSION}"
+
+    def _count(self, metric: str, amount: int = 1) -> None:
+        with self._lock:
+            self._metrics[metric] += amount
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        """
+        Look up the extracted text for a cache key.
+
+        Args:
+            key (str): The cache key from ``key_for``, or None.
+
+        Returns:
+            str: The cached text, or None on a miss.
+        """
+        if key is None:
+            return None
+        try:
+            data = self.store.get(key)
+            if data is not None:
+                text = zlib.decompress(data).decode('utf-8')
+                self._count("hits")
+                return text
+        except (RedisError, OSError, zlib.error, UnicodeDecodeError) as e:
+            logger.warning(f"Failed to read extraction cache entry {key}: {str(e)}")
+            self._count("errors")
+        self._count("misses")
+        return None
+
+    def put(self, key: Optional[str], text: str) -> None:
+        """
+        Store the extracted text for a cache key, evicting the least recently used entries if needed.
+
+        Args:
+            key (str): The cache key from ``key_for``, or None.
+            text (str): The extracted text.
+        """
+        if key is None or not text:
+            return
+        try:
+            evicted = self.store.put(key, zlib.compress(text.encode('utf-8'), self.compression_level))
+            self._count("stores")
+            self._count("evictions", evicted)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Failed to write extraction cache entry {key}: {str(e)}")
+            self._count("errors")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Report cache hits, misses, stores, evictions and errors in this process.
+
+        Returns:
+            Dict[str, Any]: The counters and the hit ratio.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_ratio"] = metrics["hits"] / lookups if lookups else 0.0
+        return metrics
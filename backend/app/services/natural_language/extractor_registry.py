@@ -0,0 +1,219 @@
+"""
+This module provides the registry of text extractor plugins, keyed by file type and MIME type.
+
+Each plugin names its parser by import path, or wraps a function that imports its parser
+library on first call, so a worker only pays the import cost of the formats it actually
+parses. New formats are supported by registering a plugin on ``extractor_registry``.
+"""
+
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+
+def _resolve(target: Union[str, Callable]) -> Callable:
+    """Import a ``'module:attribute'`` target, or return a callable unchanged."""
+    if callable(target):
+        return target
+    module_name, _, attribute = target.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class ExtractorPlugin:
+    """
+    A text extractor for one file type, resolved on first use.
+    """
+
+    def __init__(self, file_type: str, extract: Union[str, Callable], mime_types: Iterable[str] = (),
+                 path_loader: Optional[str] = None, paged: bool = False, tabular: bool = False):
+        """
+        Initialize the ExtractorPlugin.
+
+        Args:
+            file_type (str): The file extension the plugin handles, e.g. 'pdf'.
+            extract (Union[str, Callable]): A function, or its ``'module:function'`` import path, called
+                as ``extract(file, file_type, file_extractor)`` with a file-like object, the file type and
+                the calling FileExtractor. It returns the text of each part of the document.
+            mime_types (Iterable[str]): The MIME types of files downloaded as this file type.
+            path_loader (str, optional): The ``'module:class'`` import path of a Langchain loader for
+                local file paths.
+            paged (bool): Whether the extracted parts are real pages, with headers and footers.
+            tabular (bool): Whether the extracted text is delimited rows of cells.
+        """
+        self.file_type = file_type
+        self.mime_types = tuple(mime_types)
+        self.path_loader = path_loader
+        self.paged = paged
+        self.tabular = tabular
+        self._extract = extract
+        self.loaded = False
+
+    def extract(self, file, file_extractor) -> List[str]:
+        """
+        Extract the text of a document, importing the parser on first use.
+
+        Args:
+            file: A file-like object containing the document content.
+            file_extractor (FileExtractor): The calling extractor, which holds the parser settings.
+
+        Returns:
+            List[str]: The text of each part of the document.
+        """
+        extract = _resolve(self._extract)
+        self.loaded = True
+        return list(extract(file, self.file_type, file_extractor))
+
+    def load_path(self, path: str) -> List[Any]:
+        """
+        Load a local file or URL with the plugin's Langchain loader.
+
+        Args:
+            path (str): The file path or URL.
+
+        Returns:
+            List[Document]: The loaded Langchain documents.
+
+        Raises:
+            ValueError: If the plugin has no loader for paths.
+        """
+        if self.path_loader is None:
+            raise ValueError(f"Unsupported file type for paths: {self.file_type}")
+        loader = _resolve(self.path_loader)
+        self.loaded = True
+        return loader(path).load()
+
+
+class ExtractorRegistry:
+    """
+    Look up extractor plugins by file type or by MIME type. Later registrations for the
+    same file type or MIME type replace earlier ones.
+
+    Parser pool workers start from a fresh interpreter rather than a fork of the web
+    worker, so they only see plugins registered by the modules they import. Modules that
+    register plugins at import time must be listed in ``PARSER_PRELOAD_MODULES``.
+    """
+
+    def __init__(self):
+        """Initialize an empty ExtractorRegistry."""
+        self._lock = threading.Lock()
+        self._by_file_type: Dict[str, ExtractorPlugin] = {}
+        self._by_mime_type: Dict[str, ExtractorPlugin] = {}
+
+    def register(self, plugin: ExtractorPlugin) -> ExtractorPlugin:
+        """
+        Register a plugin for its file type and MIME types.
+
+        Args:
+            plugin (ExtractorPlugin): The plugin to register.
+
+        Returns:
+            ExtractorPlugin: The registered plugin.
+        """
+        with self._lock:
+            self._by_file_type[plugin.file_type] = plugin
+            for mime_type in plugin.mime_types:
+                self._by_mime_type[mime_type] = plugin
+        return plugin
+
+    def get(self, file_type: str) -> ExtractorPlugin:
+        """
+        Get the plugin for a file type.
+
+        Args:
+            file_type (str): The file extension, e.g. 'docx'.
+
+        Returns:
+            ExtractorPlugin: The registered plugin.
+
+        Raises:
+            ValueError: If no plugin handles the file type.
+        """
+        plugin = self._by_file_type.get(file_type)
+        if plugin is None:
+            raise ValueError(f"Unsupported file type: {file_type}")
+        return plugin
+
+    def for_mime_type(self, mime_type: str) -> ExtractorPlugin:
+        """
+        Get the plugin for a downloaded file's MIME type.
+
+        Args:
+            mime_type (str): The file's MIME type.
+
+        Returns:
+            ExtractorPlugin: The registered plugin.
+
+        Raises:
+            ValueError: If no plugin handles the MIME type.
+        """
+        plugin = self._by_mime_type.get(mime_type)
+        if plugin is None:
+            raise ValueError(f"Unsupported MIME type: {mime_type}")
+        return plugin
+
+    def loaded_file_types(self) -> List[str]:
+        """
+        List the file types whose parsers have been used in this process.
+
+        Returns:
+            List[str]: The file types, sorted.
+        """
+        return sorted(file_type for file_type, plugin in self._by_file_type.items() if plugin.loaded)
+
+
+def extract_docx(file, file_type: str, file_extractor) -> List[str]:
+    """Extract the text of a .docx document."""
+    import docx2txt
+    return [docx2txt.process(file)]
+
+
+def extract_csv(file, file_type: str, file_extractor) -> List[str]:
+    """Extract the rows of a CSV file as comma-separated lines, streamed in its detected encoding."""
+    return list(file_extractor.iter_csv_text(file))
+
+
+def extract_text(file, file_type: str, file_extractor) -> List[str]:
+    """Decode a text file incrementally, in its detected encoding."""
+    return list(file_extractor.iter_plain_text(file))
+
+
+def extract_pdf(file, file_type: str, file_extractor) -> List[str]:
+    """Extract the text of each page of a PDF."""
+    return list(file_extractor.pdf_extractor.iter_pages(file))
+
+
+def extract_workbook(file, file_type: str, file_extractor) -> Iterator[str]:
+    """Extract the text of an .xlsx or .xls workbook's sheets, in parts of bounded size."""
+    return file_extractor.spreadsheet_extractor.iter_sheets(file, file_type)
+
+
+extractor_registry = ExtractorRegistry()
+
+extractor_registry.register(ExtractorPlugin(
+    'docx', extract_docx,
+    mime_types=['application/vnd.openxmlformats-officedocument.wordprocessingml.document'],
+    path_loader='langchain_community.document_loaders:Docx2txtLoader'
+))
+extractor_registry.register(ExtractorPlugin(
+    'csv', extract_csv, mime_types=['text/csv'], path_loader='langchain_community.document_loaders:CSVLoader',
+    tabular=True
+))
+extractor_registry.register(ExtractorPlugin(
+    'txt', extract_text, mime_types=['text/plain'], path_loader='langchain_community.document_loaders:TextLoader'
+))
+extractor_registry.register(ExtractorPlugin(
+    'pdf', extract_pdf, mime_types=['application/pdf'], path_loader='langchain_community.document_loaders:PyPDFLoader',
+    paged=True
+))
+extractor_registry.register(ExtractorPlugin(
+    'xlsx', extract_workbook,
+    mime_types=['application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'],
+    path_loader='langchain_community.document_loaders:UnstructuredExcelLoader',
+    tabular=True
+))
+extractor_registry.register(ExtractorPlugin(
+    'xls', extract_workbook,
+    mime_types=['application/vnd.ms-excel'],
+    path_loader='langchain_community.document_loaders:UnstructuredExcelLoader',
+    tabular=True
+))
@@ -2,26 +2,90 @@
 
 import os
 import io
-import docx2txt
-from typing import Union, List
+import logging
+from typing import Any, Union, List, Optional, Dict, Tuple, Iterator
 from io import BytesIO
 import csv
-import xlrd
-import openpyxl
-import chardet
+import pandas as pd
 
 from app.services.google_drive.core import DriveCore
+from app.services.google_drive.media_download import SpooledDownload, download_media, open_source, as_buffer
+from app.services.natural_language.extraction_budget import ExtractionBudget
+from app.services.natural_language.extractor_registry import extractor_registry
+from app.services.natural_language.spreadsheet_extractor import SpreadsheetExtractor
+from app.services.natural_language.text_decoder import detect_encoding, open_text, iter_text_parts
+from app.utils.sandbox_pool import SandboxPool
 from googleapiclient.http import MediaIoBaseDownload
-from langchain_community.document_loaders import (
-    Docx2txtLoader,
-    CSVLoader,
-    TextLoader,
-    UnstructuredExcelLoader,
-    PyPDFLoader
-)
-from PyPDF2 import PdfReader
-from langchain_community.document_loaders import PyPDFLoader
 from langchain.schema import Document
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_DOC_MIME_TYPE = 'application/vnd.google-apps.document'
+GOOGLE_SHEET_MIME_TYPE = 'application/vnd.google-apps.spreadsheet'
+GOOGLE_SLIDES_MIME_TYPE = 'application/vnd.google-apps.presentation'
+
+# Google-native files exported straight to plain text, which needs no parsing
+NATIVE_TEXT_EXPORT_MIME_TYPES = frozenset([GOOGLE_DOC_MIME_TYPE, GOOGLE_SLIDES_MIME_TYPE])
+
+# Formats whose leading bytes are a usable document, so an extraction budget can be met
+# by downloading only part of the file
+RANGE_DOWNLOAD_MIME_TYPES = frozenset(['text/plain', 'text/csv'])
+
+# The Drive export endpoint only returns a spreadsheet's first tab as CSV, so each tab's
+# values are read through the Sheets API instead, this many rows per request
+SHEET_VALUES_PAGE_ROWS = 5000
+
+# Parsing untrusted files is CPU- and memory-heavy, so it runs in resource-limited
+# subprocesses shared by every FileExtractor in the web worker. Workers start from a
+# fresh interpreter and import this module, and with it the built-in extractors, and
+# any modules configured to register more
+parser_pool = SandboxPool(
+    size=Config.PARSER_WORKERS,
+    memory_limit_mb=Config.PARSER_MEMORY_LIMIT_MB,
+    cpu_seconds=Config.PARSER_CPU_SECONDS,
+    deadline=Config.PARSER_DEADLINE,
+    preload=[__name__, *Config.PARSER_PRELOAD_MODULES]
+)
+
+
+def parse_document_text(source: Union[bytes, str], file_type: str) -> List[str]:
+    """
+    Parse a document into its text parts. Runs inside parser pool workers.
+
+    Args:
+        source (Union[bytes, str]): The document content, or the path of its spill file.
+        file_type (str): The type of the file (e.g., 'docx', 'csv', 'txt', 'xlsx').
+
+    Returns:
+        List[str]: The text of each part of the document.
+    """
+    with open_source(source) as file:
+        documents = FileExtractor(drive_core=None).load_document(file, file_type)
+        return [document.page_content for document in documents]
+
+
+def parse_dataframes(source: Union[bytes, str], file_type: str) -> Dict[str, pd.DataFrame]:
+    """
+    Parse a spreadsheet or CSV file into DataFrames. Runs inside parser pool workers.
+
+    Args:
+        source (Union[bytes, str]): The file content, or the path of its spill file.
+        file_type (str): The type of the file ('xlsx', 'xls' or 'csv').
+
+    Returns:
+        Dict[str, pd.DataFrame]: Sheet names mapped to DataFrames.
+    """
+    with open_source(source) as file:
+        return FileExtractor(drive_core=None).load_dataframes(file, file_type)
+
+
+def _source_of(file) -> Union[bytes, str]:
+    """Describe a downloaded file for a parser pool worker: its spill file path, or its bytes."""
+    if isinstance(file, SpooledDownload):
+        return file.source()
+    return bytes(as_buffer(file))
+
 
 class FileExtractor:
     """
@@ -29,16 +93,62 @@ class FileExtractor:
     Google Docs, Google Sheets, Excel files, and files stored on Google Drive.
     """
 
-    def __init__(self, drive_core: DriveCore):
+    def __init__(self, drive_core: DriveCore, sandbox: Optional[SandboxPool] = None):
         """
         Initialize FileExtractor with a DriveCore instance.
 
         Args:
             drive_core (DriveCore): An instance of the DriveCore class for Google Drive operations.
+            sandbox (SandboxPool, optional): The pool that parses downloaded files. Files are
+                parsed in-process if not provided.
         """
         self.drive_core = drive_core
+        self.sandbox = sandbox
+        self._pdf_extractor = None
+        self.spreadsheet_extractor = SpreadsheetExtractor(
+            max_rows_per_sheet=Config.SPREADSHEET_MAX_ROWS_PER_SHEET,
+            max_cells_per_sheet=Config.SPREADSHEET_MAX_CELLS_PER_SHEET,
+            max_columns_per_row=Config.SPREADSHEET_MAX_COLUMNS,
+            part_chars=Config.TEXT_PART_CHARS
+        )
+
+    @property
+    def pdf_extractor(self):
+        """
+        The PdfExtractor, created on first use so PyPDF2 is only imported by workers that parse PDFs.
+        """
+        if self._pdf_extractor is None:
+            from app.services.natural_language.pdf_extractor import PdfExtractor
+            self._pdf_extractor = PdfExtractor(
+                max_pages=Config.PDF_MAX_PAGES,
+                page_timeout=Config.PDF_PAGE_TIMEOUT,
+                parallel_threshold=Config.PDF_PARALLEL_PAGE_THRESHOLD,
+                pages_per_task=Config.PDF_PAGES_PER_TASK,
+                max_workers=Config.PARSER_WORKERS,
+                executor=self.sandbox
+            )
+        return self._pdf_extractor
+
+    def _download(self, request, max_bytes: Optional[int] = None) -> SpooledDownload:
+        """
+        Download a media or export request in chunks, spilling large files to disk.
+
+        Args:
+            request: A Drive ``get_media`` or ``export_media`` request.
+            max_bytes (int, optional): Download only the leading bytes of the file, up to the last complete line.
+
+        Returns:
+            SpooledDownload: The downloaded content. Close it to remove any spill file.
+        """
+        return download_media(
+            request,
+            spool_threshold=Config.DOWNLOAD_SPOOL_THRESHOLD_MB * 1024 * 1024,
+            chunk_size=Config.DOWNLOAD_CHUNK_SIZE_MB * 1024 * 1024,
+            directory=Config.DOWNLOAD_TEMP_DIR,
+            max_bytes=max_bytes
+        )
 
-    def convert_google_doc_to_docx(self, file_id: str) -> BytesIO:
+    def convert_google_doc_to_docx(self, file_id: str) -> SpooledDownload:
         """
         Convert a Google Doc to .docx format.
 
@@ -46,7 +156,7 @@ class FileExtractor:
             file_id (str): The ID of the Google Doc file.
 
         Returns:
-            BytesIO: A file-like object containing the .docx content.
+            SpooledDownload: A file-like object containing the .docx content.
 
         Raises:
             Exception: If there's an error during the conversion process.
@@ -55,10 +165,9 @@ class FileExtractor:
             fileId=file_id,
             mimeType='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
         )
-        file = BytesIO(request.execute())
-        return file
+        return self._download(request)
 
-    def convert_google_sheet_to_xlsx(self, file_id: str) -> BytesIO:
+    def convert_google_sheet_to_xlsx(self, file_id: str) -> SpooledDownload:
         """
         Convert a Google Sheet to .xlsx format.
 
@@ -66,7 +175,7 @@ class FileExtractor:
             file_id (str): The ID of the Google Sheet file.
 
         Returns:
-            BytesIO: A file-like object containing the .xlsx content.
+            SpooledDownload: A file-like object containing the .xlsx content.
 
         Raises:
             Exception: If there's an error during the conversion process.
@@ -75,15 +184,93 @@ class FileExtractor:
             fileId=file_id,
             mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
-        file = io.BytesIO(request.execute())
-        return file
+        return self._download(request)
+
+    def export_google_file_as_text(self, file_id: str) -> SpooledDownload:
+        """
+        Export a Google Doc or Google Slides presentation as plain text.
+
+        Args:
+            file_id (str): The ID of the Google Doc or presentation.
+
+        Returns:
+            SpooledDownload: A file-like object containing the UTF-8 text.
+
+        Raises:
+            Exception: If there's an error during the export.
+        """
+        request = self.drive_core.drive_service.files().export_media(fileId=file_id, mimeType='text/plain')
+        return self._download(request)
+
+    def list_google_sheet_tabs(self, file_id: str) -> List[Dict[str, Any]]:
+        """
+        List the tabs of a Google Sheet that hold cells, skipping chart and object sheets.
+
+        Args:
+            file_id (str): The ID of the Google Sheet file.
+
+        Returns:
+            List[Dict[str, Any]]: Each tab's properties, including 'sheetId', 'title' and
+                'gridProperties', in tab order.
+        """
+        response = self.drive_core.sheets_service.spreadsheets().get(
+            spreadsheetId=file_id,
+            fields='sheets.properties(sheetId,title,sheetType,gridProperties.rowCount)'
+        ).execute()
+        return [sheet['properties'] for sheet in response.get('sheets', [])
+                if sheet['properties'].get('sheetType', 'GRID') == 'GRID']
+
+    def iter_google_sheet_tab_rows(self, file_id: str, tab: Dict[str, Any]) -> Iterator[List[str]]:
+        """
+        Read the formatted cell values of one tab of a Google Sheet, a page of rows at a time.
+
+        Args:
+            file_id (str): The ID of the Google Sheet file.
+            tab (Dict[str, Any]): The tab's properties from ``list_google_sheet_tabs``.
+
+        Yields:
+            List[str]: The cell values of each row, as displayed in the sheet. Trailing empty
+                cells and rows are omitted.
+        """
+        title = tab['title'].replace("'", "''")
+        row_count = tab.get('gridProperties', {}).get('rowCount', SHEET_VALUES_PAGE_ROWS)
+        for start in range(1, row_count + 1, SHEET_VALUES_PAGE_ROWS):
+            end = min(start + SHEET_VALUES_PAGE_ROWS - 1, row_count)
+            response = self.drive_core.sheets_service.spreadsheets().values().get(
+                spreadsheetId=file_id,
+                range=f"'{title}'!{start}:{end}",
+                majorDimension='ROWS'
+            ).execute()
+            yield from response.get('values', [])
+
+    def iter_google_sheet_text(self, file_id: str) -> Iterator[str]:
+        """
+        Yield the text of each tab of a Google Sheet from its cell values.
+
+        Rows are formatted and capped like uploaded workbooks, without exporting and parsing .xlsx.
+        Reading a tab stops once its row cap is reached.
+
+        Args:
+            file_id (str): The ID of the Google Sheet file.
+
+        Yields:
+            str: Parts of about ``TEXT_PART_CHARS`` characters of the tabs' rows, one per line.
+                The first part of each tab with a non-empty row starts with the tab name.
+        """
+        for tab in self.list_google_sheet_tabs(file_id):
+            lines = self.spreadsheet_extractor.iter_rows(self.iter_google_sheet_tab_rows(file_id, tab))
+            yield from self.spreadsheet_extractor.iter_parts(lines, heading=f"Sheet: {tab['title']}")
 
     def load_document(self, file: Union[str, BytesIO], file_type: str) -> List[Document]:
         """
-        Load a document using the appropriate Langchain loader.
+        Load a document with the extractor plugin registered for its file type.
+
+        File-like objects are parsed by the plugin's extractor, and paths and URLs by its
+        Langchain loader. Either is imported on first use.
 
         Args:
-            file (Union[str, BytesIO]): A file path, URL, or BytesIO object containing the document content.
+            file (Union[str, BytesIO]): A file path or URL, or a file-like object such as a BytesIO or
+                SpooledDownload containing the document content.
             file_type (str): The type of the file (e.g., 'docx', 'csv', 'txt', 'pdf', 'xlsx').
 
         Returns:
@@ -93,64 +280,10 @@ class FileExtractor:
             ValueError: If the file type is not supported.
             Exception: If there's an error during the loading process.
         """
-        if file_type == 'docx':
-            if isinstance(file, BytesIO):
-                text = docx2txt.process(file)
-                return [Document(page_content=text)]
-            else:
-                loader = Docx2txtLoader(file)
-        elif file_type == 'csv':
-            if isinstance(file, BytesIO):
-                detected = chardet.detect(file.getvalue())
-                encoding = detected['encoding']
-                csv_reader = csv.reader(io.StringIO(file.getvalue().decode(encoding)))
-                rows = list(csv_reader)
-                text = "\n".join([",".join(row) for row in rows])
-                return [Document(page_content=text)]
-            else:
-                loader = CSVLoader(file)
-        elif file_type == 'txt':
-            if isinstance(file, BytesIO):
-                text = file.getvalue().decode('utf-8')
-                return [Document(page_content=text)]
-            else:
-                loader = TextLoader(file)
-        elif file_type == 'pdf':
-            if isinstance(file, BytesIO):
-                pdf_reader = PdfReader(file)
-                documents = []
-                for page in pdf_reader.pages:
-                    text = page.extract_text()
-                    documents.append(Document(page_content=text))
-                return documents
-            else:
-                loader = PyPDFLoader(file)
-        elif file_type in ['xlsx', 'xls']:
-            if isinstance(file, BytesIO):
-                if file_type == 'xlsx':
-                    workbook = openpyxl.load_workbook(file)
-                    sheets = workbook.sheetnames
-                else:  # xls
-                    workbook = xlrd.open_workbook(file_contents=file.getvalue())
-                    sheets = workbook.sheet_names()
-                
-                text = []
-                for sheet_name in sheets:
-                    if file_type == 'xlsx':
-                        sheet = workbook[sheet_name]
-                        sheet_text = "\n".join([" ".join(str(cell.value) for cell in row) for row in sheet.iter_rows()])
-                    else:  # xls
-                        sheet = workbook.sheet_by_name(sheet_name)
-                        sheet_text = "\n".join([" ".join(str(sheet.cell_value(row, col)) for col in range(sheet.ncols)) for row in range(sheet.nrows)])
-                    text.append(f"Sheet: {sheet_name}\n{sheet_text}")
-                
-                return [Document(page_content="\n\n".join(text))]
-            else:
-                loader = UnstructuredExcelLoader(file)
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
-        
-        return loader.load()
+        plugin = extractor_registry.get(file_type)
+        if isinstance(file, str):
+            return plugin.load_path(file)
+        return [Document(page_content=text) for text in plugin.extract(file, self)]
 
     def download_file_from_google_drive(self, file_id: str, file_name: str) -> str:
         """
@@ -177,7 +310,7 @@ class FileExtractor:
         fh.close()
         return file_name
 
-    def extract_text_from_drive_file(self, file_id: str, file_name: str) -> str:
+    def extract_text_from_drive_file(self, file_id: str, file_name: str, mime_type: Optional[str] = None) -> str:
         """
         Download and extract text from a Google Drive file using Langchain loaders.
 
@@ -187,6 +320,7 @@ class FileExtractor:
         Args:
             file_id (str): The ID of the file in Google Drive.
             file_name (str): The name of the file.
+            mime_type (str, optional): The file's MIME type if already known. Fetched from Drive if not provided.
 
         Returns:
             str: The extracted text content from the file. Returns an empty string if
@@ -195,34 +329,247 @@ class FileExtractor:
         Raises:
             Exception: If there's an error during the extraction process that cannot be handled.
         """
-        # Get file metadata to determine the MIME type
-        file_metadata = self.drive_core.drive_service.files().get(fileId=file_id, fields='mimeType').execute()
-        mime_type = file_metadata['mimeType']
+        return "\n\n".join(self.iter_text_from_drive_file(file_id, file_name, mime_type))
+
+    def iter_document_text(self, file: BytesIO, file_type: str, max_pages: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield a document's text piece by piece, page by page for PDFs.
+
+        Args:
+            file (BytesIO): A file-like object containing the document content.
+            file_type (str): The type of the file (e.g., 'docx', 'csv', 'txt', 'pdf', 'xlsx').
+            max_pages (int, optional): Extract at most this many PDF pages.
+
+        Yields:
+            str: The text of each page or document part, in order.
+
+        Raises:
+            ValueError: If the file type is not supported.
+        """
+        if file_type == 'pdf':
+            source = _source_of(file) if self.sandbox is not None else None
+            yield from self.pdf_extractor.iter_pages(file, source, max_pages=max_pages)
+        elif file_type == 'txt':
+            # Decoding text needs no parser, so it is not worth a round trip to the sandbox
+            yield from self.iter_plain_text(file)
+        elif file_type == 'csv':
+            yield from self.iter_csv_text(file)
+        elif file_type in ('xlsx', 'xls') and self.sandbox is None:
+            # Streamed a part at a time, so a budget can stop reading the workbook early
+            yield from self.spreadsheet_extractor.iter_sheets(file, file_type)
+        elif self.sandbox is not None:
+            yield from self.sandbox.run(parse_document_text, _source_of(file), file_type)
+        else:
+            for document in self.load_document(file, file_type):
+                yield document.page_content
+
+    def iter_plain_text(self, file: BytesIO) -> Iterator[str]:
+        """
+        Decode a plain text file incrementally, in its detected encoding.
+
+        Args:
+            file (BytesIO): A file-like object containing the text.
+
+        Yields:
+            str: The text in parts of about ``TEXT_PART_CHARS`` characters, split at line ends.
+        """
+        with open_text(file, sample_size=Config.TEXT_ENCODING_SAMPLE_KB * 1024) as text:
+            yield from iter_text_parts(text, Config.TEXT_PART_CHARS)
+
+    def iter_csv_text(self, file: BytesIO) -> Iterator[str]:
+        """
+        Parse a CSV file row by row, in its detected encoding.
+
+        Rows are formatted and capped in rows, cells and columns like workbook sheets. A row
+        the CSV parser cannot read, such as one with an oversized field, ends the text there.
+
+        Args:
+            file (BytesIO): A file-like object containing the CSV content.
+
+        Yields:
+            str: The rows, one per line, in parts of about ``TEXT_PART_CHARS`` characters.
+        """
+        with open_text(file, newline='', sample_size=Config.TEXT_ENCODING_SAMPLE_KB * 1024) as text:
+            lines = self.spreadsheet_extractor.iter_rows(self._iter_csv_rows(text))
+            yield from self.spreadsheet_extractor.iter_parts(lines)
+
+    @staticmethod
+    def _iter_csv_rows(text) -> Iterator[List[str]]:
+        reader = csv.reader(text)
+        try:
+            yield from reader
+        except csv.Error as e:
+            logger.warning(f"Stopped reading CSV at line {reader.line_num}: {e}")
+
+    def iter_text_from_drive_file(self, file_id: str, file_name: str, mime_type: Optional[str] = None,
+                                  budget: Optional[ExtractionBudget] = None) -> Iterator[str]:
+        """
+        Download a Google Drive file and yield its text piece by piece.
+
+        Consumers can start chunking and embedding the first pages of a large PDF while
+        later pages are still being parsed. Google Docs and Slides are exported as plain text
+        and Google Sheets tab by tab as CSV; only uploaded Office files need heavy parsing.
+
+        Args:
+            file_id (str): The ID of the file in Google Drive.
+            file_name (str): The name of the file.
+            mime_type (str, optional): The file's MIME type if already known. Fetched from Drive if not provided.
+            budget (ExtractionBudget, optional): Stop extracting once this budget is spent, downloading
+                only the leading bytes of plain text and CSV files. Its ``truncated`` flag is set if the
+                document was cut short.
+
+        Yields:
+            str: The text of each page or document part, in order.
+
+        Raises:
+            ValueError: If the MIME type is not supported.
+        """
+        parts = self._iter_drive_file_parts(file_id, mime_type, budget)
+        if budget is not None:
+            parts = budget.limit(parts)
+        yield from parts
+
+    def _iter_drive_file_parts(self, file_id: str, mime_type: Optional[str],
+                               budget: Optional[ExtractionBudget]) -> Iterator[str]:
+        if mime_type is None:
+            # Get file metadata to determine the MIME type
+            file_metadata = self.drive_core.drive_service.files().get(fileId=file_id, fields='mimeType').execute()
+            mime_type = file_metadata['mimeType']
+
+        if mime_type == GOOGLE_SHEET_MIME_TYPE:
+            yield from self.iter_google_sheet_text(file_id)
+            return
+        if mime_type in NATIVE_TEXT_EXPORT_MIME_TYPES:
+            file, file_extension = self.export_google_file_as_text(file_id), 'txt'
+        else:
+            max_bytes = budget.download_limit() if budget and mime_type in RANGE_DOWNLOAD_MIME_TYPES else None
+            file, file_extension = self.fetch_drive_file(file_id, mime_type, max_bytes=max_bytes)
+
+        with file:
+            yield from self.iter_document_text(file, file_extension, max_pages=self._page_limit(budget))
+        if budget is not None and file.truncated:
+            budget.truncated = True
+
+    @staticmethod
+    def normalisation_options(mime_type: Optional[str]) -> Dict[str, bool]:
+        """
+        Describe the layout of a file's extracted text, for ``TextNormaliser.normalise``.
+
+        Args:
+            mime_type (str, optional): The file's MIME type.
+
+        Returns:
+            Dict[str, bool]: ``paged`` if the text comes one real page at a time, as for PDFs,
+                and ``tabular`` if it is delimited rows, as for spreadsheets and CSV files.
+        """
+        if mime_type == GOOGLE_SHEET_MIME_TYPE:
+            return {"paged": False, "tabular": True}
+        try:
+            plugin = extractor_registry.for_mime_type(mime_type)
+        except ValueError:
+            # Google Docs and Slides are exported as plain prose
+            return {"paged": False, "tabular": False}
+        return {"paged": plugin.paged, "tabular": plugin.tabular}
+
+    @staticmethod
+    def _page_limit(budget: Optional[ExtractionBudget]) -> Optional[int]:
+        """Parse one page past the budget, so the budget can tell the document was cut short."""
+        return budget.max_pages + 1 if budget and budget.max_pages is not None else None
+
+    def iter_text_from_upload(self, file: BytesIO, mime_type: str,
+                              budget: Optional[ExtractionBudget] = None) -> Iterator[str]:
+        """
+        Yield the text of a file being uploaded to Drive, from the content already in memory.
+
+        Args:
+            file (BytesIO): A file-like object containing the uploaded content.
+            mime_type (str): The MIME type of the content.
+            budget (ExtractionBudget, optional): Stop extracting once this budget is spent. Its
+                ``truncated`` flag is set if the document was cut short.
+
+        Yields:
+            str: The text of each page or document part, in order.
+
+        Raises:
+            ValueError: If the MIME type is not supported.
+        """
+        file_type = extractor_registry.for_mime_type(mime_type).file_type
+        parts = self.iter_document_text(file, file_type, max_pages=self._page_limit(budget))
+        if budget is not None:
+            parts = budget.limit(parts)
+        yield from parts
 
-        if mime_type == 'application/vnd.google-apps.document':
+    def fetch_drive_file(self, file_id: str, mime_type: str,
+                         max_bytes: Optional[int] = None) -> Tuple[SpooledDownload, str]:
+        """
+        Download or export a Google Drive file in a format the loaders can parse.
+
+        Args:
+            file_id (str): The ID of the file in Google Drive.
+            mime_type (str): The file's MIME type.
+            max_bytes (int, optional): Download only the leading bytes of an uploaded file, with
+                HTTP Range requests. Only useful for formats that can be parsed from a prefix.
+
+        Returns:
+            Tuple[SpooledDownload, str]: The file content and the file extension to load it as.
+                Close the content when done to remove any spill file.
+
+        Raises:
+            ValueError: If the MIME type is not supported.
+        """
+        if mime_type == GOOGLE_DOC_MIME_TYPE:
             file = self.convert_google_doc_to_docx(file_id)
             file_extension = 'docx'
-        elif mime_type == 'application/vnd.google-apps.spreadsheet':
+        elif mime_type == GOOGLE_SHEET_MIME_TYPE:
             file = self.convert_google_sheet_to_xlsx(file_id)
             file_extension = 'xlsx'
-        elif mime_type in ['application/pdf', 'text/csv', 'text/plain', 
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'application/vnd.ms-excel',
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
+        else:
+            file_extension = extractor_registry.for_mime_type(mime_type).file_type
             request = self.drive_core.drive_service.files().get_media(fileId=file_id)
-            file = io.BytesIO(request.execute())
-            if mime_type == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet':
-                file_extension = 'xlsx'
-            elif mime_type == 'application/vnd.ms-excel':
-                file_extension = 'xls'
-            elif mime_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
-                file_extension = 'docx'
-            else:
-                file_extension = mime_type.split('/')[-1]
+            file = self._download(request, max_bytes=max_bytes)
+
+        return file, file_extension
+
+    def load_dataframes(self, file: BytesIO, file_type: str) -> Dict[str, pd.DataFrame]:
+        """
+        Load a spreadsheet or CSV file as typed DataFrames.
+
+        Args:
+            file (BytesIO): A file-like object containing the spreadsheet content.
+            file_type (str): The type of the file ('xlsx', 'xls' or 'csv').
+
+        Returns:
+            Dict[str, pd.DataFrame]: Sheet names mapped to DataFrames.
+
+        Raises:
+            ValueError: If the file type is not a spreadsheet type.
+        """
+        if file_type in ['xlsx', 'xls']:
+            engine = 'openpyxl' if file_type == 'xlsx' else 'xlrd'
+            frames = pd.read_excel(file, sheet_name=None, engine=engine)
+        elif file_type == 'csv':
+            file.seek(0)
+            encoding = detect_encoding(file.read(Config.TEXT_ENCODING_SAMPLE_KB * 1024))
+            file.seek(0)
+            frames = {'Sheet1': pd.read_csv(file, encoding=encoding, sep=None, engine='python')}
         else:
-            raise ValueError(f"Unsupported MIME type: {mime_type}")
+            raise ValueError(f"Unsupported spreadsheet type: {file_type}")
 
-        documents = self.load_document(file, file_extension)
-        extracted_text = "\n\n".join([doc.page_content for doc in documents])
-        
-        return extracted_text
\ No newline at end of file
+        return {str(name): frame.dropna(how='all').dropna(axis=1, how='all') for name, frame in frames.items()}
+
+    def extract_dataframes_from_drive_file(self, file_id: str, mime_type: str) -> Dict[str, pd.DataFrame]:
+        """
+        Download a spreadsheet from Google Drive and load it as typed DataFrames.
+
+        Args:
+            file_id (str): The ID of the file in Google Drive.
+            mime_type (str): The file's MIME type.
+
+        Returns:
+            Dict[str, pd.DataFrame]: Sheet names mapped to DataFrames.
+        """
+        file, file_extension = self.fetch_drive_file(file_id, mime_type)
+        with file:
+            if self.sandbox is not None:
+                return self.sandbox.run(parse_dataframes, _source_of(file), file_extension)
+            return self.load_dataframes(file, file_extension)
@@ -0,0 +1,79 @@
+"""
+This module provides the IngestPlanner class for deciding how each file in a bulk upload is handled.
+
+It looks up Drive metadata and existing vector store metadata for all files at once, so the
+per-file ingest work can start without any further freshness round trips.
+"""
+
+from typing import Dict, Any, List
+
+SKIP = 'skip'
+RESELECT = 'reselect'
+REINDEX = 'reindex'
+UNAVAILABLE = 'unavailable'
+
+
+class IngestPlanner:
+    """
+    Classify files for ingestion using batched Drive and Pinecone lookups.
+
+    Each file is assigned one of the following actions:
+        - skip: the stored version is current and already selected.
+        - reselect: the stored version is current but not selected.
+        - reindex: the file is new or has changed since it was stored.
+        - unavailable: the file's Drive metadata could not be retrieved.
+    """
+
+    def __init__(self, drive_service, pinecone_manager):
+        """
+        Initialize the IngestPlanner.
+
+        Args:
+            drive_service (DriveService): The DriveService used for batched metadata lookups.
+            pinecone_manager (PineconeManager): The PineconeManager used for multi-ID fetches.
+        """
+        self.drive_service = drive_service
+        self.pinecone_manager = pinecone_manager
+
+    @staticmethod
+    def classify(file_details: Dict[str, Any], existing_metadata: Dict[str, Any]) -> str:
+        """
+        Decide the ingest action for a single file.
+
+        Args:
+            file_details (Dict[str, Any]): The file's Drive metadata, or None if unavailable.
+            existing_metadata (Dict[str, Any]): The stored document metadata, an empty dict if the
+                document is not stored, or None if the lookup failed.
+
+        Returns:
+            str: One of SKIP, RESELECT, REINDEX or UNAVAILABLE.
+        """
+        if not file_details:
+            return UNAVAILABLE
+        if not existing_metadata or existing_metadata.get('lastModified') != file_details.get('modifiedTime'):
+            return REINDEX
+        if existing_metadata.get('isSelected'):
+            return SKIP
+        return RESELECT
+
+    def plan(self, file_ids: List[str], user_id: str) -> List[Dict[str, Any]]:
+        """
+        Build an ingest plan for a list of files.
+
+        Args:
+            file_ids (List[str]): The IDs of the files in Google Drive.
+            user_id (str): The ID of the user whose namespace holds the documents.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per file, in input order, containing the file ID,
+                the chosen action, its Drive details and its existing metadata.
+        """
+        file_details = self.drive_service.get_multiple_file_details(file_ids)
+        existing_metadata = self.pinecone_manager.get_multiple_document_metadata(file_ids, user_id)
+
+        return [{
+            "file_id": file_id,
+            "action": self.classify(file_details.get(file_id), existing_metadata.get(file_id)),
+            "file_details": file_details.get(file_id),
+            "existing_metadata": existing_metadata.get(file_id)
+        } for file_id in file_ids]
@@ -0,0 +1,260 @@
+"""
+This module provides the ModelRouter class for choosing and failing over between chat models.
+
+Requests are routed by estimated prompt size and question complexity, every model call has its
+own timeout, and throttled or timed-out models are skipped for a cooldown period while the
+request fails over along the configured chain.
+"""
+
+import re
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_openai import ChatOpenAI
+from openai import RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
+
+from app.utils.token_utils import count_tokens
+
+logger = logging.getLogger(__name__)
+
+FAILOVER_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError, TimeoutError)
+
+LATENCY_BUCKETS = (0.5, 1, 2, 4, 8, 16, 32, 64)
+
+CONTEXT_WINDOWS = {
+    'gpt-4o-mini': 128000,
+    'gpt-4o': 128000,
+    'gpt-4.1-mini': 1000000,
+    'gpt-4.1': 1000000,
+    'gpt-3.5-turbo': 16385
+}
+
+COMPLEX_QUESTION_PATTERN = re.compile(
+    r"\b(compare|contrast|analy[sz]e|evaluate|explain why|why|reason|implications?|trade-?offs?|"
+    r"differences?|summari[sz]e all|across|step by step|calculate|derive)\b",
+    re.IGNORECASE
+)
+
+
+def parse_model_chain(chain: str, default_timeout: float) -> List[Dict[str, Any]]:
+    """
+    Parse a model chain setting such as ``"gpt-4o-mini:30,gpt-4o:60"``.
+
+    Args:
+        chain (str): Comma-separated model names, each optionally followed by ``:<timeout seconds>``.
+        default_timeout (float): Timeout for models without an explicit one.
+
+    Returns:
+        List[Dict[str, Any]]: Model entries with 'name' and 'timeout', weakest first.
+    """
+    models = []
+    for entry in chain.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, timeout = entry.partition(':')
+        models.append({"name": name.strip(), "timeout": float(timeout) if timeout else default_timeout})
+    return models
+
+
+class ModelRouter:
+    """
+    Route chat requests across a chain of models with timeouts and failover.
+
+    The chain is ordered from the cheapest model to the most capable one. Simple questions
+    may use any model, while complex questions prefer models from the second position on.
+    Among the eligible models the fastest healthy one, by observed latency, is tried first.
+    Models that hit a rate limit or timeout are considered unhealthy for ``cooldown`` seconds.
+
+    The router exposes ``invoke`` like a single chat model, so it can be used in its place.
+    """
+
+    def __init__(self, models: List[Dict[str, Any]], temperature: float = 0.3, cooldown: float = 30,
+                 llm_factory: Optional[Callable[[str, float], Any]] = None, usage_tracker=None):
+        """
+        Initialize the ModelRouter.
+
+        Args:
+            models (List[Dict[str, Any]]): Model entries with 'name' and 'timeout', weakest first.
+            temperature (float): Sampling temperature for all models.
+            cooldown (float): Seconds a failing model is skipped for.
+            llm_factory (Callable, optional): Builds a chat model from a name and timeout.
+                Defaults to ChatOpenAI.
+            usage_tracker (UsageTracker, optional): Records tokens, latency and retries of every call.
+        """
+        if not models:
+            raise ValueError("At least one model must be configured")
+        self.models = models
+        self.temperature = temperature
+        self.cooldown = cooldown
+        self.llm_factory = llm_factory or self._create_chat_model
+        self.usage_tracker = usage_tracker
+        self._llms = {}
+        self._lock = threading.Lock()
+        self._stats = {model['name']: {
+            "histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+            "calls": 0,
+            "failures": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "ewma_latency": None,
+            "unhealthy_until": 0.0
+        } for model in models}
+
+    def _create_chat_model(self, name: str, timeout: float):
+        return ChatOpenAI(
+            temperature=self.temperature,
+            model_name=name,
+            max_tokens=None,
+            timeout=timeout,
+            max_retries=0
+        )
+
+    def _get_llm(self, model: Dict[str, Any]):
+        with self._lock:
+            if model['name'] not in self._llms:
+                self._llms[model['name']] = self.llm_factory(model['name'], model['timeout'])
+            return self._llms[model['name']]
+
+    @staticmethod
+    def _prompt_text(prompt) -> str:
+        if isinstance(prompt, str):
+            return prompt
+        return "\n".join(str(getattr(message, 'content', message)) for message in prompt)
+
+    @staticmethod
+    def _token_usage(response) -> Dict[str, int]:
+        metadata = getattr(response, 'response_metadata', None)
+        usage = (metadata.get('token_usage') or {}) if isinstance(metadata, dict) else {}
+        details = usage.get('prompt_tokens_details') or {}
+        return {
+            "prompt_tokens": usage.get('prompt_tokens') or 0,
+            "completion_tokens": usage.get('completion_tokens') or 0,
+            "cached_tokens": details.get('cached_tokens') or 0
+        }
+
+    @staticmethod
+    def is_complex(question: str) -> bool:
+        """
+        Estimate whether a question needs a more capable model.
+
+        Args:
+            question (str): The question text.
+
+        Returns:
+            bool: True for long, multi-part or analytical questions.
+        """
+        return (len(question.split()) > 40
+                or question.count('?') > 1
+                or bool(COMPLEX_QUESTION_PATTERN.search(question)))
+
+    def route(self, prompt_tokens: int, complex_question: bool) -> List[Dict[str, Any]]:
+        """
+        Order the configured models for a request.
+
+        Args:
+            prompt_tokens (int): The estimated prompt size in tokens.
+            complex_question (bool): Whether the question needs a more capable model.
+
+        Returns:
+            List[Dict[str, Any]]: The models to try, in order.
+        """
+        now = time.monotonic()
+        minimum_rank = 1 if complex_question and len(self.models) > 1 else 0
+        fitting = [(rank, model) for rank, model in enumerate(self.models)
+                   if prompt_tokens < CONTEXT_WINDOWS.get(model['name'], 128000)]
+        if not fitting:
+            fitting = list(enumerate(self.models))
+
+        def preference(item):
+            rank, model = item
+            stats = self._stats[model['name']]
+            latency = stats['ewma_latency']
+            return (stats['unhealthy_until'] > now,
+                    latency is None,
+                    latency if latency is not None else rank)
+
+        preferred = sorted([item for item in fitting if item[0] >= minimum_rank], key=preference)
+        fallbacks = sorted([item for item in fitting if item[0] < minimum_rank], key=lambda item: -item[0])
+        return [model for _, model in preferred + fallbacks]
+
+    def _record_success(self, name: str, latency: float, usage: Optional[Dict[str, int]] = None) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            if usage:
+                stats['prompt_tokens'] += usage['prompt_tokens']
+                stats['cached_tokens'] += usage['cached_tokens']
+            bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound), len(LATENCY_BUCKETS))
+            stats['histogram'][bucket] += 1
+            stats['calls'] += 1
+            stats['ewma_latency'] = latency if stats['ewma_latency'] is None else 0.8 * stats['ewma_latency'] + 0.2 * latency
+            stats['unhealthy_until'] = 0.0
+
+    def _record_failure(self, name: str) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            stats['calls'] += 1
+            stats['failures'] += 1
+            stats['unhealthy_until'] = time.monotonic() + self.cooldown
+
+    def invoke(self, prompt, question: Optional[str] = None, user_id: Optional[str] = None):
+        """
+        Send a prompt to the best available model, failing over on throttling or timeouts.
+
+        Args:
+            prompt: A prompt string or a list of chat messages.
+            question (str, optional): The user's question, used to estimate complexity.
+                Defaults to the prompt text.
+            user_id (str, optional): The user to attribute the call's usage to, for calls made
+                outside their request. Defaults to the session user.
+
+        Returns:
+            The chat model response.
+
+        Raises:
+            Exception: The last failover error if every model failed, or any other model error.
+        """
+        prompt_text = self._prompt_text(prompt)
+        chain = self.route(count_tokens(prompt_text), self.is_complex(question or prompt_text))
+
+        last_error = None
+        for model in chain:
+            start = time.monotonic()
+            try:
+                response = self._get_llm(model).invoke(prompt)
+            except FAILOVER_ERRORS as e:
+                self._record_failure(model['name'])
+                logger.warning(f"Model {model['name']} failed with {type(e).__name__}, failing over")
+                last_error = e
+                continue
+            latency = time.monotonic() - start
+            usage = self._token_usage(response)
+            self._record_success(model['name'], latency, usage)
+            if self.usage_tracker is not None:
+                self.usage_tracker.record('chat', model=model['name'], latency=latency,
+                                          retries=chain.index(model), user_id=user_id, **usage)
+            return response
+
+        raise last_error
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Report per-model call counts, failures, health, prompt cache use and latency histograms.
+
+        Returns:
+            Dict[str, Any]: Model names mapped to their statistics.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {name: {
+                "calls": stats['calls'],
+                "failures": stats['failures'],
+                "healthy": stats['unhealthy_until'] <= now,
+                "prompt_tokens": stats['prompt_tokens'],
+                "cached_tokens": stats['cached_tokens'],
+                "cache_hit_ratio": stats['cached_tokens'] / stats['prompt_tokens'] if stats['prompt_tokens'] else 0.0,
+                "ewma_latency_seconds": stats['ewma_latency'],
+                "latency_histogram": dict(zip([f"le_{bound}" for bound in LATENCY_BUCKETS] + ["le_inf"], stats['histogram']))
+            } for name, stats in self._stats.items()}
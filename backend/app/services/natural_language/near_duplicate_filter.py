@@ -0,0 +1,209 @@
+"""
+This module provides the NearDuplicateFilter class for removing repeated passages from query context.
+
+Selected documents are often several versions of the same file. Their passages are compared with
+MinHash signatures bucketed by locality-sensitive hashing, and only the copy from the most
+recently modified document is kept in each cluster of near-duplicates.
+"""
+
+import re
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from app.utils.token_utils import count_tokens
+
+# Smallest prime above 2**32, so 32-bit shingle hashes can be permuted without overflow
+_HASH_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+class NearDuplicateFilter:
+    """
+    Detect and remove near-duplicate passages across selected documents.
+
+    Each passage is reduced to a MinHash signature over word shingles. Signatures are
+    split into bands, and passages sharing any band are compared by their estimated
+    Jaccard similarity. Signatures are cached by passage hash, so repeated queries over
+    the same selection only hash new text.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.8, shingle_size=5, min_words=8,
+                 cache_size=20000, seed=1):
+        """
+        Initialize the NearDuplicateFilter.
+
+        Args:
+            num_perm (int): Number of hash permutations per signature. Must be divisible by ``bands``.
+            bands (int): Number of LSH bands.
+            threshold (float): Minimum estimated Jaccard similarity for two passages to be duplicates.
+            shingle_size (int): Number of words per shingle.
+            min_words (int): Passages with fewer words are never treated as duplicates.
+            cache_size (int): Maximum number of cached signatures.
+            seed (int): Seed for the permutation coefficients.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.cache_size = cache_size
+
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute or look up the MinHash signature of a passage.
+
+        Args:
+            text (str): The passage text.
+
+        Returns:
+            np.ndarray: The signature as an array of ``num_perm`` unsigned integers.
+        """
+        key = hashlib.sha1(text.encode('utf-8')).digest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        words = text.lower().split()
+        shingles = {" ".join(words[i:i + self.shingle_size])
+                    for i in range(max(1, len(words) - self.shingle_size + 1))}
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+
+        permuted = (np.outer(hashes, self._a) % _HASH_PRIME + self._b) % _HASH_PRIME & _MAX_HASH
+        signature = permuted.min(axis=0)
+
+        with self._lock:
+            self._cache[key] = signature
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return signature
+
+    def find_clusters(self, passages: List[str]) -> List[List[int]]:
+        """
+        Group passages into clusters of near-duplicates.
+
+        Args:
+            passages (List[str]): The passages to compare.
+
+        Returns:
+            List[List[int]]: Clusters of two or more passage indices.
+        """
+        candidates = [index for index, passage in enumerate(passages) if len(passage.split()) >= self.min_words]
+        if len(candidates) < 2:
+            return []
+
+        signatures = np.vstack([self.signature(passages[index]) for index in candidates])
+        parent = list(range(len(candidates)))
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for band in range(self.bands):
+            buckets = {}
+            band_rows = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for position, row in enumerate(band_rows):
+                buckets.setdefault(row.tobytes(), []).append(position)
+            for members in buckets.values():
+                for other in members[1:]:
+                    first, second = find(members[0]), find(other)
+                    if first != second and np.mean(signatures[members[0]] == signatures[other]) >= self.threshold:
+                        parent[second] = first
+
+        clusters = {}
+        for position in range(len(candidates)):
+            clusters.setdefault(find(position), []).append(candidates[position])
+        return [members for members in clusters.values() if len(members) > 1]
+
+    @staticmethod
+    def split_passages(text: str) -> List[str]:
+        """
+        Split text into paragraph-level passages.
+
+        Args:
+            text (str): The text to split.
+
+        Returns:
+            List[str]: The non-empty passages.
+        """
+        return [passage.strip() for passage in re.split(r"\n\s*\n", text) if passage.strip()]
+
+    def filter_documents(self, documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Remove near-duplicate passages, keeping the copy from the newest document.
+
+        Documents are expected in the shape returned by ``PineconeManager.get_selected_documents``.
+        Documents that lose passages have their content, and their chunks if present, rewritten;
+        all other documents are returned unchanged.
+
+        Args:
+            documents (List[Dict[str, Any]]): The selected documents.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], int]: The filtered documents and the number of tokens removed.
+        """
+        # (document position, chunk position or None, passage)
+        passages = []
+        for doc_position, doc in enumerate(documents):
+            metadata = doc['metadata']
+            chunks = metadata.get('chunks')
+            if chunks:
+                for chunk_position, chunk in enumerate(chunks):
+                    passages.extend((doc_position, chunk_position, passage)
+                                    for passage in self.split_passages(chunk['content']))
+            else:
+                passages.extend((doc_position, None, passage)
+                                for passage in self.split_passages(metadata.get('content', '')))
+
+        removed = set()
+        for cluster in self.find_clusters([passage for _, _, passage in passages]):
+            newest = max(cluster, key=lambda index: (
+                documents[passages[index][0]]['metadata'].get('lastModified') or '', -index
+            ))
+            removed.update(index for index in cluster if index != newest)
+
+        if not removed:
+            return documents, 0
+
+        kept = {}
+        for index, (doc_position, chunk_position, passage) in enumerate(passages):
+            if index not in removed:
+                kept.setdefault((doc_position, chunk_position), []).append(passage)
+
+        affected = {passages[index][0] for index in removed}
+        filtered = []
+        for doc_position, doc in enumerate(documents):
+            if doc_position not in affected:
+                filtered.append(doc)
+                continue
+            metadata = dict(doc['metadata'])
+            if metadata.get('chunks'):
+                metadata['chunks'] = [
+                    dict(chunk, content="\n\n".join(kept.get((doc_position, chunk_position), [])))
+                    for chunk_position, chunk in enumerate(metadata['chunks'])
+                ]
+                metadata['chunks'] = [chunk for chunk in metadata['chunks'] if chunk['content']]
+                metadata['content'] = "\n\n".join(chunk['content'] for chunk in metadata['chunks'])
+            else:
+                metadata['content'] = "\n\n".join(kept.get((doc_position, None), []))
+            filtered.append(dict(doc, metadata=metadata))
+
+        removed_tokens = sum(count_tokens(passages[index][2]) for index in removed)
+        return filtered, removed_tokens
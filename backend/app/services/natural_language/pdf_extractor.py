@@ -0,0 +1,188 @@
+"""
+This module provides the PdfExtractor class for extracting PDF text page by page.
+
+Pages are yielded as a generator in page order. Given an executor, such as the sandboxed
+parser pool, PDFs are parsed off the web worker: large ones are split into page ranges
+parsed concurrently, so early pages can be consumed while later ones are still being parsed.
+"""
+
+import signal
+import logging
+import threading
+from contextlib import contextmanager
+from collections import deque
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from io import BytesIO
+from typing import Iterator, List, Optional, Union
+
+from PyPDF2 import PdfReader
+
+from app.services.google_drive.media_download import open_source
+
+logger = logging.getLogger(__name__)
+
+class PageTimeoutError(Exception):
+    """Raised when extracting a single PDF page exceeds its time limit."""
+
+
+@contextmanager
+def _time_limit(seconds: float):
+    """
+    Interrupt the enclosed block with PageTimeoutError after ``seconds``.
+
+    Signals can only be handled on the main thread, so outside it (for example in a
+    threaded web worker) the block runs without a limit. Sandbox worker processes always
+    run tasks on their main thread.
+    """
+    if not seconds or not hasattr(signal, 'SIGALRM') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handle_alarm(signum, frame):
+        raise PageTimeoutError(f"Page extraction exceeded {seconds} seconds")
+
+    previous = signal.signal(signal.SIGALRM, handle_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_pages(reader: PdfReader, start: int, end: int, page_timeout: float) -> Iterator[str]:
+    for number in range(start, end):
+        try:
+            with _time_limit(page_timeout):
+                text = reader.pages[number].extract_text()
+        except Exception as e:
+            logger.warning(f"Skipping PDF page {number + 1}: {str(e)}")
+            text = ''
+        yield text or ''
+
+
+def count_pages(source: Union[bytes, str]) -> int:
+    """
+    Count the pages of a PDF. Runs inside sandbox worker processes.
+
+    Args:
+        source (Union[bytes, str]): The PDF content, or the path of its spill file.
+
+    Returns:
+        int: The number of pages.
+    """
+    with open_source(source) as file:
+        return len(PdfReader(file).pages)
+
+
+def extract_page_range(source: Union[bytes, str], start: int, end: int, page_timeout: float) -> List[str]:
+    """
+    Extract the text of a range of pages. Runs inside sandbox worker processes.
+
+    Args:
+        source (Union[bytes, str]): The PDF content, or the path of its spill file.
+        start (int): The first page index, inclusive.
+        end (int): The last page index, exclusive.
+        page_timeout (float): Seconds allowed per page before it is skipped.
+
+    Returns:
+        List[str]: The text of each page in the range; empty for pages that failed or timed out.
+    """
+    with open_source(source) as file:
+        reader = PdfReader(file)
+        return list(_extract_pages(reader, start, end, page_timeout))
+
+
+class PdfExtractor:
+    """
+    Extract PDF text as a generator of pages.
+
+    At most ``max_pages`` pages are read. With an executor, PDFs with more than
+    ``parallel_threshold`` pages are parsed in ranges of ``pages_per_task`` pages, with a
+    bounded number of ranges in flight so memory stays proportional to the worker count;
+    smaller PDFs are parsed as a single task. Without one, pages are parsed in-process.
+    """
+
+    def __init__(self, max_pages: int = 2000, page_timeout: float = 10, parallel_threshold: int = 32,
+                 pages_per_task: int = 16, max_workers: int = 2, executor: Optional[Executor] = None):
+        """
+        Initialize the PdfExtractor.
+
+        Args:
+            max_pages (int): Maximum number of pages extracted per PDF.
+            page_timeout (float): Seconds allowed per page before it is skipped.
+            parallel_threshold (int): PDFs with more pages than this are parsed on the process pool.
+            pages_per_task (int): Number of pages per pool task.
+            max_workers (int): Number of page ranges parsed concurrently.
+            executor (Executor, optional): The executor to run page ranges on, such as a SandboxPool.
+                Pages are parsed in-process if not provided.
+        """
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.parallel_threshold = parallel_threshold
+        self.pages_per_task = pages_per_task
+        self.max_workers = max_workers
+        self.executor = executor
+
+    def iter_pages(self, file: BytesIO, source: Optional[Union[bytes, str]] = None,
+                   max_pages: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the text of each page in order.
+
+        Args:
+            file (BytesIO): A file-like object containing the PDF content.
+            source (Union[bytes, str], optional): The PDF content, or the path of its spill file,
+                to send to the executor's workers. Defaults to a copy of the file's content.
+            max_pages (int, optional): Extract at most this many pages, if fewer than the extractor's limit.
+
+        Yields:
+            str: The text of each page; empty for pages that failed or timed out.
+        """
+        if self.executor is None:
+            reader = PdfReader(file)
+            page_count = self._cap(len(reader.pages), max_pages)
+            yield from _extract_pages(reader, 0, page_count, self.page_timeout)
+            return
+
+        if source is None:
+            source = file.getvalue()
+        page_count = self._cap(self.executor.submit(count_pages, source).result(), max_pages)
+        pages_per_task = page_count if page_count <= self.parallel_threshold else self.pages_per_task
+        yield from self._iter_pages_parallel(source, page_count, max(pages_per_task, 1))
+
+    def _cap(self, page_count: int, max_pages: Optional[int] = None) -> int:
+        if page_count > self.max_pages:
+            logger.warning(f"PDF has {page_count} pages, extracting only the first {self.max_pages}")
+            page_count = self.max_pages
+        if max_pages is not None:
+            page_count = min(page_count, max_pages)
+        return page_count
+
+    def _iter_pages_parallel(self, source: Union[bytes, str], page_count: int, pages_per_task: int) -> Iterator[str]:
+        ranges = deque((start, min(start + pages_per_task, page_count))
+                       for start in range(0, page_count, pages_per_task))
+        in_flight = deque()
+
+        try:
+            while ranges or in_flight:
+                while ranges and len(in_flight) < self.max_workers * 2:
+                    start, end = ranges.popleft()
+                    future = self.executor.submit(extract_page_range, source, start, end, self.page_timeout)
+                    in_flight.append((start, end, future))
+
+                start, end, future = in_flight.popleft()
+                try:
+                    pages = future.result(timeout=self.page_timeout * (end - start) + 5)
+                except FutureTimeoutError:
+                    logger.warning(f"Timed out extracting PDF pages {start + 1}-{end}")
+                    future.cancel()
+                    pages = [''] * (end - start)
+                except Exception as e:
+                    # Includes a sandbox worker crashing on a malformed page range
+                    logger.warning(f"Failed to extract PDF pages {start + 1}-{end}: {str(e)}")
+                    pages = [''] * (end - start)
+                yield from pages
+        finally:
+            # The consumer may stop early, e.g. on reaching its extraction budget
+            for _, _, future in in_flight:
+                future.cancel()
@@ -0,0 +1,167 @@
+"""
+This module provides the SpreadsheetExtractor class for streaming text out of workbooks.
+
+Workbooks are read row by row with read-only, values-only iteration, so memory stays flat
+regardless of workbook size. Rows are emitted as compact delimiter-separated lines, in
+parts of bounded size, empty rows and trailing empty cells are dropped, and each sheet is
+capped in rows, cells and columns per row.
+"""
+
+import io
+import csv
+import datetime
+import itertools
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from app.services.google_drive.media_download import as_buffer
+
+
+class SpreadsheetExtractor:
+    """
+    Convert xlsx and xls workbooks to text one sheet at a time.
+    """
+
+    def __init__(self, max_rows_per_sheet: int = 10000, max_cells_per_sheet: int = 200000,
+                 max_columns_per_row: int = 256, delimiter: str = ',', part_chars: int = 64 * 1024):
+        """
+        Initialize the SpreadsheetExtractor.
+
+        Args:
+            max_rows_per_sheet (int): Maximum number of non-empty rows emitted per sheet.
+            max_cells_per_sheet (int): Maximum number of cells emitted per sheet.
+            max_columns_per_row (int): Cells of a row beyond this many columns are dropped.
+            delimiter (str): The cell delimiter; cells containing it are quoted.
+            part_chars (int): The target size of each part of text yielded.
+        """
+        self.max_rows_per_sheet = max_rows_per_sheet
+        self.max_cells_per_sheet = max_cells_per_sheet
+        self.max_columns_per_row = max_columns_per_row
+        self.delimiter = delimiter
+        self.part_chars = part_chars
+
+    @staticmethod
+    def format_cell(value: Any) -> str:
+        """
+        Format a cell value compactly.
+
+        Args:
+            value: The cell value.
+
+        Returns:
+            str: An empty string for empty cells, integral floats without a decimal part,
+                ISO format for dates and times, and ``str(value)`` otherwise.
+        """
+        if value is None:
+            return ''
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        return str(value).strip()
+
+    def iter_rows(self, rows: Iterable[Iterable[Any]]) -> Iterator[str]:
+        """
+        Format rows of cell values as delimiter-separated lines within the sheet caps.
+
+        Args:
+            rows (Iterable[Iterable[Any]]): The sheet's rows of cell values.
+
+        Yields:
+            str: One line per non-empty row, followed by a marker if the sheet was truncated.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=self.delimiter, lineterminator='')
+        emitted_rows = 0
+        emitted_cells = 0
+
+        for row in rows:
+            values = [self.format_cell(value) for value in itertools.islice(row, self.max_columns_per_row)]
+            while values and not values[-1]:
+                values.pop()
+            if not values:
+                continue
+
+            if emitted_rows >= self.max_rows_per_sheet or emitted_cells + len(values) > self.max_cells_per_sheet:
+                yield f"[truncated after {emitted_rows} rows]"
+                return
+
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(values)
+            yield buffer.getvalue()
+            emitted_rows += 1
+            emitted_cells += len(values)
+
+    def iter_sheet_rows(self, file: io.BytesIO, file_type: str) -> Iterator[Tuple[str, Iterator[Tuple[Any, ...]]]]:
+        """
+        Open a workbook and yield each sheet's name with an iterator over its rows of values.
+
+        Args:
+            file (BytesIO): A file-like object containing the workbook.
+            file_type (str): Either 'xlsx' or 'xls'.
+
+        Yields:
+            Tuple[str, Iterator[Tuple[Any, ...]]]: The sheet name and its rows. Each row iterator
+                must be consumed before advancing to the next sheet.
+
+        Raises:
+            ValueError: If the file type is not a workbook type.
+        """
+        if file_type == 'xlsx':
+            import openpyxl
+            workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+            try:
+                for sheet_name in workbook.sheetnames:
+                    yield sheet_name, workbook[sheet_name].iter_rows(values_only=True)
+            finally:
+                workbook.close()
+        elif file_type == 'xls':
+            import xlrd
+            workbook = xlrd.open_workbook(file_contents=bytes(as_buffer(file)), on_demand=True)
+            try:
+                for sheet_name in workbook.sheet_names():
+                    sheet = workbook.sheet_by_name(sheet_name)
+                    yield sheet_name, (sheet.row_values(row) for row in range(sheet.nrows))
+                    workbook.unload_sheet(sheet_name)
+            finally:
+                workbook.release_resources()
+        else:
+            raise ValueError(f"Unsupported workbook type: {file_type}")
+
+    def iter_parts(self, lines: Iterable[str], heading: Optional[str] = None) -> Iterator[str]:
+        """
+        Group lines into parts of about ``part_chars`` characters.
+
+        Args:
+            lines (Iterable[str]): The formatted lines, such as from ``iter_rows``.
+            heading (str, optional): A line put before the first part, if there are any lines.
+
+        Yields:
+            str: The lines of each part, one per line.
+        """
+        part, size = ([heading], len(heading) + 1) if heading else ([], 0)
+        has_lines = False
+        for line in lines:
+            part.append(line)
+            size += len(line) + 1
+            has_lines = True
+            if size >= self.part_chars:
+                yield "\n".join(part)
+                part, size = [], 0
+        if part and has_lines:
+            yield "\n".join(part)
+
+    def iter_sheets(self, file: io.BytesIO, file_type: str) -> Iterator[str]:
+        """
+        Yield the text of each sheet with a non-empty row, a part at a time.
+
+        Args:
+            file (BytesIO): A file-like object containing the workbook.
+            file_type (str): Either 'xlsx' or 'xls'.
+
+        Yields:
+            str: Parts of about ``part_chars`` characters of the sheets' rows, one per line.
+                The first part of each sheet starts with the sheet name.
+        """
+        for sheet_name, rows in self.iter_sheet_rows(file, file_type):
+            yield from self.iter_parts(self.iter_rows(rows), heading=f"Sheet: {sheet_name}")
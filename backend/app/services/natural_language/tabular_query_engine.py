@@ -0,0 +1,312 @@
+"""
+This module provides the TabularQueryEngine class for answering questions over spreadsheets.
+
+Instead of sending every cell to the language model, the model only sees each sheet's schema
+and a few sample rows. It replies with a structured aggregation plan, which is validated and
+executed locally with pandas; only the computed result is added to the answer context.
+Plans for all the spreadsheets selected for a question are requested in one call, and
+questions with no sign of a computation skip the call altogether.
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
+
+import pandas as pd
+
+TABULAR_MIME_TYPES = frozenset([
+    'application/vnd.google-apps.spreadsheet',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.ms-excel',
+    'text/csv'
+])
+
+FILTER_OPERATORS = {
+    '==': lambda series, value: series == value,
+    '!=': lambda series, value: series != value,
+    '>': lambda series, value: series > value,
+    '>=': lambda series, value: series >= value,
+    '<': lambda series, value: series < value,
+    '<=': lambda series, value: series <= value,
+    'contains': lambda series, value: series.astype(str).str.contains(str(value), case=False, regex=False),
+    'in': lambda series, value: series.isin(value if isinstance(value, list) else [value])
+}
+
+AGGREGATION_FUNCTIONS = frozenset(['sum', 'mean', 'median', 'min', 'max', 'count', 'nunique'])
+
+# Aggregation and comparison terms suggesting a question needs a computation over rows;
+# questions without any are answered from the schema and sample rows without asking for a plan
+COMPUTATION_HINTS = re.compile(
+    r"\b(?:sum|sums|summed|totals?|totalled|average[sd]?|avg|mean of|median|counts?|counted|"
+    r"how many|how much|number of|max|maximum|min|minimum|highest|lowest|largest|smallest|"
+    r"group(?:ed)? by|sort(?:ed)? by|order(?:ed)? by|rank(?:ed|ing)?|top \d+|bottom \d+|"
+    r"(?:more|less|greater|fewer) than|at (?:least|most)|percentage|proportion)\b|[<>]=?",
+    re.IGNORECASE
+)
+
+
+class TabularQueryError(Exception):
+    """Raised when a tabular query plan is invalid or cannot be executed."""
+
+
+class TabularQueryEngine:
+    """
+    Answer questions over spreadsheet data with locally executed aggregation plans.
+
+    DataFrames are cached in-process per file version, so repeated questions over the
+    same spreadsheet do not download or parse it again.
+    """
+
+    def __init__(self, llm, max_cached_files=16, sample_rows=5, max_result_rows=50):
+        """
+        Initialize the TabularQueryEngine.
+
+        Args:
+            llm: A language model exposing ``invoke(prompt)``.
+            max_cached_files (int): Maximum number of file versions kept in the DataFrame cache.
+            sample_rows (int): Number of sample rows shown to the model per sheet.
+            max_result_rows (int): Maximum number of result rows added to the context.
+        """
+        self.llm = llm
+        self.max_cached_files = max_cached_files
+        self.sample_rows = sample_rows
+        self.max_result_rows = max_result_rows
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_tabular(mime_type: Optional[str]) -> bool:
+        """
+        Check whether a MIME type is handled by the tabular engine.
+
+        Args:
+            mime_type (str): The file's MIME type.
+
+        Returns:
+            bool: True if the file is a spreadsheet or CSV file.
+        """
+        return mime_type in TABULAR_MIME_TYPES
+
+    def get_frames(self, file_id: str, version: str, loader: Callable[[], Dict[str, pd.DataFrame]]) -> Dict[str, pd.DataFrame]:
+        """
+        Return the DataFrames for a file version, loading them on a cache miss.
+
+        Args:
+            file_id (str): The Google Drive file ID.
+            version (str): The file version, such as its modifiedTime.
+            loader (Callable): A zero-argument callable returning sheet names mapped to DataFrames.
+
+        Returns:
+            Dict[str, pd.DataFrame]: The file's sheets as DataFrames.
+        """
+        key = (file_id, version)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        frames = loader()
+
+        with self._lock:
+            self._cache[key] = frames
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached_files:
+                self._cache.popitem(last=False)
+        return frames
+
+    def describe(self, frames: Dict[str, pd.DataFrame]) -> str:
+        """
+        Describe each sheet's schema and a few sample rows.
+
+        Args:
+            frames (Dict[str, pd.DataFrame]): Sheet names mapped to DataFrames.
+
+        Returns:
+            str: A compact textual description of the sheets.
+        """
+        parts = []
+        for sheet_name, frame in frames.items():
+            columns = ", ".join(f"{column} ({dtype})" for column, dtype in frame.dtypes.items())
+            sample = frame.head(self.sample_rows).to_csv(index=False).strip()
+            parts.append(f"Sheet: {sheet_name}\nRows: {len(frame)}\nColumns: {columns}\nSample rows:\n{sample}")
+        return "\n\n".join(parts)
+
+    @staticmethod
+    def needs_computation(question: str) -> bool:
+        """
+        Cheaply check whether a question might need a computation over spreadsheet rows.
+
+        Args:
+            question (str): The user's question.
+
+        Returns:
+            bool: False if the question has no aggregation or comparison terms, such as
+                "total", "average" or "more than", so no plan needs to be requested.
+        """
+        return bool(COMPUTATION_HINTS.search(question or ''))
+
+    def plan(self, question: str, spreadsheets: Dict[str, Dict[str, pd.DataFrame]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Ask the language model, in a single call, for the aggregation plans answering the question.
+
+        Args:
+            question (str): The user's question.
+            spreadsheets (Dict[str, Dict[str, pd.DataFrame]]): Spreadsheet titles mapped to
+                their sheet names mapped to DataFrames.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The parsed plans keyed by spreadsheet title, without the
+                spreadsheets whose data the question needs no computation over.
+        """
+        if not spreadsheets or not self.needs_computation(question):
+            return {}
+
+        tables = "\n\n".join(f"Spreadsheet: {title}\n{self.describe(frames)}"
+                              for title, frames in spreadsheets.items())
+        prompt = f"""You are given the schema of the tables of one or more spreadsheets. Decide whether the question below needs a computation over the rows of any of them. If it does not, reply with [].
+
+        Otherwise reply with a JSON list and nothing else, holding one plan per spreadsheet that needs a computation, using this format:
+        [{{"spreadsheet": "<spreadsheet>",
+          "sheet": "<sheet name>",
+          "filters": [{{"column": "<column>", "op": "==|!=|>|>=|<|<=|contains|in", "value": <value>}}],
+          "group_by": ["<column>"],
+          "aggregations": [{{"column": "<column>", "function": "sum|mean|median|min|max|count|nunique"}}],
+          "sort_by": {{"column": "<column or aggregated column name>", "ascending": false}},
+          "limit": <number of rows>}}]
+        Every key except "spreadsheet" and "sheet" is optional. Aggregated columns are named "<function>_<column>".
+
+        Tables:
+        {tables}
+
+        Question: {question}"""
+        response = self.llm.invoke(prompt)
+        content = response.content if hasattr(response, 'content') else str(response)
+        return self._parse_plans(content, spreadsheets)
+
+    @staticmethod
+    def _parse_plans(content: str, spreadsheets: Dict[str, Dict[str, pd.DataFrame]]) -> Dict[str, Dict[str, Any]]:
+        match = re.search(r"[\[{].*[\]}]", content, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            parsed = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+
+        plans: Dict[str, Dict[str, Any]] = {}
+        for plan in parsed if isinstance(parsed, list) else [parsed]:
+            if not isinstance(plan, dict) or not plan.get('sheet'):
+                continue
+            title = plan.get('spreadsheet')
+            if title not in spreadsheets:
+                # A plan naming no known spreadsheet can only be meant for the sole one
+                if len(spreadsheets) != 1:
+                    continue
+                title = next(iter(spreadsheets))
+            plans.setdefault(title, plan)
+        return plans
+
+    def execute_plan(self, plan: Dict[str, Any], frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Validate and execute an aggregation plan.
+
+        Only whitelisted filter operators and aggregation functions over existing columns
+        are allowed; no model output is ever evaluated as code.
+
+        Args:
+            plan (Dict[str, Any]): The aggregation plan.
+            frames (Dict[str, pd.DataFrame]): Sheet names mapped to DataFrames.
+
+        Returns:
+            pd.DataFrame: The result, truncated to ``max_result_rows`` rows.
+
+        Raises:
+            TabularQueryError: If the plan references unknown sheets, columns, operators or functions.
+        """
+        sheet_name = plan.get('sheet')
+        if sheet_name not in frames:
+            raise TabularQueryError(f"Unknown sheet: {sheet_name}")
+        frame = frames[sheet_name]
+
+        def check_column(column):
+            if column not in frame.columns:
+                raise TabularQueryError(f"Unknown column: {column}")
+            return column
+
+        for condition in plan.get('filters') or []:
+            operator = FILTER_OPERATORS.get(condition.get('op'))
+            if operator is None:
+                raise TabularQueryError(f"Unsupported filter operator: {condition.get('op')}")
+            frame = frame[operator(frame[check_column(condition.get('column'))], condition.get('value'))]
+
+        group_by = [check_column(column) for column in plan.get('group_by') or []]
+        aggregations = plan.get('aggregations') or []
+        for aggregation in aggregations:
+            check_column(aggregation.get('column'))
+            if aggregation.get('function') not in AGGREGATION_FUNCTIONS:
+                raise TabularQueryError(f"Unsupported aggregation: {aggregation.get('function')}")
+
+        if aggregations:
+            named = {
+                f"{aggregation['function']}_{aggregation['column']}": (aggregation['column'], aggregation['function'])
+                for aggregation in aggregations
+            }
+            if group_by:
+                result = frame.groupby(group_by, dropna=False).agg(**named).reset_index()
+            else:
+                result = pd.DataFrame([{
+                    name: frame[column].agg(function) for name, (column, function) in named.items()
+                }])
+        elif group_by:
+            result = frame.groupby(group_by, dropna=False).size().reset_index(name='count')
+        else:
+            result = frame
+
+        sort_by = plan.get('sort_by')
+        if sort_by:
+            if sort_by.get('column') not in result.columns:
+                raise TabularQueryError(f"Unknown sort column: {sort_by.get('column')}")
+            result = result.sort_values(sort_by['column'], ascending=bool(sort_by.get('ascending', False)))
+
+        limit = plan.get('limit')
+        max_rows = max(1, min(int(limit), self.max_result_rows)) if limit else self.max_result_rows
+        return result.head(max_rows)
+
+    def describe_spreadsheet(self, frames: Dict[str, pd.DataFrame], title: str = '') -> str:
+        """
+        Describe a spreadsheet independently of any question.
+
+        Args:
+            frames (Dict[str, pd.DataFrame]): Sheet names mapped to DataFrames.
+            title (str, optional): A label identifying the spreadsheet.
+
+        Returns:
+            str: The spreadsheet's title, schema and sample rows.
+        """
+        return f"Spreadsheet {title}\n{self.describe(frames)}".strip()
+
+    def compute(self, question: str, spreadsheets: Dict[str, Dict[str, pd.DataFrame]]) -> Dict[str, str]:
+        """
+        Compute the part of the answer context that depends on the question.
+
+        Args:
+            question (str): The user's question.
+            spreadsheets (Dict[str, Dict[str, pd.DataFrame]]): Spreadsheet titles mapped to
+                their sheet names mapped to DataFrames.
+
+        Returns:
+            Dict[str, str]: The computed result, or why it could not be computed, keyed by
+                spreadsheet title, for each spreadsheet the question needs a computation over.
+        """
+        results = {}
+        for title, plan in self.plan(question, spreadsheets).items():
+            try:
+                result = self.execute_plan(plan, spreadsheets[title])
+            except (TabularQueryError, KeyError, TypeError, ValueError) as e:
+                results[title] = f"The requested computation over spreadsheet {title} could not be performed: {str(e)}"
+                continue
+            results[title] = (f"Computed result from spreadsheet {title} (plan: {json.dumps(plan, default=str)}):\n"
+                              f"{result.to_csv(index=False).strip()}")
+        return results
@@ -0,0 +1,115 @@
+"""
+This module provides streaming decoding for plain text and CSV files.
+
+The encoding is detected from a bounded sample at the start of the file: a byte order
+mark, then strict UTF-8, then chardet on the sample only. The file is then decoded
+incrementally, so multi-megabyte files are never decoded or held as a single string,
+and undecodable bytes are replaced rather than failing the whole file.
+"""
+
+import io
+import codecs
+from contextlib import contextmanager
+from typing import Iterator, Optional, TextIO
+
+DEFAULT_SAMPLE_SIZE = 64 * 1024
+
+# Byte order marks, longest first so UTF-32 is not mistaken for UTF-16
+_BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+FALLBACK_ENCODING = 'cp1252'
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Detect the encoding of a file from a sample of its leading bytes.
+
+    Args:
+        sample (bytes): The leading bytes of the file. May end mid-character.
+
+    Returns:
+        str: The encoding named by a byte order mark, 'utf-8' if the sample is valid UTF-8,
+            otherwise chardet's guess, falling back to cp1252.
+    """
+    for mark, encoding in _BYTE_ORDER_MARKS:
+        if sample.startswith(mark):
+            return encoding
+
+    try:
+        # Not final: the sample may stop part way through a multi-byte character
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    import chardet
+    encoding = chardet.detect(sample)['encoding']
+    try:
+        return codecs.lookup(encoding).name if encoding else FALLBACK_ENCODING
+    except LookupError:
+        return FALLBACK_ENCODING
+
+
+@contextmanager
+def open_text(file, newline: Optional[str] = None, sample_size: int = DEFAULT_SAMPLE_SIZE) -> Iterator[TextIO]:
+    """
+    Open a binary file as a text stream in its detected encoding.
+
+    The binary file is left open and rewound to the start when done.
+
+    Args:
+        file: A seekable, readable binary file, such as a BytesIO or SpooledDownload.
+        newline (str, optional): Passed to ``io.TextIOWrapper``; use '' for CSV.
+        sample_size (int): Number of leading bytes the encoding is detected from.
+
+    Yields:
+        TextIO: A text stream decoding the file incrementally, with undecodable bytes replaced.
+            Its ``encoding`` attribute is the detected encoding.
+    """
+    file.seek(0)
+    encoding = detect_encoding(file.read(sample_size))
+    file.seek(0)
+
+    buffered = file if isinstance(file, io.BufferedIOBase) else io.BufferedReader(file)
+    text = io.TextIOWrapper(buffered, encoding=encoding, errors='replace', newline=newline)
+    try:
+        yield text
+    finally:
+        # Detach, as the wrappers would otherwise close the caller's file when collected
+        text.detach()
+        if buffered is not file:
+            buffered.detach()
+        file.seek(0)
+
+
+def iter_text_parts(text: TextIO, part_chars: int) -> Iterator[str]:
+    """
+    Read a text stream in parts of roughly ``part_chars`` characters, split at line ends.
+
+    Args:
+        text (TextIO): The text stream.
+        part_chars (int): The target size of each part. Lines longer than this are split.
+
+    Yields:
+        str: The text in order, such that joining the parts gives back the whole text.
+    """
+    lines = []
+    size = 0
+    while True:
+        line = text.readline(part_chars)
+        if not line:
+            break
+        lines.append(line)
+        size += len(line)
+        if size >= part_chars:
+            yield ''.join(lines)
+            lines = []
+            size = 0
+    if lines:
+        yield ''.join(lines)
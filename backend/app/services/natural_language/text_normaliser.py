@@ -0,0 +1,202 @@
+"""
+This module provides the TextNormaliser class for cleaning extracted text before chunking.
+
+Extracted text carries noise that costs embedding and prompt tokens without adding meaning:
+runs of whitespace, page headers and footers repeated on every page, words hyphenated across
+line breaks, and empty or "None" spreadsheet cells. Normalisation removes it page by page
+and counts the tokens saved for each document. Header, footer and hyphenation rules only
+apply to paged text such as PDFs, and cell rules only to tabular text such as CSV files,
+so prose and data rows are never rewritten by rules meant for the other.
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.utils.token_utils import count_tokens
+
+_HORIZONTAL_SPACE = re.compile(r'[ \f\v\u00a0]+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+# A word split across lines in a PDF, only when both pieces are lower case, so compounds
+# such as "Anglo-Saxon" keep their hyphen
+_HYPHENATED_BREAK = re.compile(r'\b([a-z]+)-\n([a-z]+)\b')
+# A "None"-like cell between delimiters, or after the last one
+_NONE_CELL = re.compile(r'(?<=[,\t|]) *(?:None|nan|NaN|NULL|null) *(?=[,\t|]|$)', re.MULTILINE)
+# Rows left with only delimiters, and runs of empty cells at the end of a row
+_EMPTY_ROW = re.compile(r'^[,\t| ]+$', re.MULTILINE)
+_TRAILING_EMPTY_CELLS = re.compile(r'(?<=[^,\t|])[,\t|]{2,}$', re.MULTILINE)
+_DIGITS = re.compile(r'\d+')
+
+
+class NormalisationStats:
+    """Token counts for one document before and after normalisation."""
+
+    def __init__(self):
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @property
+    def tokens_removed(self) -> int:
+        """int: The number of tokens normalisation saved."""
+        return self.tokens_before - self.tokens_after
+
+    @property
+    def reduction_ratio(self) -> float:
+        """float: The fraction of the document's tokens that normalisation saved."""
+        return self.tokens_removed / self.tokens_before if self.tokens_before else 0.0
+
+
+class TextNormaliser:
+    """
+    Normalise extracted text page by page.
+
+    Headers and footers of paged documents are detected from the first ``sample_pages``
+    pages: a line that opens or closes at least ``repeat_ratio`` of them, ignoring digits
+    so page numbers match, is removed from every page. Documents with fewer than
+    ``min_pages`` pages are not checked for headers and footers.
+    """
+
+    def __init__(self, sample_pages: int = 12, min_pages: int = 3, repeat_ratio: float = 0.6,
+                 edge_lines: int = 2):
+        """
+        Initialize the TextNormaliser.
+
+        Args:
+            sample_pages (int): Number of leading pages used to detect headers and footers.
+            min_pages (int): Minimum number of pages before headers and footers are detected.
+            repeat_ratio (float): Fraction of sampled pages a line must repeat on to be removed.
+            edge_lines (int): Number of lines at the top and bottom of a page checked for repeats.
+        """
+        self.sample_pages = sample_pages
+        self.min_pages = min_pages
+        self.repeat_ratio = repeat_ratio
+        self.edge_lines = edge_lines
+        self._lock = threading.Lock()
+        self._totals = {"documents": 0, "tokens_before": 0, "tokens_after": 0}
+
+    @staticmethod
+    def normalise_text(text: str, paged: bool = False, tabular: bool = False) -> str:
+        """
+        Normalise a single piece of text.
+
+        Args:
+            text (str): The text to normalise.
+            paged (bool): Whether the text is a page of a paged document, such as a PDF, whose
+                lower-case words hyphenated across line breaks are joined.
+            tabular (bool): Whether the text is delimited rows, whose "None" cells, empty rows
+                and trailing empty cells are dropped.
+
+        Returns:
+            str: The text with runs of spaces collapsed and at most one blank line between
+                paragraphs, and the paged or tabular rules applied.
+        """
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        text = _HORIZONTAL_SPACE.sub(' ', text)
+        text = '\n'.join(line.strip() for line in text.split('\n'))
+        if paged:
+            text = _HYPHENATED_BREAK.sub(r'\1\2', text)
+        if tabular:
+            text = _NONE_CELL.sub('', text)
+            text = _EMPTY_ROW.sub('', text)
+            text = _TRAILING_EMPTY_CELLS.sub('', text)
+        text = _BLANK_LINES.sub('\n\n', text)
+        return text.strip()
+
+    @staticmethod
+    def _signature(line: str) -> str:
+        return _DIGITS.sub('#', line)
+
+    def _edge_indexes(self, lines: List[str]) -> List[int]:
+        """Indexes of the lines that can be a header or footer: at most a third of the page at each end."""
+        content = [index for index, line in enumerate(lines) if line.strip()]
+        edge_lines = min(self.edge_lines, len(content) // 3)
+        if not edge_lines:
+            return []
+        return content[:edge_lines] + content[-edge_lines:]
+
+    def _edge_signatures(self, page: str) -> List[str]:
+        lines = page.split('\n')
+        return list({self._signature(lines[index]) for index in self._edge_indexes(lines)})
+
+    def _find_repeated_lines(self, pages: List[str]) -> frozenset:
+        if len(pages) < self.min_pages:
+            return frozenset()
+        counts = Counter(signature for page in pages for signature in self._edge_signatures(page))
+        threshold = max(self.repeat_ratio * len(pages), 2)
+        return frozenset(signature for signature, count in counts.items() if count >= threshold)
+
+    def _strip_repeated(self, page: str, repeated: frozenset) -> str:
+        if not repeated:
+            return page
+        lines = page.split('\n')
+        edges = set(self._edge_indexes(lines))
+        return '\n'.join(line for index, line in enumerate(lines)
+                         if index not in edges or self._signature(line) not in repeated).strip()
+
+    def normalise(self, pages: Iterable[str], stats: Optional[NormalisationStats] = None,
+                  paged: bool = False, tabular: bool = False,
+                  tokens_before: Optional[Callable[[], int]] = None) -> Iterator[str]:
+        """
+        Normalise a document's text, removing repeated headers and footers from real pages.
+
+        For paged documents the first pages are held back until headers and footers have
+        been detected; the rest stream through one at a time. Other documents arrive in
+        arbitrary parts, such as blocks of CSV rows, whose first and last lines are content,
+        so they are never checked for headers and footers.
+
+        Args:
+            pages (Iterable[str]): The document's text in order, such as one string per page.
+            stats (NormalisationStats, optional): Receives the document's token counts.
+            paged (bool): Whether each item is a real page, as for PDFs.
+            tabular (bool): Whether the text is delimited rows, as for spreadsheets and CSV files.
+            tokens_before (Callable[[], int], optional): Returns the token count of the pages
+                read, when their source has already counted them, as an ExtractionBudget does.
+                Called once the pages are exhausted. If None, the pages are counted here.
+
+        Yields:
+            str: The normalised text of each non-empty page.
+        """
+        stats = stats if stats is not None else NormalisationStats()
+        count_before = count_tokens if tokens_before is None else lambda page: 0
+        iterator = iter(pages)
+        sample = []
+        if paged:
+            for page in iterator:
+                stats.tokens_before += count_before(page)
+                sample.append(self.normalise_text(page, paged, tabular))
+                if len(sample) >= self.sample_pages:
+                    break
+        repeated = self._find_repeated_lines(sample)
+
+        def normalised_pages():
+            yield from sample
+            for page in iterator:
+                stats.tokens_before += count_before(page)
+                yield self.normalise_text(page, paged, tabular)
+
+        for page in normalised_pages():
+            page = self._strip_repeated(page, repeated)
+            if page:
+                stats.tokens_after += count_tokens(page)
+                yield page
+        if tokens_before is not None:
+            stats.tokens_before += tokens_before()
+
+        with self._lock:
+            self._totals["documents"] += 1
+            self._totals["tokens_before"] += stats.tokens_before
+            self._totals["tokens_after"] += stats.tokens_after
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Report the tokens saved by normalisation across all documents in this process.
+
+        Returns:
+            Dict[str, Any]: Document and token totals and the overall reduction ratio.
+        """
+        with self._lock:
+            metrics = dict(self._totals)
+        before = metrics["tokens_before"]
+        metrics["reduction_ratio"] = (before - metrics["tokens_after"]) / before if before else 0.0
+        return metrics
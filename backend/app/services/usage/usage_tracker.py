@@ -0,0 +1,184 @@
+"""
+This module provides the UsageTracker class for recording language model and embedding usage.
+
+Every model or embedding call is recorded as tokens, calls, latency, cache hits and retries,
+aggregated per user and per endpoint into hourly rolling counters in Redis.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+
+from flask import has_request_context, request, session
+from redis.exceptions import RedisError
+
+from app.utils.redis_client import execute_batched
+
+logger = logging.getLogger(__name__)
+
+USAGE_FIELDS = ('calls', 'prompt_tokens', 'completion_tokens', 'cached_tokens', 'latency_ms', 'cache_hits', 'retries')
+
+BACKGROUND_ENDPOINT = 'background'
+ANONYMOUS_USER = 'anonymous'
+
+
+class UsageTracker:
+    """
+    Record per-call usage and aggregate it into hourly counters per user and per endpoint.
+
+    Counters are stored in one Redis hash per scope and hour, with fields named
+    ``<kind>:<counter>`` and ``model:<model>:calls``, and expire after ``retention_hours``.
+    Recording never raises: usage accounting must not break the call being measured.
+    """
+
+    def __init__(self, redis_client, retention_hours: int = 24 * 7, namespace: str = 'usage'):
+        """
+        Initialize the UsageTracker.
+
+        Args:
+            redis_client: A Redis client with ``decode_responses=True``, or None to disable recording.
+            retention_hours (int): Hours each hourly bucket is kept for.
+            namespace (str): Prefix for the Redis keys.
+        """
+        self.redis_client = redis_client
+        self.retention_hours = retention_hours
+        self.namespace = namespace
+
+    @staticmethod
+    def _hour(moment: datetime) -> str:
+        return moment.strftime('%Y%m%d%H')
+
+    def _bucket_key(self, scope: str, identifier: str, hour: str) -> str:
+        return f"{self.namespace}:{scope}:{identifier}:{hour}"
+
+    @staticmethod
+    def current_context() -> Dict[str, str]:
+        """
+        Identify the user and endpoint of the current Flask request.
+
+        Returns:
+            Dict[str, str]: The 'user_id' and 'endpoint', with fallbacks outside a request.
+        """
+        if not has_request_context():
+            return {"user_id": ANONYMOUS_USER, "endpoint": BACKGROUND_ENDPOINT}
+        return {
+            "user_id": session.get('user_id') or ANONYMOUS_USER,
+            "endpoint": request.endpoint or request.path
+        }
+
+    def record(self, kind: str, model: Optional[str] = None, prompt_tokens: int = 0, completion_tokens: int = 0,
+               latency: float = 0.0, cached_tokens: int = 0, cache_hit: bool = False, retries: int = 0,
+               user_id: Optional[str] = None, endpoint: Optional[str] = None) -> None:
+        """
+        Record a single model call, embedding call or cache hit.
+
+        Args:
+            kind (str): The kind of call, such as 'chat', 'embedding' or 'summary'.
+            model (str, optional): The model that served the call.
+            prompt_tokens (int): Input tokens billed for the call.
+            completion_tokens (int): Output tokens billed for the call.
+            latency (float): Wall-clock seconds the call took.
+            cached_tokens (int): Input tokens served from the provider's prompt cache.
+            cache_hit (bool): Whether the call was answered from a local cache instead of a model.
+            retries (int): Failed attempts before the call succeeded.
+            user_id (str, optional): The user to attribute the call to. Defaults to the session user.
+            endpoint (str, optional): The endpoint to attribute the call to. Defaults to the request endpoint.
+        """
+        if self.redis_client is None:
+            return
+
+        context = self.current_context()
+        user_id = user_id or context['user_id']
+        endpoint = endpoint or context['endpoint']
+
+        counters = {
+            'calls': 0 if cache_hit else 1,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'cached_tokens': cached_tokens,
+            'latency_ms': int(latency * 1000),
+            'cache_hits': 1 if cache_hit else 0,
+            'retries': retries
+        }
+
+        hour = self._hour(datetime.now(timezone.utc))
+        ttl = self.retention_hours * 3600
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for scope, identifier in (('user', user_id), ('endpoint', endpoint)):
+                key = self._bucket_key(scope, identifier, hour)
+                for name, value in counters.items():
+                    if value:
+                        pipe.hincrby(key, f"{kind}:{name}", value)
+                if model and not cache_hit:
+                    pipe.hincrby(key, f"model:{model}:calls", 1)
+                pipe.expire(key, ttl)
+            pipe.sadd(f"{self.namespace}:endpoints", endpoint)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Failed to record {kind} usage: {str(e)}")
+
+    def get_usage(self, scope: str, identifier: str, hours: int = 24) -> Dict[str, Any]:
+        """
+        Sum the hourly counters for a user or endpoint over a rolling window.
+
+        Args:
+            scope (str): Either 'user' or 'endpoint'.
+            identifier (str): The user ID or endpoint name.
+            hours (int): The number of most recent hours to include.
+
+        Returns:
+            Dict[str, Any]: Counters per call kind and call counts per model.
+        """
+        if self.redis_client is None:
+            return {"kinds": {}, "models": {}}
+
+        try:
+            buckets = execute_batched(self.redis_client, self._bucket_keys(scope, identifier, hours),
+                                      lambda pipe, key: pipe.hgetall(key))
+        except RedisError as e:
+            logger.warning(f"Failed to read usage for {scope} {identifier}: {str(e)}")
+            return {"kinds": {}, "models": {}}
+        return self._sum_buckets(buckets)
+
+    def _bucket_keys(self, scope: str, identifier: str, hours: int):
+        now = datetime.now(timezone.utc)
+        return [self._bucket_key(scope, identifier, self._hour(now - timedelta(hours=offset)))
+                for offset in range(hours)]
+
+    @staticmethod
+    def _sum_buckets(buckets) -> Dict[str, Any]:
+        usage = {"kinds": {}, "models": {}}
+        for bucket in buckets:
+            for field, value in (bucket or {}).items():
+                if field.startswith('model:'):
+                    model = field[len('model:'):].rsplit(':', 1)[0]
+                    usage['models'][model] = usage['models'].get(model, 0) + int(value)
+                    continue
+                kind, _, name = field.rpartition(':')
+                counters = usage['kinds'].setdefault(kind, dict.fromkeys(USAGE_FIELDS, 0))
+                counters[name] = counters.get(name, 0) + int(value)
+        return usage
+
+    def get_endpoint_usage(self, hours: int = 24) -> Dict[str, Dict[str, Any]]:
+        """
+        Sum the hourly counters of every endpoint that has recorded usage.
+
+        Args:
+            hours (int): The number of most recent hours to include.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Endpoint names mapped to their usage.
+        """
+        if self.redis_client is None:
+            return {}
+        try:
+            endpoints = sorted(self.redis_client.smembers(f"{self.namespace}:endpoints"))
+            # Every endpoint's buckets in a few round trips rather than one per endpoint
+            keys = [key for endpoint in endpoints for key in self._bucket_keys('endpoint', endpoint, hours)]
+            buckets = execute_batched(self.redis_client, keys, lambda pipe, key: pipe.hgetall(key))
+        except RedisError as e:
+            logger.warning(f"Failed to read endpoint usage: {str(e)}")
+            return {}
+        return {endpoint: self._sum_buckets(buckets[index * hours:(index + 1) * hours])
+                for index, endpoint in enumerate(endpoints)}
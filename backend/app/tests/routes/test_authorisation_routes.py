@@ -11,7 +11,6 @@ import pytest
 from unittest.mock import patch, MagicMock
 from flask import Flask, session, json
 from app.routes.authorisation_routes import auth_bp
-from app.routes.authorisation_routes import redis_client
 
 @pytest.fixture
 def client():
@@ -47,8 +46,8 @@ def init_session(client):
 @patch('app.routes.authorisation_routes.auth_service.credentials_to_dict')
 @patch('app.routes.authorisation_routes.auth_service.fetch_user_info')
 @patch('app.routes.authorisation_routes.DriveCore')
-@patch('app.routes.authorisation_routes.redis_client')
-def test_oauth2callback_route_success(mock_redis, mock_drive_core, mock_fetch_user_info,
+@patch('app.utils.drive_utils.credential_cache')
+def test_oauth2callback_route_success(mock_credential_cache, mock_drive_core, mock_fetch_user_info,
                                       mock_credentials_to_dict, mock_create_flow,
                                       client, init_session, capfd):
     """Test the successful flow of the OAuth2 callback route.
@@ -57,7 +56,7 @@ def test_oauth2callback_route_success(mock_redis, mock_drive_core, mock_fetch_us
     correctly processes the callback, stores credentials, and redirects the user.
 
     Args:
-        mock_redis (MagicMock): Mocked Redis client.
+        mock_credential_cache (MagicMock): Mocked credential cache.
         mock_drive_core (MagicMock): Mocked DriveCore class.
         mock_fetch_user_info (MagicMock): Mocked fetch_user_info function.
         mock_credentials_to_dict (MagicMock): Mocked credentials_to_dict function.
@@ -94,9 +93,9 @@ def test_oauth2callback_route_success(mock_redis, mock_drive_core, mock_fetch_us
     captured = capfd.readouterr()
     print("Captured output:", captured.out)
 
-    # Check if Redis `set` method was called
+    # Check that the credentials were stored
     expected_credentials = json.dumps(mock_credentials_to_dict.return_value)
-    mock_redis.set.assert_called_with('user:test_user_id:token', expected_credentials)
+    mock_credential_cache.set.assert_called_with('test_user_id', expected_credentials)
 
     # Ensure the response is correct
     assert response.status_code == 302
@@ -148,8 +147,8 @@ def test_oauth2callback_route_oauth_error(mock_create_flow, client):
     assert response.json == {"error": "Authentication failed", "details": "access_denied"}
     
 @patch('app.routes.authorisation_routes.DriveCore')
-@patch('app.routes.authorisation_routes.redis_client')
-def test_check_auth_route_authenticated(mock_redis, mock_drive_core, client, init_session):
+@patch('app.utils.drive_utils.credential_cache')
+def test_check_auth_route_authenticated(mock_credential_cache, mock_drive_core, client, init_session):
     """Test the `/check-auth` route for an authenticated user.
 
     This test verifies that the route correctly identifies an authenticated user
@@ -157,12 +156,12 @@ def test_check_auth_route_authenticated(mock_redis, mock_drive_core, client, ini
     session's last active timestamp.
 
     Args:
-        mock_redis (MagicMock): Mocked Redis client.
+        mock_credential_cache (MagicMock): Mocked credential cache.
         mock_drive_core (MagicMock): Mocked `DriveCore` class.
         client (FlaskClient): The test client instance.
         init_session (FlaskClient): The test client with an active session.
     """
-    mock_redis.get.return_value = json.dumps({'token': 'mock_token'})
+    mock_credential_cache.get.return_value = json.dumps({'token': 'mock_token'})
     mock_drive_core.return_value = MagicMock()
 
     response = client.get('/check-auth')
@@ -173,38 +172,70 @@ def test_check_auth_route_authenticated(mock_redis, mock_drive_core, client, ini
         assert 'last_active' in sess
 
 @patch('app.routes.authorisation_routes.DriveCore')
-@patch('app.routes.authorisation_routes.redis_client')
-def test_check_auth_route_not_authenticated(mock_redis, mock_drive_core, client, init_session):
+@patch('app.utils.drive_utils.credential_cache')
+def test_check_auth_route_not_authenticated(mock_credential_cache, mock_drive_core, client, init_session):
     """Test the `/check-auth` route for a non-authenticated user.
 
     This test ensures that if the `DriveCore` retrieval fails, the user is considered
     not authenticated, and the response reflects this.
 
     Args:
-        mock_redis (MagicMock): Mocked Redis client.
+        mock_credential_cache (MagicMock): Mocked credential cache.
         mock_drive_core (MagicMock): Mocked `DriveCore` class.
         client (FlaskClient): The test client instance.
         init_session (FlaskClient): The test client with an active session.
     """
-    mock_redis.get.return_value = None
+    mock_credential_cache.get.return_value = None
 
     response = client.get('/check-auth')
     assert response.status_code == 200
     assert response.json == {"authenticated": False}
 
-def test_logout_route(client, init_session):
+@patch('app.utils.drive_utils.credential_cache')
+def test_logout_route(mock_credential_cache, client, init_session):
     """Test the `/logout` route.
 
     This test verifies that the `/logout` route correctly clears the user's session
     and returns a successful logout message.
 
     Args:
+        mock_credential_cache (MagicMock): Mocked credential cache.
         client (FlaskClient): The test client instance.
         init_session (FlaskClient): The test client with an active session.
     """
+    mock_credential_cache.get.return_value = None
+
     response = client.get('/logout')
     assert response.status_code == 200
     assert response.json == {"message": "Logged out successfully"}
 
+    mock_credential_cache.delete.assert_called_once_with('test_user_id')
+
     with client.session_transaction() as sess:
-        assert not sess
\ No newline at end of file
+        assert not sess
+@patch('app.routes.authorisation_routes.credential_cache')
+@patch('app.routes.authorisation_routes.drive_core_cache')
+@patch('app.routes.authorisation_routes.token_manager')
+def test_refresh_token_route(mock_token_manager, mock_cache, mock_credential_cache, client, init_session):
+    """Test the `/refresh-token` route.
+
+    This test verifies that the route forces a refresh through the token manager and
+    drops the user's cached credentials and client, and that a failed refresh returns 401.
+
+    Args:
+        mock_token_manager (MagicMock): Mocked token manager.
+        mock_cache (MagicMock): Mocked Drive client cache.
+        mock_credential_cache (MagicMock): Mocked credential cache.
+        client (FlaskClient): The test client instance.
+        init_session (FlaskClient): The test client with an active session.
+    """
+    mock_token_manager.refresh.return_value = True
+    response = client.get('/refresh-token')
+    assert response.status_code == 200
+    mock_token_manager.refresh.assert_called_once_with('test_user_id', force=True, wait=True)
+    mock_cache.invalidate.assert_called_once_with('test_user_id')
+    mock_credential_cache.invalidate.assert_called_once_with('test_user_id')
+
+    mock_token_manager.refresh.return_value = False
+    response = client.get('/refresh-token')
+    assert response.status_code == 401
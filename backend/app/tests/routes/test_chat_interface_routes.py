@@ -8,9 +8,11 @@ in the vector store. These tests cover various HTTP endpoints and their response
 
 import json
 import pytest
+from io import BytesIO
 from flask import Flask, session
 from unittest.mock import patch, MagicMock
 from app.routes.chat_interface_routes import chat_bp, initialize_chat_service
+from config import Config
 
 @pytest.fixture
 def app():
@@ -179,6 +181,40 @@ def test_upload_documents(client):
             "total_files": 3
         }
 
+def test_upload_and_index_document(client):
+    """
+    Test the /upload-and-index endpoint.
+
+    This test verifies that an uploaded file is passed to the chat service with its folder.
+
+    Args:
+        client (FlaskClient): The test client for the Flask app.
+    """
+    with patch('app.routes.chat_interface_routes.ChatService') as MockChatService:
+        mock_chat_service = MockChatService.return_value
+        mock_chat_service.upload_and_index_file.return_value = {"id": "new_id", "indexed": True}
+
+        response = client.post('/chat/upload-and-index', data={
+            'file': (BytesIO(b"file content"), 'notes.txt', 'text/plain'),
+            'folderId': 'folder_id'
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200
+        assert json.loads(response.data) == {"id": "new_id", "indexed": True}
+        mock_chat_service.upload_and_index_file.assert_called_once_with(
+            b"file content", 'notes.txt', 'text/plain', 'folder_id'
+        )
+
+def test_upload_and_index_document_without_file(client):
+    """
+    Test the /upload-and-index endpoint when no file is sent.
+
+    Args:
+        client (FlaskClient): The test client for the Flask app.
+    """
+    with patch('app.routes.chat_interface_routes.ChatService'):
+        response = client.post('/chat/upload-and-index', data={}, content_type='multipart/form-data')
+        assert response.status_code == 400
+
 def test_set_documents_unselected(client):
     """
     Test the /set-documents-unselected endpoint.
@@ -204,6 +240,46 @@ def test_set_documents_unselected(client):
             {"id": "id3", "success": True}
         ]
 
+def test_get_usage_metrics(client):
+    """
+    Test the /metrics endpoint.
+
+    This test verifies that usage metrics are returned for the requested window, and that
+    only administrators get usage of every endpoint.
+
+    Args:
+        client (FlaskClient): The test client for the Flask app.
+    """
+    with patch('app.routes.chat_interface_routes.ChatService') as MockChatService, \
+            patch.object(Config, 'METRICS_ADMIN_USER_IDS', frozenset(['admin_user'])):
+        mock_chat_service = MockChatService.return_value
+        mock_chat_service.get_usage_metrics.return_value = {"window_hours": 6, "user": {"kinds": {}, "models": {}}}
+
+        with client.session_transaction() as sess:
+            sess['user_id'] = 'test_user'
+        response = client.get('/chat/metrics?hours=6')
+        assert response.status_code == 200
+        assert json.loads(response.data)["window_hours"] == 6
+        mock_chat_service.get_usage_metrics.assert_called_with(6, include_global=False)
+
+        with client.session_transaction() as sess:
+            sess['user_id'] = 'admin_user'
+        client.get('/chat/metrics?hours=6')
+        mock_chat_service.get_usage_metrics.assert_called_with(6, include_global=True)
+
+def test_get_usage_metrics_without_user(client):
+    """
+    Test the /metrics endpoint when no user is associated with the chat service.
+
+    Args:
+        client (FlaskClient): The test client for the Flask app.
+    """
+    with patch('app.routes.chat_interface_routes.ChatService') as MockChatService:
+        MockChatService.return_value.get_usage_metrics.side_effect = ValueError("User ID is not set.")
+
+        response = client.get('/chat/metrics')
+        assert response.status_code == 401
+
 def test_initialize_chat_service(app):
     """
     Test the initialize_chat_service function.
@@ -195,6 +195,24 @@ def test_get_document_metadata_not_found(pinecone_manager):
     assert result == {}
 
 
+def test_embed_records_usage(pinecone_manager):
+    """
+    Test that embedding text records an embedding call with the usage tracker.
+
+    Args:
+        pinecone_manager (PineconeManager): The PineconeManager instance to test.
+    """
+    pinecone_manager.usage_tracker = Mock()
+    pinecone_manager.embeddings.embed_query.return_value = [0.1, 0.2]
+
+    assert pinecone_manager.embed("some text to embed") == [0.1, 0.2]
+
+    args, kwargs = pinecone_manager.usage_tracker.record.call_args
+    assert args == ('embedding',)
+    assert kwargs["model"] == "text-embedding-ada-002"
+    assert kwargs["prompt_tokens"] > 0
+
+
 def test_upsert_document_large_content(pinecone_manager):
     """
     Test the upsert_document method of PineconeManager with large content.
@@ -214,4 +232,162 @@ def test_upsert_document_large_content(pinecone_manager):
     result = pinecone_manager.upsert_document(document, "user_id")
     assert result["success"] is True
     assert result["vectors_upserted"] == 3  # Should be split into 3 chunks
-    assert pinecone_manager.index.upsert.call_count == 3
\ No newline at end of file
+    assert pinecone_manager.index.upsert.call_count == 3
+
+def test_upsert_document_stream(pinecone_manager):
+    """
+    Test that streamed pages are chunked, staged unselected and then committed over the previous version.
+
+    Args:
+        pinecone_manager (PineconeManager): The PineconeManager instance to test.
+    """
+    pinecone_manager.embeddings.embed_query.return_value = [0] * 1536
+    pinecone_manager.index.query.return_value = {"matches": [{"id": "test_id"}, {"id": "test_id_chunk_1"}]}
+    document = {"id": "test_id", "lastModified": "2023-01-01", "isSelected": True}
+    pages = iter(["a" * 30, "b" * 30, "c" * 10])
+
+    result = pinecone_manager.upsert_document_stream(document, pages, "user_id", chunk_size=40)
+
+    assert result["success"] is True
+    assert result["vectors_upserted"] == 2
+    assert result["content"] == "\n\n".join(["a" * 30, "b" * 30, "c" * 10])
+    upserted = [call.kwargs["vectors"][0] for call in pinecone_manager.index.upsert.call_args_list]
+    staged_id = upserted[0][0]
+    assert staged_id.startswith("test_id_") and staged_id.endswith("_chunk_1")
+    assert upserted[0][2]["isSelected"] is False
+    pinecone_manager.index.delete.assert_called_once_with(ids=["test_id", "test_id_chunk_1"], namespace="user_id")
+    pinecone_manager.index.update.assert_called_once_with(
+        id=staged_id, set_metadata={"totalChunks": 2, "isSelected": True}, namespace="user_id"
+    )
+    head_id, _, head_metadata = upserted[1]
+    assert head_id == "test_id"
+    assert len(head_metadata["content"].encode('utf-8')) == 40
+    assert head_metadata["isSelected"] is True and head_metadata["totalChunks"] == 2
+
+
+def test_upsert_document_stream_tags_truncated_document(pinecone_manager):
+    """
+    Test that a document marked as truncated while its text streams in is tagged on finalising.
+
+    Args:
+        pinecone_manager (PineconeManager): The PineconeManager instance to test.
+    """
+    pinecone_manager.embeddings.embed_query.return_value = [0] * 1536
+    document = {"id": "test_id", "lastModified": "2023-01-01", "isSelected": True}
+
+    def pages():
+        yield "first page"
+        document["truncated"] = True
+
+    pinecone_manager.index.query.return_value = {"matches": []}
+    pinecone_manager.upsert_document_stream(document, pages(), "user_id")
+
+    head_metadata = pinecone_manager.index.upsert.call_args.kwargs["vectors"][0][2]
+    assert head_metadata["totalChunks"] == 1
+    assert head_metadata["isSelected"] is True
+    assert head_metadata["truncated"] is True
+
+
+def test_upsert_document_stream_cleans_up_on_failure(pinecone_manager):
+    """
+    Test that chunks already written are deleted, and the previous version kept, when extraction fails midway.
+
+    Args:
+        pinecone_manager (PineconeManager): The PineconeManager instance to test.
+    """
+    pinecone_manager.embeddings.embed_query.return_value = [0] * 1536
+
+    def pages():
+        yield "a" * 90
+        raise RuntimeError("corrupt page")
+
+    document = {"id": "test_id", "lastModified": "2023-01-01", "isSelected": True}
+    result = pinecone_manager.upsert_document_stream(document, pages(), "user_id", chunk_size=40)
+
+    assert result["success"] is False
+    staged_id = pinecone_manager.index.upsert.call_args.kwargs["vectors"][0][0]
+    assert staged_id != "test_id"
+    pinecone_manager.index.delete.assert_called_once_with(ids=[staged_id], namespace="user_id")
+    pinecone_manager.index.query.assert_not_called()
+    pinecone_manager.index.update.assert_not_called()
+
+
+def test_get_multiple_document_metadata(pinecone_manager):
+    """
+    Test the get_multiple_document_metadata method of PineconeManager.
+
+    This test verifies that metadata for several documents is retrieved with a single fetch
+    and that missing documents map to an empty dict.
+
+    Args:
+        pinecone_manager (PineconeManager): The PineconeManager instance to test.
+    """
+    pinecone_manager.index.fetch.return_value = {
+        'vectors': {'file_1': {'metadata': {'lastModified': '2023-01-01', 'isSelected': True}}}
+    }
+    result = pinecone_manager.get_multiple_document_metadata(["file_1", "file_2"], "user_id")
+    assert result == {'file_1': {'lastModified': '2023-01-01', 'isSelected': True}, 'file_2': {}}
+    pinecone_manager.index.fetch.assert_called_once_with(ids=['file_1', 'file_2'], namespace="user_id")
+
+
+def test_update_document_summary(pinecone_manager):
+    """
+    Test the update_document_summary method of PineconeManager.
+
+    This test verifies that the summary and keywords are stored on the document's first chunk.
+
+    Args:
+        pinecone_manager (PineconeManager): The PineconeManager instance to test.
+    """
+    result = pinecone_manager.update_document_summary("file_id", "user_id", "A summary", ["alpha", "beta"])
+    assert result is True
+    pinecone_manager.index.update.assert_called_once_with(
+        id="file_id", set_metadata={"summary": "A summary", "keywords": ["alpha", "beta"]}, namespace="user_id"
+    )
+
+
+def test_get_selected_documents_with_values(pinecone_manager):
+    """
+    Test the get_selected_documents method of PineconeManager with embeddings included.
+
+    This test verifies that each document's chunks are returned in order with their embeddings.
+
+    Args:
+        pinecone_manager (PineconeManager): The PineconeManager instance to test.
+    """
+    pinecone_manager.index.query.return_value = {
+        'matches': [
+            {'values': [0.2], 'metadata': {'googleDriveFileId': 'file_id', 'lastModified': '2023-01-01',
+                                           'isSelected': True, 'content': 'b', 'chunkIndex': 1, 'totalChunks': 2}},
+            {'values': [0.1], 'metadata': {'googleDriveFileId': 'file_id', 'lastModified': '2023-01-01',
+                                           'isSelected': True, 'content': 'a', 'chunkIndex': 0, 'totalChunks': 2}}
+        ]
+    }
+    result = pinecone_manager.get_selected_documents("user_id", include_values=True)
+    assert result[0]['metadata']['content'] == 'ab'
+    assert result[0]['metadata']['chunks'] == [
+        {'index': 0, 'content': 'a', 'values': [0.1]},
+        {'index': 1, 'content': 'b', 'values': [0.2]}
+    ]
+    assert pinecone_manager.index.query.call_args.kwargs['include_values'] is True
+
+
+def test_get_selected_documents_skips_incomplete_documents(pinecone_manager):
+    """
+    Test that a document whose chunks are not all stored yet, as while it is replaced, is skipped.
+
+    Args:
+        pinecone_manager (PineconeManager): The PineconeManager instance to test.
+    """
+    pinecone_manager.index.query.return_value = {
+        'matches': [
+            {'metadata': {'googleDriveFileId': 'partial', 'lastModified': '2023-01-01',
+                          'isSelected': True, 'content': 'b', 'chunkIndex': 1, 'totalChunks': 2}},
+            {'metadata': {'googleDriveFileId': 'whole', 'lastModified': '2023-01-01',
+                          'isSelected': True, 'content': 'a', 'chunkIndex': 0, 'totalChunks': 1}}
+        ]
+    }
+
+    result = pinecone_manager.get_selected_documents("user_id")
+
+    assert [doc['metadata']['id'] for doc in result] == ['whole']
@@ -0,0 +1,127 @@
+"""
+Unit tests for the DriveCoreCache class.
+
+These tests cover reusing a user's DriveCore while their token is unchanged,
+replacing it when the token changes, invalidation and least-recently-used eviction.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.services.google_drive.client_cache import DriveCoreCache
+
+
+def credentials_json(token):
+    """
+    Build stored credentials JSON for a token.
+
+    Args:
+        token (str): The access token.
+
+    Returns:
+        str: The credentials JSON.
+    """
+    return json.dumps({
+        'token': token,
+        'refresh_token': 'refresh_token',
+        'token_uri': 'https://oauth2.googleapis.com/token',
+        'client_id': 'client_id',
+        'client_secret': 'client_secret',
+        'scopes': ['https://www.googleapis.com/auth/drive']
+    })
+
+
+@pytest.fixture(autouse=True)
+def no_service_builds():
+    """
+    Fail the test if any Google API service is built.
+    """
+    with patch('app.services.google_drive.core.build', side_effect=AssertionError("service built")):
+        yield
+
+
+def test_get_reuses_drive_core_for_same_token():
+    """
+    Test that the same DriveCore is returned while the stored token is unchanged.
+    """
+    cache = DriveCoreCache()
+
+    first = cache.get('user_1', credentials_json('token_a'))
+    second = cache.get('user_1', credentials_json('token_a'))
+
+    assert second is first
+    assert first.credentials.token == 'token_a'
+    assert cache.get_metrics()["hits"] == 1
+    assert cache.get_metrics()["misses"] == 1
+
+
+def test_get_replaces_drive_core_when_token_changes():
+    """
+    Test that a new token builds a new DriveCore in place of the old one.
+    """
+    cache = DriveCoreCache()
+    old = cache.get('user_1', credentials_json('token_a'))
+
+    new = cache.get('user_1', credentials_json('token_b'))
+
+    assert new is not old
+    assert new.credentials.token == 'token_b'
+    assert cache.get_metrics()["size"] == 1
+
+
+def test_invalidate_and_put():
+    """
+    Test that invalidation drops a user's client and put stores one built elsewhere.
+    """
+    cache = DriveCoreCache()
+    drive_core = cache.get('user_1', credentials_json('token_a'))
+
+    cache.invalidate('user_1')
+    assert cache.get('user_1', credentials_json('token_a')) is not drive_core
+
+    cache.put('user_2', credentials_json('token_c'), drive_core)
+    assert cache.get('user_2', credentials_json('token_c')) is drive_core
+    assert cache.get_metrics()["invalidations"] == 1
+
+
+def test_least_recently_used_user_is_evicted():
+    """
+    Test that the least recently used user is evicted once the cache is full.
+    """
+    cache = DriveCoreCache(max_size=2)
+    first = cache.get('user_1', credentials_json('token_1'))
+    cache.get('user_2', credentials_json('token_2'))
+    cache.get('user_1', credentials_json('token_1'))
+
+    cache.get('user_3', credentials_json('token_3'))
+
+    assert cache.get('user_1', credentials_json('token_1')) is first
+    assert cache.get_metrics()["evictions"] == 1
+    assert cache.get_metrics()["size"] == 2
+
+
+def test_invalid_json_is_not_cached():
+    """
+    Test that malformed credentials raise and leave nothing cached.
+    """
+    cache = DriveCoreCache()
+
+    with pytest.raises(json.JSONDecodeError):
+        cache.get('user_1', 'not json')
+
+    assert cache.get_metrics()["size"] == 0
+
+
+def test_on_create_is_called_for_new_clients_only():
+    """
+    Test that the creation callback runs when a client is built, not on a cache hit.
+    """
+    created = []
+    cache = DriveCoreCache(on_create=lambda user_id, drive_core: created.append((user_id, drive_core)))
+
+    drive_core = cache.get('user_1', credentials_json('token_a'))
+    cache.get('user_1', credentials_json('token_a'))
+
+    assert created == [('user_1', drive_core)]
@@ -30,18 +30,34 @@ def test_drive_core_initialization(mock_credentials_dict):
     Test the initialization of the DriveCore class.
     
     This test verifies that the DriveCore is initialized with the correct
-    credentials and that the Google Drive and People services are correctly built.
+    credentials and that no Google API service is built until it is used.
     """
     with patch('app.services.google_drive.core.build') as mock_build:
-        # Mock the build function to return a mock service for both drive and people
-        mock_build.side_effect = [Mock(), Mock()]  
-        
         drive_core = DriveCore(mock_credentials_dict)
         
         assert isinstance(drive_core.credentials, Credentials)
-        assert mock_build.call_count == 2
-        mock_build.assert_any_call('drive', 'v3', credentials=drive_core.credentials)
-        mock_build.assert_any_call('people', 'v1', credentials=drive_core.credentials)
+        mock_build.assert_not_called()
+
+def test_services_are_built_on_first_use(mock_credentials_dict):
+    """
+    Test that the Drive, People and Sheets services are each built once, when first accessed.
+    """
+    with patch('app.services.google_drive.core.build') as mock_build:
+        mock_build.side_effect = lambda name, version, http: Mock(name=name)
+        drive_core = DriveCore(mock_credentials_dict)
+
+        drive_service = drive_core.drive_service
+        assert drive_core.drive_service is drive_service
+        mock_build.assert_called_once_with('drive', 'v3', http=drive_core.http)
+
+        people_service = drive_core.people_service
+        sheets_service = drive_core.sheets_service
+
+        assert drive_core.people_service is people_service
+        assert drive_core.sheets_service is sheets_service
+        assert mock_build.call_count == 3
+        mock_build.assert_any_call('people', 'v1', http=drive_core.http)
+        mock_build.assert_called_with('sheets', 'v4', http=drive_core.http)
 
 def test_list_folder_contents(mock_credentials_dict, mock_drive_service):
     """
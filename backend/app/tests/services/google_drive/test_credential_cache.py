@@ -0,0 +1,134 @@
+"""
+Unit tests for the CredentialCache class.
+
+These tests cover serving credentials from memory within the TTL, writing through on
+set and delete, invalidation by keyspace notifications, reads that race an
+invalidation, and enabling notifications on the server.
+"""
+
+from unittest.mock import MagicMock
+
+from redis.exceptions import ResponseError
+
+from app.services.google_drive.credential_cache import CredentialCache
+
+
+def make_redis(stored=None):
+    """
+    Create a mock Redis client holding stored credentials.
+
+    Args:
+        stored (dict, optional): Values by key.
+
+    Returns:
+        MagicMock: The client.
+    """
+    client = MagicMock()
+    stored = stored if stored is not None else {}
+    client.get.side_effect = stored.get
+    client.connection_pool.connection_kwargs = {'db': 2}
+    return client
+
+
+def test_get_reads_redis_once_within_ttl():
+    """
+    Test that credentials are read from Redis once and then served from memory.
+    """
+    redis_client = make_redis({'user:user_1:token': '{"token": "a"}'})
+    cache = CredentialCache(redis_client, ttl=30)
+
+    assert cache.get('user_1') == '{"token": "a"}'
+    assert cache.get('user_1') == '{"token": "a"}'
+
+    redis_client.get.assert_called_once_with('user:user_1:token')
+    assert cache.get_metrics()["hits"] == 1
+
+
+def test_missing_credentials_and_zero_ttl_are_not_cached():
+    """
+    Test that users without credentials, and a disabled cache, always read Redis.
+    """
+    redis_client = make_redis({'user:user_1:token': '{"token": "a"}'})
+
+    cache = CredentialCache(redis_client, ttl=30)
+    assert cache.get('user_2') is None
+    assert cache.get('user_2') is None
+
+    disabled = CredentialCache(redis_client, ttl=0)
+    disabled.get('user_1')
+    disabled.get('user_1')
+
+    assert redis_client.get.call_count == 4
+
+
+def test_set_and_delete_write_through():
+    """
+    Test that set stores credentials in Redis and memory, and delete removes them from both.
+    """
+    redis_client = make_redis()
+    cache = CredentialCache(redis_client, ttl=30)
+
+    cache.set('user_1', '{"token": "b"}')
+    assert cache.get('user_1') == '{"token": "b"}'
+    redis_client.set.assert_called_once_with('user:user_1:token', '{"token": "b"}')
+    redis_client.get.assert_not_called()
+
+    cache.delete('user_1')
+    redis_client.delete.assert_called_once_with('user:user_1:token')
+    assert cache.get('user_1') is None
+
+
+def test_notification_invalidates_user():
+    """
+    Test that a keyspace notification for a token key drops that user's entry only.
+    """
+    stored = {'user:user_1:token': 'old', 'user:user_2:token': 'other'}
+    redis_client = make_redis(stored)
+    cache = CredentialCache(redis_client, ttl=30)
+    cache.get('user_1')
+    cache.get('user_2')
+
+    stored['user:user_1:token'] = 'new'
+    cache.handle_notification({'channel': '__keyspace@2__:user:user_1:token', 'data': 'set'})
+
+    assert cache.get('user_1') == 'new'
+    assert cache.get('user_2') == 'other'
+    assert cache.get_metrics()["invalidations"] == 1
+    assert cache.channel_pattern == '__keyspace@2__:user:*:token'
+
+
+def test_read_racing_invalidation_is_not_cached():
+    """
+    Test that a value read from Redis before a concurrent invalidation is not kept.
+    """
+    redis_client = make_redis()
+    cache = CredentialCache(redis_client, ttl=30)
+
+    def get_then_invalidated(key):
+        cache.invalidate('user_1')
+        return 'old'
+    redis_client.get.side_effect = get_then_invalidated
+
+    assert cache.get('user_1') == 'old'
+    assert cache.get_metrics()["size"] == 0
+
+
+def test_enable_notifications_adds_missing_events():
+    """
+    Test that the required events are added to those already enabled, and that a server
+    refusing CONFIG SET is tolerated.
+    """
+    redis_client = make_redis()
+    redis_client.config_get.return_value = {'notify-keyspace-events': 'Ex'}
+    cache = CredentialCache(redis_client)
+
+    assert cache.enable_notifications() is True
+    redis_client.config_set.assert_called_once_with('notify-keyspace-events', 'ExKg$')
+
+    redis_client.config_get.return_value = {'notify-keyspace-events': 'KA'}
+    redis_client.config_set.reset_mock()
+    assert cache.enable_notifications() is True
+    redis_client.config_set.assert_not_called()
+
+    redis_client.config_get.side_effect = ResponseError('unknown command CONFIG')
+    assert cache.enable_notifications() is False
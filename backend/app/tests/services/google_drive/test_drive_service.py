@@ -41,21 +41,28 @@ def test_get_services(app, drive_service):
     """
     Test the get_services method of DriveService.
 
-    This test verifies that the method correctly creates and returns
-    Drive and People services, and stores them in the Flask g object.
+    This test verifies that the method returns the DriveCore's own services
+    instead of building new ones for the request.
     """
     with app.app_context():
-        with patch('app.services.google_drive.drive_service.build') as mock_build:
-            mock_drive = Mock()
-            mock_people = Mock()
-            mock_build.side_effect = [mock_drive, mock_people]
+        drive_service.drive_core.drive_service = Mock()
+        drive_service.drive_core.people_service = Mock()
 
-            drive, people = drive_service.get_services()
+        drive, people = drive_service.get_services()
 
-            assert drive == mock_drive
-            assert people == mock_people
-            assert g.drive_service == mock_drive
-            assert g.people_service == mock_people
+        assert drive is drive_service.drive_core.drive_service
+        assert people is drive_service.drive_core.people_service
+        assert 'drive_service' not in g
+
+def test_get_drive_service_refreshes_expired_credentials(drive_service):
+    """
+    Test that expired credentials are refreshed before the Drive service is returned.
+    """
+    drive_service.drive_core.credentials.expired = True
+    drive_service.drive_core.credentials.refresh_token = 'refresh_token'
+
+    assert drive_service.get_drive_service() is drive_service.drive_core.drive_service
+    drive_service.drive_core.credentials.refresh.assert_called_once()
 
 def test_get_file_web_view_link(app, drive_service):
     """
@@ -71,7 +78,7 @@ def test_get_file_web_view_link(app, drive_service):
             'mimeType': 'application/pdf'
         }
 
-        with patch.object(drive_service, 'get_services', return_value=(mock_drive, None)):
+        with patch.object(drive_service, 'get_drive_service', return_value=mock_drive):
             web_view_link, mime_type = drive_service.get_file_web_view_link('file_id')
 
         assert web_view_link == 'https://example.com/view'
@@ -102,7 +109,7 @@ def test_get_file_details(app, drive_service):
             'shared': True
         }
 
-        with patch.object(drive_service, 'get_services', return_value=(mock_drive, None)):
+        with patch.object(drive_service, 'get_drive_service', return_value=mock_drive):
             file_details = drive_service.get_file_details('file_id')
 
         assert file_details['id'] == 'file_id'
@@ -119,6 +126,34 @@ def test_get_file_details(app, drive_service):
         assert file_details['parents'] == ['parent_id']
         assert file_details['shared'] == True
 
+def test_get_multiple_file_details(app, drive_service):
+    """
+    Test the get_multiple_file_details method of DriveService.
+
+    This test verifies that lookups are sent as one batch request and that
+    failed lookups are mapped to None.
+    """
+    with app.app_context():
+        mock_drive = Mock()
+        mock_batch = Mock()
+        added = []
+        mock_drive.new_batch_http_request.return_value = mock_batch
+        mock_batch.add.side_effect = lambda request, request_id: added.append(request_id)
+
+        def execute_batch():
+            callback = mock_drive.new_batch_http_request.call_args.kwargs['callback']
+            callback('file_1', {'id': 'file_1', 'modifiedTime': '2023-01-01'}, None)
+            callback('file_2', None, Exception("Not found"))
+        mock_batch.execute.side_effect = execute_batch
+
+        with patch.object(drive_service, 'get_drive_service', return_value=mock_drive):
+            details = drive_service.get_multiple_file_details(['file_1', 'file_2'])
+
+        assert added == ['file_1', 'file_2']
+        mock_batch.execute.assert_called_once()
+        assert details['file_1']['modifiedTime'] == '2023-01-01'
+        assert details['file_2'] is None
+
 def test_cleanup_services(app, drive_service):
     """
     Test the cleanup_services method of DriveService.
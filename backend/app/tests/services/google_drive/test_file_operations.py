@@ -46,6 +46,18 @@ def test_upload_file(file_operations):
     assert result == {"id": "new_file_id"}
     mock_drive.files().create.assert_called()
 
+def test_create_file_returns_requested_fields(file_operations):
+    """Test creating a file from bytes returns the requested fields of the new file."""
+    ops, mock_drive = file_operations
+    mock_drive.files().create().execute.return_value = {'id': 'new_file_id', 'modifiedTime': '2024-05-01'}
+
+    result = ops.create_file(b'file content', 'dir/notes.txt', 'text/plain', 'folder_id', fields='id, modifiedTime')
+
+    assert result == {'id': 'new_file_id', 'modifiedTime': '2024-05-01'}
+    kwargs = mock_drive.files().create.call_args.kwargs
+    assert kwargs['body'] == {'name': 'notes.txt', 'parents': ['folder_id']}
+    assert kwargs['fields'] == 'id, modifiedTime'
+
 def test_create_doc(file_operations):
     """Test creating a new Google Doc in a specified folder."""
     ops, mock_drive = file_operations
@@ -0,0 +1,153 @@
+"""
+Unit tests for the pooled Google API transport.
+
+These tests run a local HTTP server to check that the httplib2-compatible transport
+returns responses the API client understands, authorises each call, reuses pooled
+connections across users and leaves resumable upload responses unfollowed.
+"""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+import pytest
+from googleapiclient.http import HttpRequest
+
+from app.services.google_drive.http_transport import PooledAuthorizedHttp, PooledHTTPAdapter
+
+
+class Handler(BaseHTTPRequestHandler):
+    """A keep-alive handler echoing the Authorization header, with gzip and 308 routes."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/gzip':
+            body = gzip.compress(b'{"compressed": true}')
+            self.send_response(200)
+            self.send_header('Content-Encoding', 'gzip')
+        else:
+            body = ('{"authorization": "%s"}' % self.headers.get('Authorization')).encode()
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(308)
+        self.send_header('Range', 'bytes=0-9')
+        self.send_header('Location', '/elsewhere')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    """
+    Run a local HTTP server for the duration of a test.
+
+    Yields:
+        str: The server's base URL.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def credentials(token):
+    """
+    Build valid mock credentials that apply a bearer token.
+
+    Args:
+        token (str): The access token.
+
+    Returns:
+        Mock: The credentials.
+    """
+    mock_credentials = Mock()
+    mock_credentials.apply.side_effect = lambda headers, token=None: headers.__setitem__(
+        'authorization', f'Bearer {mock_credentials.token}')
+    mock_credentials.token = token
+    mock_credentials.valid = True
+    mock_credentials.expired = False
+    mock_credentials.before_request.side_effect = lambda request, method, url, headers: mock_credentials.apply(headers)
+    return mock_credentials
+
+
+def test_request_returns_httplib2_response_with_user_credentials(server_url):
+    """
+    Test that each user's token is applied and the response works with the API client.
+    """
+    adapter = PooledHTTPAdapter()
+    http = PooledAuthorizedHttp(credentials('token_a'), adapter=adapter, timeout=5)
+
+    result = HttpRequest(http, lambda resp, content: content, f"{server_url}/files").execute()
+
+    assert result == b'{"authorization": "Bearer token_a"}'
+
+
+def test_connections_are_reused_across_users(server_url):
+    """
+    Test that transports of different users share the adapter's kept-alive connections.
+    """
+    adapter = PooledHTTPAdapter()
+    first = PooledAuthorizedHttp(credentials('token_a'), adapter=adapter, timeout=5)
+    second = PooledAuthorizedHttp(credentials('token_b'), adapter=adapter, timeout=5)
+
+    for http in [first, second, first, second]:
+        response, content = http.request(f"{server_url}/files")
+        assert response.status == 200
+
+    metrics = adapter.get_metrics()
+    assert metrics["requests"] == 4
+    assert metrics["connections_opened"] == 1
+    assert metrics["reuse_ratio"] == 0.75
+
+
+def test_decompressed_responses_are_reported_like_httplib2(server_url):
+    """
+    Test that a gzip response is returned decompressed with a matching content length.
+    """
+    http = PooledAuthorizedHttp(credentials('token_a'), adapter=PooledHTTPAdapter(), timeout=5)
+
+    response, content = http.request(f"{server_url}/gzip")
+
+    assert content == b'{"compressed": true}'
+    assert response['content-length'] == str(len(content))
+    assert 'content-encoding' not in response
+
+
+def test_resumable_upload_308_is_not_followed(server_url):
+    """
+    Test that a "308 Resume Incomplete" response is returned to the API client.
+    """
+    http = PooledAuthorizedHttp(credentials('token_a'), adapter=PooledHTTPAdapter(), timeout=5)
+
+    response, _ = http.request(f"{server_url}/upload", method='PUT', body=b'0123456789')
+
+    assert response.status == 308
+    assert response['range'] == 'bytes=0-9'
+
+
+def test_close_keeps_shared_pool_open(server_url):
+    """
+    Test that closing one user's transport leaves the shared connection pool usable.
+    """
+    adapter = PooledHTTPAdapter()
+    first = PooledAuthorizedHttp(credentials('token_a'), adapter=adapter, timeout=5)
+    first.request(f"{server_url}/files")
+
+    first.close()
+    response, _ = PooledAuthorizedHttp(credentials('token_b'), adapter=adapter, timeout=5).request(f"{server_url}/files")
+
+    assert response.status == 200
+    assert adapter.get_metrics()["connections_opened"] == 1
@@ -0,0 +1,127 @@
+"""
+Unit tests for chunked Drive downloads.
+
+These tests cover spilling large downloads to disk, reading them back through memory
+maps, removing spill files on close, and opening download sources in parser workers.
+"""
+
+import os
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services.google_drive.media_download import SpooledDownload, download_media, open_source, as_buffer
+
+
+def chunked_downloader(chunks):
+    """
+    Build a stand-in for MediaIoBaseDownload that writes ``chunks`` one per call.
+
+    Args:
+        chunks (list): The downloaded chunks, in order.
+
+    Returns:
+        Callable: A replacement for the MediaIoBaseDownload class.
+    """
+    def create(fd, request, chunksize):
+        remaining = list(chunks)
+        downloader = Mock()
+
+        def next_chunk():
+            fd.write(remaining.pop(0))
+            return None, not remaining
+
+        downloader.next_chunk.side_effect = next_chunk
+        return downloader
+
+    return create
+
+
+def test_small_download_stays_in_memory():
+    """
+    Test that a download below the spool threshold never touches disk.
+    """
+    with patch('app.services.google_drive.media_download.MediaIoBaseDownload',
+               side_effect=chunked_downloader([b"abc", b"def"])):
+        download = download_media(Mock(), spool_threshold=1024, chunk_size=3)
+
+    with download:
+        assert not download.on_disk
+        assert download.read() == b"abcdef"
+        assert download.source() == b"abcdef"
+
+
+def test_large_download_spills_to_memory_mapped_file(tmp_path):
+    """
+    Test that a download above the spool threshold is written to disk, read through a
+    memory map, and removed on close.
+    """
+    with patch('app.services.google_drive.media_download.MediaIoBaseDownload',
+               side_effect=chunked_downloader([b"abcd", b"efgh", b"ij"])):
+        download = download_media(Mock(), spool_threshold=5, chunk_size=4, directory=str(tmp_path))
+
+    path = download.path
+    assert download.on_disk
+    assert download.source() == path
+    assert download.read(4) == b"abcd"
+    download.seek(0)
+    with download.getbuffer() as view:
+        assert bytes(view[4:8]) == b"efgh"
+
+    download.close()
+
+    assert not os.path.exists(path)
+
+
+def test_failed_download_removes_spill_file(tmp_path):
+    """
+    Test that a download failing midway leaves no spill file behind.
+    """
+    def create(fd, request, chunksize):
+        downloader = Mock()
+
+        def next_chunk():
+            fd.write(b"0123456789")
+            raise IOError("connection reset")
+
+        downloader.next_chunk.side_effect = next_chunk
+        return downloader
+
+    with patch('app.services.google_drive.media_download.MediaIoBaseDownload', side_effect=create):
+        with pytest.raises(IOError):
+            download_media(Mock(), spool_threshold=5, directory=str(tmp_path))
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_download_stops_at_max_bytes():
+    """
+    Test that a size-limited download stops requesting chunks and ends at the last complete line.
+    """
+    factory = chunked_downloader([b"line one\nline tw", b"o\nline three\n", b"never requested\n"])
+    created = []
+
+    def create(fd, request, chunksize):
+        created.append(chunksize)
+        return factory(fd, request, chunksize)
+
+    with patch('app.services.google_drive.media_download.MediaIoBaseDownload', side_effect=create):
+        download = download_media(Mock(), chunk_size=1024, max_bytes=16)
+
+    with download:
+        assert created == [16]
+        assert download.truncated is True
+        assert download.read() == b"line one\n"
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_open_source(tmp_path, on_disk):
+    """
+    Test that a parser worker can read a download's source from memory or from disk.
+    """
+    download = SpooledDownload(spool_threshold=2 if on_disk else 1024, directory=str(tmp_path))
+    download.write(b"content")
+    download.finish()
+
+    with download, open_source(download.source()) as file:
+        assert file.read() == b"content"
+        assert bytes(as_buffer(file)) == b"content"
@@ -0,0 +1,255 @@
+"""
+Unit tests for the TokenManager class.
+
+These tests cover tracking token expiries and user activity, refreshing due tokens and
+writing them back, skipping users whose refresh is held by another worker or who are no
+longer active, and handling lost write-backs, revoked tokens and users who have logged out.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+from unittest.mock import ANY, MagicMock, patch
+
+import pytest
+from google.auth.exceptions import RefreshError
+from redis.exceptions import WatchError
+
+from app.services.google_drive.token_manager import TokenManager
+
+STORED_CREDENTIALS = {
+    'token': 'old_token',
+    'refresh_token': 'refresh_token',
+    'token_uri': 'https://oauth2.googleapis.com/token',
+    'client_id': 'client_id',
+    'client_secret': 'client_secret',
+    'scopes': ['https://www.googleapis.com/auth/drive']
+}
+
+
+@pytest.fixture
+def redis_client():
+    """
+    Create a mock Redis client for an active user whose refresh lock is free and whose
+    pipeline holds a stored token.
+
+    Returns:
+        MagicMock: The client. Its transaction pipeline is ``redis_client.pipe`` and its
+            non-transactional pipeline ``redis_client.batch``.
+    """
+    client = MagicMock()
+    client.lock.return_value.acquire.return_value = True
+    client.scores = {'token:activity': time.time()}
+    client.zscore.side_effect = lambda key, user_id: client.scores.get(key)
+    pipe = MagicMock()
+    pipe.get.return_value = json.dumps(STORED_CREDENTIALS)
+    client.pipeline.return_value.__enter__.return_value = pipe
+    client.pipe = pipe
+    client.batch = client.pipeline.return_value
+    return client
+
+
+@pytest.fixture
+def credentials():
+    """
+    Patch the credentials built from the stored token.
+
+    Yields:
+        MagicMock: The credentials, which refresh to a new token expiring in an hour.
+    """
+    with patch('app.services.google_drive.token_manager.Credentials') as mock_credentials, \
+            patch('app.services.google_drive.token_manager.Request'):
+        instance = mock_credentials.return_value
+        instance.refresh_token = 'refresh_token'
+        instance.token = 'new_token'
+        instance.token_uri = STORED_CREDENTIALS['token_uri']
+        instance.client_id = 'client_id'
+        instance.client_secret = 'client_secret'
+        instance.scopes = STORED_CREDENTIALS['scopes']
+        instance.expiry = datetime.utcnow() + timedelta(hours=1)
+        yield instance
+
+
+def test_track_records_expiry(redis_client):
+    """
+    Test that a known expiry is stored as a Unix timestamp, and an unknown one only if untracked.
+    """
+    manager = TokenManager(redis_client)
+    expiry = datetime(2030, 1, 1)
+
+    manager.track('user_1', expiry)
+    manager.track('user_2')
+
+    redis_client.batch.zadd.assert_any_call('token:expiries', {'user_1': 1893456000.0})
+    args, kwargs = redis_client.batch.zadd.call_args
+    assert args[0] == 'token:expiries' and kwargs == {'nx': True}
+    assert args[1]['user_2'] <= time.time()
+    activity = [call for call in redis_client.batch.zadd.call_args_list if call[0][0] == 'token:activity']
+    assert [list(call[0][1]) for call in activity] == [['user_1'], ['user_2']]
+
+
+def test_touch_records_activity_at_most_once_per_interval(redis_client):
+    """
+    Test that repeated requests from one user write their activity once per interval.
+    """
+    manager = TokenManager(redis_client, touch_interval=60)
+
+    manager.touch('user_1')
+    manager.touch('user_1')
+    manager.touch('user_2')
+
+    assert redis_client.batch.execute.call_count == 2
+    redis_client.batch.zadd.assert_any_call('token:expiries', {'user_1': ANY}, nx=True)
+
+
+def test_refresh_due_refreshes_and_writes_back(redis_client, credentials):
+    """
+    Test that due tokens are refreshed and stored with their new expiry in one transaction.
+    """
+    redis_client.zrangebyscore.return_value = ['user_1']
+    manager = TokenManager(redis_client)
+
+    assert manager.refresh_due() == 1
+
+    credentials.refresh.assert_called_once()
+    redis_client.pipe.watch.assert_called_once_with('user:user_1:token')
+    redis_client.pipe.multi.assert_called_once()
+    stored = json.loads(redis_client.pipe.set.call_args[0][1])
+    assert stored['token'] == 'new_token'
+    assert redis_client.pipe.set.call_args[0][0] == 'user:user_1:token'
+    expiry = redis_client.pipe.zadd.call_args[0][1]['user_1']
+    assert expiry > time.time() + 3000
+    redis_client.pipe.execute.assert_called_once()
+    redis_client.lock.return_value.release.assert_called_once()
+    assert manager.get_metrics()["refreshed"] == 1
+
+
+def test_refresh_skips_user_locked_by_another_worker(redis_client, credentials):
+    """
+    Test that a refresh already held by another worker is not repeated or reported as successful.
+    """
+    redis_client.lock.return_value.acquire.return_value = False
+    manager = TokenManager(redis_client)
+
+    assert manager.refresh('user_1') is False
+    assert manager.refresh('user_1', force=True, wait=True) is False
+
+    credentials.refresh.assert_not_called()
+    assert manager.get_metrics()["locked"] == 2
+
+
+def test_refresh_waits_for_another_worker(redis_client, credentials):
+    """
+    Test that a waiting refresh reports the other worker's outcome, refreshing only if it failed.
+    """
+    redis_client.lock.return_value.acquire.side_effect = [False, True, False, True]
+    manager = TokenManager(redis_client, refresh_margin=300)
+
+    redis_client.scores['token:expiries'] = time.time() + 3600
+    assert manager.refresh('user_1', force=True, wait=True) is True
+    credentials.refresh.assert_not_called()
+
+    redis_client.scores['token:expiries'] = time.time()
+    assert manager.refresh('user_1', force=True, wait=True) is True
+    credentials.refresh.assert_called_once()
+    redis_client.lock.return_value.acquire.assert_called_with(blocking=True, blocking_timeout=30)
+
+
+def test_refresh_drops_inactive_user(redis_client, credentials):
+    """
+    Test that a due token of a user inactive for longer than the idle timeout is untracked.
+    """
+    redis_client.scores['token:activity'] = time.time() - 3600
+    manager = TokenManager(redis_client, idle_timeout=1800)
+
+    assert manager.refresh('user_1') is False
+
+    credentials.refresh.assert_not_called()
+    redis_client.batch.zrem.assert_any_call('token:expiries', 'user_1')
+    redis_client.batch.zrem.assert_any_call('token:activity', 'user_1')
+    assert manager.get_metrics()["inactive"] == 1
+
+    assert manager.refresh('user_1', force=True) is True
+    credentials.refresh.assert_called_once()
+
+
+def test_refresh_skips_token_already_refreshed(redis_client, credentials):
+    """
+    Test that a token whose tracked expiry moved past the margin is not refreshed again.
+    """
+    redis_client.scores['token:expiries'] = time.time() + 3600
+    manager = TokenManager(redis_client, refresh_margin=300)
+
+    assert manager.refresh('user_1') is True
+    credentials.refresh.assert_not_called()
+
+    assert manager.refresh('user_1', force=True) is True
+    credentials.refresh.assert_called_once()
+
+
+def test_refresh_counts_lost_write_back(redis_client, credentials):
+    """
+    Test that a token replaced while refreshing is kept rather than overwritten.
+    """
+    redis_client.pipe.execute.side_effect = WatchError()
+    manager = TokenManager(redis_client)
+
+    assert manager.refresh('user_1') is True
+    assert manager.get_metrics()["conflicts"] == 1
+    assert manager.get_metrics()["refreshed"] == 0
+
+
+def test_refresh_untracks_revoked_token(redis_client, credentials):
+    """
+    Test that a token that can no longer be refreshed stops being tracked.
+    """
+    credentials.refresh.side_effect = RefreshError('invalid_grant')
+    manager = TokenManager(redis_client)
+
+    assert manager.refresh('user_1') is False
+
+    redis_client.batch.zrem.assert_any_call('token:expiries', 'user_1')
+    redis_client.pipe.set.assert_not_called()
+    assert manager.get_metrics()["revoked"] == 1
+
+
+def test_refresh_untracks_logged_out_user(redis_client, credentials):
+    """
+    Test that a user with no stored token stops being tracked.
+    """
+    redis_client.pipe.get.return_value = None
+    manager = TokenManager(redis_client)
+
+    assert manager.refresh('user_1') is False
+
+    redis_client.batch.zrem.assert_any_call('token:expiries', 'user_1')
+    credentials.refresh.assert_not_called()
+
+
+def test_refresh_failure_is_retried_later(redis_client, credentials):
+    """
+    Test that an unexpected failure reschedules the refresh after the retry delay.
+    """
+    credentials.refresh.side_effect = OSError('network down')
+    manager = TokenManager(redis_client, retry_delay=60)
+
+    assert manager.refresh('user_1') is False
+
+    retry_at = redis_client.zadd.call_args[0][1]['user_1']
+    assert time.time() + 50 < retry_at <= time.time() + 60
+    assert manager.get_metrics()["failed"] == 1
+
+
+def test_start_and_stop_background_thread(redis_client):
+    """
+    Test that the background thread checks for due tokens and stops when asked.
+    """
+    redis_client.zrangebyscore.return_value = []
+    manager = TokenManager(redis_client, poll_interval=0.01)
+
+    manager.start()
+    time.sleep(0.05)
+    manager.stop(timeout=1)
+
+    assert redis_client.zrangebyscore.called
+    assert manager._thread is None
@@ -8,8 +8,8 @@ and document management.
 """
 
 import pytest
-from unittest.mock import Mock, patch
-from app.services.natural_language.chat_service import ChatService, DriveCore
+from unittest.mock import ANY, Mock, patch
+from app.services.natural_language.chat_service import ChatService, QUERY_INSTRUCTIONS, DriveCore
 
 
 @pytest.fixture
@@ -84,7 +84,7 @@ def test_has_drive_service(chat_service):
     assert chat_service_without_drive.has_drive_service() is False
 
 
-@patch('app.services.natural_language.chat_service.ChatOpenAI')
+@patch('app.services.natural_language.chat_service.ModelRouter')
 @patch('app.services.natural_language.chat_service.PineconeManager')
 def test_query(mock_pinecone_manager, mock_chat_openai, chat_service):
     """
@@ -94,7 +94,7 @@ def test_query(mock_pinecone_manager, mock_chat_openai, chat_service):
     processes input correctly and returns expected output.
 
     Args:
-        mock_chat_openai (Mock): Mocked ChatOpenAI instance.
+        mock_chat_openai (Mock): Mocked ModelRouter instance.
         mock_pinecone_manager (Mock): Mocked PineconeManager instance.
         chat_service (ChatService): The ChatService instance to test.
     """
@@ -113,6 +113,152 @@ def test_query(mock_pinecone_manager, mock_chat_openai, chat_service):
     mock_chat_openai.return_value.invoke.assert_called_once()
 
 
+def test_query_uses_stable_prompt_layout(chat_service):
+    """
+    Test that documents are ordered by ID and messages follow instructions, context, history, question.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.pinecone_manager = Mock()
+    chat_service.pinecone_manager.get_selected_documents.return_value = [
+        {"metadata": {"id": "doc_b", "content": "Second document", "isSelected": True}},
+        {"metadata": {"id": "doc_a", "content": "First document", "isSelected": True}}
+    ]
+    chat_service.llm = Mock()
+    chat_service.llm.invoke.return_value = Mock(content="Answer")
+    chat_service.memory.chat_memory.add_user_message("Earlier question")
+    chat_service.memory.chat_memory.add_ai_message("Earlier answer")
+
+    chat_service.query("New question")
+
+    messages = chat_service.llm.invoke.call_args[0][0]
+    assert [message.type for message in messages] == ["system", "system", "human", "ai", "human"]
+    assert messages[0].content == QUERY_INSTRUCTIONS
+    assert messages[1].content.index("First document") < messages[1].content.index("Second document")
+    assert messages[-1].content == "New question"
+
+
+def test_query_sends_question_context_after_cached_prefix(chat_service):
+    """
+    Test that context selected for the question is sent with it, leaving the prefix unchanged.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.pinecone_manager = Mock()
+    chat_service.pinecone_manager.get_selected_documents.return_value = [
+        {"metadata": {"id": "doc", "content": "Document text", "isSelected": True}}
+    ]
+    chat_service.llm = Mock()
+    chat_service.llm.invoke.return_value = Mock(content="Answer")
+
+    with patch.object(chat_service, '_build_context', return_value=("Document text", "Computed result")):
+        chat_service.query("First question")
+        first = chat_service.llm.invoke.call_args[0][0]
+        chat_service.query("Second question")
+        second = chat_service.llm.invoke.call_args[0][0]
+
+    assert second[:2] == first[:2]
+    assert second[-1].content == "Context for this question:\nComputed result\n\nQuestion: Second question"
+    assert chat_service.memory.chat_memory.messages[0].content == "First question"
+
+
+@patch('app.services.natural_language.chat_service.Config')
+def test_build_context_uses_summaries(mock_config, chat_service):
+    """
+    Test that summaries replace full text once the selection is large.
+
+    Args:
+        mock_config (Mock): Mocked application configuration.
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    mock_config.SUMMARY_CONTEXT_MIN_DOCUMENTS = 2
+    mock_config.SUMMARY_CONTEXT_TOKEN_THRESHOLD = 10
+    documents = [
+        {"metadata": {"id": "doc_1", "content": "long text " * 50, "summary": "A contract.", "keywords": ["contract"]}},
+        {"metadata": {"id": "doc_2", "content": "unsummarised text"}}
+    ]
+
+    context, question_context = chat_service._build_context(documents, "What is this?")
+
+    assert question_context == ""
+    assert "Document doc_1 summary: A contract.\nKeywords: contract" in context
+    assert "long text" not in context
+    assert "unsummarised text" in context
+
+    mock_config.SUMMARY_CONTEXT_TOKEN_THRESHOLD = 100000
+    assert "long text" in chat_service._build_context(documents, "What is this?")[0]
+
+
+def test_build_context_uses_tabular_engine(chat_service):
+    """
+    Test that selected spreadsheets are represented by the tabular query engine.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.tabular_query_engine = Mock()
+    chat_service.tabular_query_engine.is_tabular.side_effect = lambda mime_type: mime_type == 'text/csv'
+    chat_service.tabular_query_engine.describe_spreadsheet.return_value = "Spreadsheet sheet"
+    chat_service.tabular_query_engine.compute.return_value = {"sheet": "Computed result"}
+    documents = [
+        {"metadata": {"id": "sheet", "content": "a b c", "mimeType": "text/csv", "lastModified": "v1"}},
+        {"metadata": {"id": "doc", "content": "plain text", "mimeType": "text/plain"}}
+    ]
+
+    assert chat_service._build_context(documents, "Total?") == ("Spreadsheet sheet\n\nplain text", "Computed result")
+    assert chat_service.tabular_query_engine.get_frames.call_args.args[:2] == ("sheet", "v1")
+    chat_service.tabular_query_engine.compute.assert_called_once()
+    assert list(chat_service.tabular_query_engine.compute.call_args.args[1]) == ["sheet"]
+
+
+def test_build_context_packs_chunks(chat_service):
+    """
+    Test that chunk embeddings are used to pack a diverse context when the chunks exceed the budget.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.context_packer.token_budget = 5
+    chat_service.pinecone_manager = Mock()
+    chat_service.pinecone_manager.embed.return_value = [1.0, 0.0]
+    documents = [
+        {"metadata": {"id": "v1", "content": "boilerplate", "chunks": [
+            {"index": 0, "content": "boilerplate", "values": [1.0, 0.0]}]}},
+        {"metadata": {"id": "v2", "content": "boilerplate again", "chunks": [
+            {"index": 0, "content": "boilerplate again", "values": [1.0, 0.001]}]}},
+        {"metadata": {"id": "other", "content": "distinct", "chunks": [
+            {"index": 0, "content": "distinct", "values": [0.0, 1.0]}]}}
+    ]
+
+    assert chat_service._build_context(documents, "Question?") == ("", "boilerplate\n\ndistinct")
+    chat_service.pinecone_manager.embed.assert_called_once_with("Question?")
+
+    chat_service.context_packer.token_budget = 100
+    assert chat_service._build_context(documents, "Question?") == (
+        "boilerplate\n\nboilerplate again\n\ndistinct", "")
+
+
+def test_get_usage_metrics_reports_other_users_only_to_admins(chat_service):
+    """
+    Test that usage across endpoints and service metrics are only included when requested.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.usage_tracker = Mock()
+    chat_service.usage_tracker.get_usage.return_value = {"kinds": {}, "models": {}}
+
+    assert set(chat_service.get_usage_metrics(6)) == {"window_hours", "user"}
+    chat_service.usage_tracker.get_usage.assert_called_once_with('user', 'test_user', 6)
+    chat_service.usage_tracker.get_endpoint_usage.assert_not_called()
+
+    with patch.object(chat_service, 'llm'), patch.object(chat_service, 'extraction_cache'):
+        metrics = chat_service.get_usage_metrics(6, include_global=True)
+    assert "endpoints" in metrics and "redis" in metrics
+
+
 def test_clear_memory(chat_service):
     """
     Test the clear_memory method of ChatService.
@@ -147,13 +293,169 @@ def test_process_and_add_file(chat_service):
     chat_service.pinecone_manager = Mock()
     chat_service.pinecone_manager.get_document_metadata.return_value = None
     chat_service.file_extractor = Mock()
-    chat_service.file_extractor.extract_text_from_drive_file.return_value = "Extracted text"
-    chat_service.pinecone_manager.upsert_document.return_value = {"success": True}
+    chat_service.file_extractor.iter_text_from_drive_file.return_value = iter(["Extracted text"])
+    chat_service.pinecone_manager.upsert_document_stream.return_value = {"success": True, "content": "Extracted text"}
+    chat_service.document_summariser = Mock()
 
     result = chat_service.process_and_add_file("file_id", "file_name")
 
     assert result is True
-    chat_service.pinecone_manager.upsert_document.assert_called_once()
+    chat_service.pinecone_manager.upsert_document_stream.assert_called_once()
+    chat_service.document_summariser.summarise_in_background.assert_called_once_with(
+        "file_id", "test_user", "Extracted text", chat_service.pinecone_manager
+    )
+
+
+def test_process_and_add_file_uses_extraction_cache(chat_service):
+    """
+    Test that a cached extraction of the same file version skips the download and parse.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.drive_service = Mock()
+    chat_service.drive_service.get_file_details.return_value = {"modifiedTime": "2023-01-01", "md5Checksum": "abc"}
+    chat_service.pinecone_manager = Mock()
+    chat_service.pinecone_manager.get_document_metadata.return_value = None
+    chat_service.pinecone_manager.upsert_document_stream.return_value = {"success": True, "content": "Cached text"}
+    chat_service.file_extractor = Mock()
+    chat_service.extraction_cache = Mock()
+    chat_service.extraction_cache.get.return_value = "Cached text"
+    chat_service.document_summariser = Mock()
+
+    result = chat_service.process_and_add_file("file_id", "file_name")
+
+    assert result is True
+    chat_service.file_extractor.iter_text_from_drive_file.assert_not_called()
+    assert chat_service.pinecone_manager.upsert_document_stream.call_args[0][1] == ["Cached text"]
+    chat_service.extraction_cache.put.assert_not_called()
+
+
+def test_process_and_add_file_tags_truncated_documents(chat_service):
+    """
+    Test that a document cut short by the extraction budget is tagged and not cached.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.drive_service = Mock()
+    chat_service.drive_service.get_file_details.return_value = {"modifiedTime": "2023-01-01", "md5Checksum": "abc"}
+    chat_service.pinecone_manager = Mock()
+    chat_service.pinecone_manager.get_document_metadata.return_value = None
+    chat_service.file_extractor = Mock()
+    chat_service.extraction_cache = Mock()
+    chat_service.extraction_cache.get.return_value = None
+    chat_service.document_summariser = Mock()
+
+    def extract(file_id, file_name, mime_type=None, budget=None):
+        yield "First pages"
+        budget.truncated = True
+
+    def upsert(document, pages, user_id):
+        content = "\n\n".join(pages)
+        assert document["truncated"] is True
+        return {"success": True, "content": content}
+
+    chat_service.file_extractor.iter_text_from_drive_file.side_effect = extract
+    chat_service.pinecone_manager.upsert_document_stream.side_effect = upsert
+
+    assert chat_service.process_and_add_file("file_id", "file_name") is True
+    chat_service.extraction_cache.put.assert_not_called()
+
+
+def test_upload_and_index_file_extracts_from_uploaded_bytes(chat_service):
+    """
+    Test that an uploaded file is indexed from its bytes under the ID and time returned by Drive.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.pinecone_manager = Mock()
+    chat_service.pinecone_manager.upsert_document_stream.return_value = {"success": True, "content": "Uploaded text"}
+    chat_service.file_extractor = Mock()
+    chat_service.file_extractor.iter_text_from_upload.return_value = iter(["Uploaded   text"])
+    chat_service.extraction_cache = Mock()
+    chat_service.extraction_cache.key_for.return_value = "new_id:md5-abc:f4"
+    chat_service.document_summariser = Mock()
+    created = {"id": "new_id", "name": "notes.txt", "mimeType": "text/plain",
+               "modifiedTime": "2024-05-01T10:00:00Z", "md5Checksum": "abc"}
+
+    with patch('app.services.natural_language.chat_service.DriveFileOperations') as MockOperations:
+        MockOperations.return_value.create_file.return_value = created
+        result = chat_service.upload_and_index_file(b"Uploaded   text", "notes.txt", None, "folder_id")
+
+    assert result == {"id": "new_id", "name": "notes.txt", "mimeType": "text/plain",
+                      "modifiedTime": "2024-05-01T10:00:00Z", "indexed": True}
+    MockOperations.return_value.create_file.assert_called_once_with(
+        b"Uploaded   text", "notes.txt", "text/plain", "folder_id", fields=ANY
+    )
+    chat_service.file_extractor.iter_text_from_drive_file.assert_not_called()
+    document, pages, user_id = chat_service.pinecone_manager.upsert_document_stream.call_args[0]
+    assert document["id"] == "new_id"
+    assert document["lastModified"] == "2024-05-01T10:00:00Z"
+    assert pages == ["Uploaded text"]
+    chat_service.extraction_cache.put.assert_called_once_with("new_id:md5-abc:f4", "Uploaded text")
+
+
+def test_upload_and_index_file_keeps_upload_of_unsupported_type(chat_service):
+    """
+    Test that a file whose type cannot be extracted is still uploaded, but not indexed.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.pinecone_manager = Mock()
+    chat_service.file_extractor = Mock()
+    chat_service.file_extractor.iter_text_from_upload.side_effect = ValueError("Unsupported MIME type: image/png")
+
+    with patch('app.services.natural_language.chat_service.DriveFileOperations') as MockOperations:
+        MockOperations.return_value.create_file.return_value = {"id": "new_id", "modifiedTime": "2024-05-01"}
+        result = chat_service.upload_and_index_file(b"\x89PNG", "photo.png", "image/png")
+
+    assert result["id"] == "new_id"
+    assert result["indexed"] is False
+    chat_service.pinecone_manager.upsert_document_stream.assert_not_called()
+
+
+def test_process_and_add_multiple_files(chat_service):
+    """
+    Test the process_and_add_multiple_files method of ChatService.
+
+    This test verifies that the bulk plan decides which files are skipped,
+    reselected or reindexed, and that Drive metadata is not fetched again.
+
+    Args:
+        chat_service (ChatService): The ChatService instance to test.
+    """
+    chat_service.drive_service = Mock()
+    chat_service.drive_service.get_multiple_file_details.return_value = {
+        "current": {"modifiedTime": "2023-01-01", "mimeType": "text/plain"},
+        "unselected": {"modifiedTime": "2023-01-01", "mimeType": "text/plain"},
+        "changed": {"modifiedTime": "2023-02-01", "mimeType": "text/plain"}
+    }
+    chat_service.pinecone_manager = Mock()
+    chat_service.pinecone_manager.get_multiple_document_metadata.return_value = {
+        "current": {"lastModified": "2023-01-01", "isSelected": True},
+        "unselected": {"lastModified": "2023-01-01", "isSelected": False},
+        "changed": {"lastModified": "2023-01-01", "isSelected": True}
+    }
+    chat_service.pinecone_manager.update_document_selection.return_value = True
+    chat_service.pinecone_manager.upsert_document_stream.return_value = {"success": True, "content": "Extracted text"}
+    chat_service.file_extractor = Mock()
+    chat_service.document_summariser = Mock()
+
+    result = chat_service.process_and_add_multiple_files(
+        ["current", "unselected", "changed"], ["a.txt", "b.txt", "c.txt"]
+    )
+
+    assert result == {"successful_uploads": 3, "total_files": 3}
+    chat_service.drive_service.get_file_details.assert_not_called()
+    chat_service.pinecone_manager.get_document_metadata.assert_not_called()
+    chat_service.pinecone_manager.update_document_selection.assert_called_once_with("unselected", True, "test_user")
+    chat_service.pinecone_manager.delete_document.assert_not_called()
+    chat_service.file_extractor.iter_text_from_drive_file.assert_called_once_with(
+        "changed", "c.txt", mime_type="text/plain", budget=ANY
+    )
 
 
 def test_update_document_selection(chat_service):
@@ -185,8 +487,10 @@ def test_delete_document(chat_service):
     """
     chat_service.pinecone_manager = Mock()
     chat_service.pinecone_manager.delete_document.return_value = True
+    chat_service.ingest_single_flight = Mock()
 
     result = chat_service.delete_document("file_id")
 
     assert result is True
-    chat_service.pinecone_manager.delete_document.assert_called_once_with("file_id", "test_user")
\ No newline at end of file
+    chat_service.pinecone_manager.delete_document.assert_called_once_with("file_id", "test_user")
+    chat_service.ingest_single_flight.forget.assert_called_once_with("test_user:file_id")
\ No newline at end of file
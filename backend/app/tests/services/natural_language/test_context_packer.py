@@ -0,0 +1,49 @@
+"""
+Unit tests for the ContextPacker class.
+
+This module contains pytest-based unit tests for the ContextPacker class,
+which selects query context chunks by maximal marginal relevance within a token budget.
+"""
+
+from app.services.natural_language.context_packer import ContextPacker
+
+
+def test_pack_skips_near_duplicates():
+    """
+    Test that a near-duplicate of a packed chunk is skipped in favour of a distinct one.
+    """
+    query = [1.0, 0.2]
+    chunks = [[1.0, 0.0], [0.99, -0.01], [0.0, 1.0]]
+
+    selected = ContextPacker(token_budget=1000).pack(query, chunks, [10, 10, 10])
+
+    assert selected == [0, 2]
+
+
+def test_pack_respects_token_budget():
+    """
+    Test that packing stops once no remaining chunk fits the budget.
+    """
+    query = [1.0, 0.0, 0.0]
+    chunks = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+
+    selected = ContextPacker(token_budget=25).pack(query, chunks, [10, 20, 10])
+
+    assert selected == [0, 2]
+
+
+def test_pack_prefers_relevant_chunks():
+    """
+    Test that the most relevant chunk is packed when only one fits.
+    """
+    query = [0.0, 1.0]
+    chunks = [[1.0, 0.0], [0.1, 1.0]]
+
+    assert ContextPacker(token_budget=10).pack(query, chunks, [10, 10]) == [1]
+
+
+def test_pack_empty():
+    """
+    Test that packing no chunks returns no indices.
+    """
+    assert ContextPacker(token_budget=10).pack([1.0], [], []) == []
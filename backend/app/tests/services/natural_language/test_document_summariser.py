@@ -0,0 +1,91 @@
+"""
+Unit tests for the DocumentSummariser class.
+
+This module contains pytest-based unit tests for the DocumentSummariser class,
+which computes and caches document summaries and keywords at ingest time.
+"""
+
+import json
+import pytest
+from unittest.mock import Mock
+from app.services.natural_language.document_summariser import DocumentSummariser
+
+
+@pytest.fixture
+def mock_llm():
+    """
+    Fixture to create a mock language model.
+
+    Returns:
+        Mock: A mock language model returning a fixed summary.
+    """
+    llm = Mock()
+    llm.invoke.return_value = Mock(content=" Quarterly sales report. ")
+    return llm
+
+
+def test_extract_keywords(mock_llm):
+    """
+    Test that keywords are ranked by frequency and exclude stopwords.
+
+    Args:
+        mock_llm (Mock): The mock language model.
+    """
+    summariser = DocumentSummariser(mock_llm, max_keywords=2)
+    content = "Revenue grew. The revenue in Europe grew while revenue in Asia fell. None None None"
+
+    assert summariser.extract_keywords(content) == ["revenue", "grew"]
+
+
+def test_summarise_caches_result(mock_llm):
+    """
+    Test that a computed summary is stored in the cache under its content hash.
+
+    Args:
+        mock_llm (Mock): The mock language model.
+    """
+    mock_redis = Mock()
+    mock_redis.get.return_value = None
+    summariser = DocumentSummariser(mock_llm, mock_redis)
+
+    result = summariser.summarise("Sales figures for the quarter")
+
+    assert result["summary"] == "Quarterly sales report."
+    assert "sales" in result["keywords"]
+    cache_key = f"summary:{summariser.content_hash('Sales figures for the quarter')}"
+    mock_redis.set.assert_called_once_with(cache_key, json.dumps(result), ex=summariser.cache_ttl)
+
+
+def test_summarise_uses_cache(mock_llm):
+    """
+    Test that a cached summary is returned without calling the model.
+
+    Args:
+        mock_llm (Mock): The mock language model.
+    """
+    cached = {"summary": "Cached", "keywords": ["cached"], "contentHash": "abc"}
+    mock_redis = Mock()
+    mock_redis.get.return_value = json.dumps(cached)
+
+    result = DocumentSummariser(mock_llm, mock_redis).summarise("Any content")
+
+    assert result == cached
+    mock_llm.invoke.assert_not_called()
+
+
+def test_summarise_in_background(mock_llm):
+    """
+    Test that the background task stores the summary with the document's vectors.
+
+    Args:
+        mock_llm (Mock): The mock language model.
+    """
+    pinecone_manager = Mock()
+
+    future = DocumentSummariser(mock_llm).summarise_in_background("file_id", "user_id", "Sales data", pinecone_manager)
+    future.result(timeout=5)
+
+    pinecone_manager.update_document_summary.assert_called_once_with(
+        "file_id", "user_id", "Quarterly sales report.", ["sales", "data"]
+    )
+    assert mock_llm.invoke.call_args.kwargs == {"user_id": "user_id"}
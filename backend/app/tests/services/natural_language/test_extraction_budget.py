@@ -0,0 +1,100 @@
+"""
+Unit tests for the ExtractionBudget class.
+
+These tests cover stopping extraction at page, byte and token limits, tagging the
+document as truncated, and closing the source so no further text is extracted.
+"""
+
+from unittest.mock import patch
+
+from app.services.natural_language.extraction_budget import ExtractionBudget, TRUNCATION_MARKER
+from app.utils.token_utils import count_tokens
+
+
+def test_no_limits_passes_everything_through():
+    """
+    Test that a budget without limits yields every part unchanged.
+    """
+    budget = ExtractionBudget()
+
+    assert list(budget.limit(["a", "b"])) == ["a", "b"]
+    assert budget.truncated is False
+    assert budget.download_limit() is None
+
+
+def test_page_limit_stops_and_closes_source():
+    """
+    Test that extraction stops after the page limit and the source generator is closed.
+    """
+    extracted = []
+    closed = []
+
+    def pages():
+        try:
+            for number in range(100):
+                extracted.append(number)
+                yield f"page {number}"
+        finally:
+            closed.append(True)
+
+    budget = ExtractionBudget(max_pages=2)
+
+    assert list(budget.limit(pages())) == ["page 0", "page 1", TRUNCATION_MARKER]
+    assert budget.truncated is True
+    assert extracted == [0, 1, 2]
+    assert closed == [True]
+
+
+def test_exact_page_count_is_not_truncated():
+    """
+    Test that a document with exactly the allowed number of pages is not marked truncated.
+    """
+    budget = ExtractionBudget(max_pages=2)
+
+    assert list(budget.limit(["a", "b"])) == ["a", "b"]
+    assert budget.truncated is False
+
+
+def test_byte_limit_cuts_on_character_boundary():
+    """
+    Test that the byte limit cuts the last part without splitting a multi-byte character.
+    """
+    budget = ExtractionBudget(max_bytes=5)
+
+    assert list(budget.limit(["abc", "déf", "ghi"])) == ["abc", "d", TRUNCATION_MARKER]
+    assert budget.truncated is True
+
+
+def test_token_limit_cuts_text():
+    """
+    Test that the token limit keeps the text within the budget.
+    """
+    budget = ExtractionBudget(max_tokens=20)
+    text = " ".join(f"word{number}" for number in range(200))
+
+    parts = list(budget.limit([text]))
+
+    assert parts[-1] == TRUNCATION_MARKER
+    assert text.startswith(parts[0])
+    assert 0 < budget.tokens <= 20
+
+
+def test_each_part_is_tokenized_once():
+    """
+    Test that parts within the budget are counted once, with or without a token limit.
+    """
+    for budget in (ExtractionBudget(), ExtractionBudget(max_tokens=1000)):
+        with patch('app.services.natural_language.extraction_budget.count_tokens',
+                   wraps=count_tokens) as mock_count:
+            assert list(budget.limit(["first part", "second part"])) == ["first part", "second part"]
+
+        assert mock_count.call_count == 2
+        assert budget.tokens == count_tokens("first part") + count_tokens("second part")
+
+
+def test_download_limit_uses_smallest_limit():
+    """
+    Test that the download limit converts token limits generously and takes the smaller limit.
+    """
+    assert ExtractionBudget(max_tokens=100).download_limit() == 800
+    assert ExtractionBudget(max_tokens=100, max_bytes=500).download_limit() == 500
@@ -0,0 +1,279 @@
+"""
+Unit tests for the ExtractionCache class.
+
+This module contains pytest-based unit tests for the ExtractionCache class, which
+stores compressed extracted text by file version on disk or in Redis.
+"""
+
+import os
+import time
+import zlib
+import pytest
+from unittest.mock import Mock, patch
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app.services.natural_language.extraction_cache import ExtractionCache
+
+
+def test_key_for_prefers_checksum_then_version():
+    """
+    Test that binary files are keyed by checksum, native files by version, and others not at all.
+    """
+    assert ExtractionCache.key_for("f1", {"md5Checksum": "abc", "version": "7"}).startswith("f1:md5-abc:")
+    assert ExtractionCache.key_for("f1", {"version": "7"}).startswith("f1:v-7:")
+    assert ExtractionCache.key_for("f1", {"modifiedTime": "2023-01-01"}) is None
+
+
+def test_disk_cache_round_trip(tmp_path):
+    """
+    Test that text stored on disk is compressed and returned on the next lookup.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+    """
+    cache = ExtractionCache(directory=str(tmp_path))
+
+    assert cache.get("f1:md5-abc:f1") is None
+    cache.put("f1:md5-abc:f1", "extracted text " * 100)
+
+    assert cache.get("f1:md5-abc:f1") == "extracted text " * 100
+    entry = next(tmp_path.iterdir())
+    assert entry.stat().st_size < len("extracted text " * 100)
+    metrics = cache.get_metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["stores"]) == (1, 1, 1)
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    """
+    Test that the least recently used entries are evicted once the size bound is exceeded.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+    """
+    text = os.urandom(600).hex()
+    entry_size = len(zlib.compress(text.encode('utf-8'), 6))
+    # Room for two entries above the low-water mark the store evicts down to
+    cache = ExtractionCache(directory=str(tmp_path), max_bytes=int(entry_size * 2.5))
+
+    cache.put("old", text)
+    cache.put("used", text)
+    past = time.time() - 60
+    for entry in tmp_path.iterdir():
+        os.utime(entry, (past, past))
+    cache.get("used")
+    cache.put("new", text)
+
+    assert cache.get("old") is None
+    assert cache.get("used") == text
+    assert cache.get("new") == text
+    assert cache.get_metrics()["evictions"] == 1
+
+
+class FakeRedis:
+    """
+    An in-memory stand-in for the Redis commands the extraction cache uses, counting how
+    many keys each command reads.
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = {}
+        self.zsets = {}
+        self.reads = {}
+
+    def _read(self, command, count=1):
+        if count:
+            self.reads[command] = self.reads.get(command, 0) + count
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def exists(self, key):
+        return int(key in self.strings)
+
+    def delete(self, key):
+        return int(self.strings.pop(key, None) is not None)
+
+    def incrby(self, key, amount):
+        value = int(self.strings.get(key, b"0")) + amount
+        self.strings[key] = str(value).encode()
+        return value
+
+    def decrby(self, key, amount):
+        return self.incrby(key, -amount)
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hmget(self, key, fields):
+        self._read('hmget', len(fields))
+        return [self.hget(key, field) for field in fields]
+
+    def hvals(self, key):
+        self._read('hvals', len(self.hashes.get(key, {})))
+        return list(self.hashes.get(key, {}).values())
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = str(value).encode()
+
+    def hdel(self, key, field):
+        return int(self.hashes.get(key, {}).pop(field, None) is not None)
+
+    def zadd(self, key, mapping, xx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not xx or member in zset:
+                zset[member] = score
+        return 0
+
+    def zrange(self, key, start, end):
+        members = sorted(self.zsets.get(key, {}), key=self.zsets.get(key, {}).get)[start:end + 1]
+        self._read('zrange', len(members))
+        return [member.encode() for member in members]
+
+    def zrem(self, key, member):
+        return int(self.zsets.get(key, {}).pop(member, None) is not None)
+
+
+class FakePipeline:
+    """Queues FakeRedis commands and runs them on execute."""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        return [getattr(self.redis_client, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+def test_redis_cache_round_trip():
+    """
+    Test that Redis entries are stored compressed, without expiry, with their size counted.
+    """
+    redis_client = FakeRedis()
+    cache = ExtractionCache(redis_client)
+
+    cache.put("f1", "extracted text")
+    stored = redis_client.strings["extraction:entry:f1"]
+    assert zlib.decompress(stored) == b"extracted text"
+    assert redis_client.hashes["extraction:sizes"] == {"f1": str(len(stored)).encode()}
+    assert int(redis_client.strings["extraction:total"]) == len(stored)
+
+    cache.put("f1", "extracted text, longer this time")
+    assert int(redis_client.strings["extraction:total"]) == len(redis_client.strings["extraction:entry:f1"])
+    assert cache.get("f1") == "extracted text, longer this time"
+
+
+def test_redis_errors_are_misses():
+    """
+    Test that an unavailable Redis is treated as a cache miss.
+    """
+    redis_client = Mock()
+    redis_client.pipeline.return_value.execute.side_effect = RedisConnectionError()
+    cache = ExtractionCache(redis_client)
+
+    assert cache.get("f1") is None
+    cache.put("f1", "text")
+    assert cache.get_metrics()["errors"] == 2
+
+
+def test_requires_a_store():
+    """
+    Test that a cache without Redis or a directory cannot be created.
+    """
+    with pytest.raises(ValueError):
+        ExtractionCache()
+
+
+def test_redis_eviction_reads_only_least_recently_used_entries():
+    """
+    Test that writes under the limit read no bookkeeping, and eviction reads only its victims.
+    """
+    redis_client = FakeRedis()
+    text = os.urandom(300).hex()
+    entry_size = len(zlib.compress(text.encode('utf-8'), 6))
+    cache = ExtractionCache(redis_client, max_bytes=entry_size * 20)
+    cache.store.evict_batch_size = 2
+
+    for index in range(20):
+        cache.put(f"f{index}", text)
+        redis_client.zsets["extraction:lru"][f"f{index}"] = index
+    assert redis_client.reads == {}
+
+    cache.put("new", text)
+
+    assert cache.get_metrics()["evictions"] == 1
+    assert "f0" not in redis_client.hashes["extraction:sizes"]
+    assert "extraction:entry:f0" not in redis_client.strings
+    assert int(redis_client.strings["extraction:total"]) == entry_size * 20
+    assert redis_client.reads == {'zrange': 2, 'hmget': 2}
+
+
+def test_redis_missing_entry_bookkeeping_is_removed():
+    """
+    Test that an entry dropped by Redis itself loses its size and access time on the next lookup.
+    """
+    redis_client = FakeRedis()
+    cache = ExtractionCache(redis_client)
+    cache.put("f1", "extracted text")
+    del redis_client.strings["extraction:entry:f1"]
+
+    assert cache.get("f1") is None
+
+    assert redis_client.hashes["extraction:sizes"] == {}
+    assert redis_client.zsets["extraction:lru"] == {}
+    assert int(redis_client.strings["extraction:total"]) == 0
+
+
+def test_redis_total_counts_entries_stored_before_it():
+    """
+    Test that the size counter starts from the sizes already recorded.
+    """
+    redis_client = FakeRedis()
+    redis_client.hashes["extraction:sizes"] = {"old": b"100"}
+    cache = ExtractionCache(redis_client)
+
+    cache.put("f1", "text")
+
+    assert int(redis_client.strings["extraction:total"]) == 100 + len(redis_client.strings["extraction:entry:f1"])
+
+
+def test_disk_cache_lists_directory_only_when_needed(tmp_path):
+    """
+    Test that the disk store keeps its total in memory and lists the directory to evict or reconcile.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+    """
+    text = os.urandom(600).hex()
+    entry_size = len(zlib.compress(text.encode('utf-8'), 6))
+    cache = ExtractionCache(directory=str(tmp_path), max_bytes=entry_size * 10)
+
+    with patch('app.services.natural_language.extraction_cache.os.scandir', wraps=os.scandir) as scandir:
+        for index in range(10):
+            cache.put(f"f{index}", text)
+        # The first write learns the total from the directory
+        assert scandir.call_count == 1
+
+        cache.store._scanned_at -= cache.store.reconcile_interval
+        cache.put("f0", text)
+        assert scandir.call_count == 2
+
+        cache.put("new", text)
+        assert scandir.call_count == 3
+    # Eviction frees space down to the low-water mark
+    assert len(list(tmp_path.iterdir())) == 9
@@ -0,0 +1,90 @@
+"""
+Unit tests for the extractor plugin registry.
+
+These tests cover looking plugins up by file type and MIME type, registering new
+formats, and importing parser libraries only when a format is first parsed.
+"""
+
+import os
+import sys
+import subprocess
+from io import BytesIO
+from unittest.mock import Mock
+
+import pytest
+
+from app.services.natural_language.extractor_registry import (
+    ExtractorPlugin,
+    ExtractorRegistry,
+    extractor_registry
+)
+from app.services.natural_language.file_extractor import FileExtractor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+
+def test_builtin_plugins_by_mime_type():
+    """
+    Test that downloaded files map to their file types, including plain text.
+    """
+    assert extractor_registry.for_mime_type('application/pdf').file_type == 'pdf'
+    assert extractor_registry.for_mime_type('text/plain').file_type == 'txt'
+    assert extractor_registry.for_mime_type('application/vnd.ms-excel').file_type == 'xls'
+
+    with pytest.raises(ValueError, match="Unsupported MIME type: image/png"):
+        extractor_registry.for_mime_type('image/png')
+
+
+def extract_upper(file, file_type, file_extractor):
+    """An extractor plugin for the tests, referenced by import path."""
+    return [file.read().decode().upper()]
+
+
+def test_register_plugin_by_import_path():
+    """
+    Test that a plugin given by import path is only resolved when first used.
+    """
+    registry = ExtractorRegistry()
+    plugin = registry.register(ExtractorPlugin(
+        'md', 'app.tests.services.natural_language.test_extractor_registry:extract_upper',
+        mime_types=['text/markdown']
+    ))
+
+    assert registry.loaded_file_types() == []
+    assert registry.for_mime_type('text/markdown') is plugin
+    assert registry.get('md').extract(BytesIO(b"# title"), Mock()) == ["# TITLE"]
+    assert registry.loaded_file_types() == ['md']
+
+
+def test_load_document_uses_registered_plugin(monkeypatch):
+    """
+    Test that FileExtractor parses new formats through plugins registered on the shared registry.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    registry = ExtractorRegistry()
+    registry.register(ExtractorPlugin('md', lambda file, file_type, extractor: [file.read().decode()]))
+    monkeypatch.setattr('app.services.natural_language.file_extractor.extractor_registry', registry)
+
+    result = FileExtractor(drive_core=None).load_document(BytesIO(b"# Title"), 'md')
+
+    assert [document.page_content for document in result] == ["# Title"]
+
+
+def test_file_extractor_import_defers_parser_libraries():
+    """
+    Test that importing the file extractor does not import any document parser library.
+    chardet is left out, as the HTTP client libraries already import it.
+    """
+    script = (
+        "import sys\n"
+        "import app.services.natural_language.file_extractor\n"
+        "print(','.join(name for name in ['docx2txt', 'PyPDF2', 'openpyxl', 'xlrd',"
+        " 'langchain_community.document_loaders'] if name in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR, env=os.environ.copy(),
+                            capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
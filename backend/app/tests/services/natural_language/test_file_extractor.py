@@ -7,10 +7,13 @@ These tests cover different functionalities including file conversion, document
 and text extraction from different file types.
 """
 
+import os
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from io import BytesIO
-from app.services.natural_language.file_extractor import FileExtractor, DriveCore
+from app.services.natural_language.file_extractor import FileExtractor, DriveCore, parse_document_text
+from app.services.google_drive.media_download import SpooledDownload
+from app.services.natural_language.extraction_budget import ExtractionBudget, TRUNCATION_MARKER
 from langchain.schema import Document
 
 
@@ -41,6 +44,29 @@ def file_extractor(mock_drive_core):
     return FileExtractor(drive_core=mock_drive_core)
 
 
+def fake_downloader(content):
+    """
+    Build a stand-in for MediaIoBaseDownload that writes ``content`` in one chunk.
+
+    Args:
+        content (bytes): The downloaded content.
+
+    Returns:
+        Callable: A replacement for the MediaIoBaseDownload class.
+    """
+    def create(fd, request, chunksize):
+        downloader = Mock()
+
+        def next_chunk():
+            fd.write(content)
+            return None, True
+
+        downloader.next_chunk.side_effect = next_chunk
+        return downloader
+
+    return create
+
+
 def test_convert_google_doc_to_docx(file_extractor):
     """
     Test the convert_google_doc_to_docx method of FileExtractor.
@@ -51,13 +77,15 @@ def test_convert_google_doc_to_docx(file_extractor):
         file_extractor (FileExtractor): The FileExtractor instance to test.
     """
     mock_request = MagicMock()
-    mock_request.execute.return_value = b"mock docx content"
     file_extractor.drive_core.drive_service.files().export_media.return_value = mock_request
 
-    result = file_extractor.convert_google_doc_to_docx("file_id")
+    with patch('app.services.google_drive.media_download.MediaIoBaseDownload',
+               side_effect=fake_downloader(b"mock docx content")):
+        result = file_extractor.convert_google_doc_to_docx("file_id")
 
-    assert isinstance(result, BytesIO)
+    assert isinstance(result, SpooledDownload)
     assert result.getvalue() == b"mock docx content"
+    mock_request.execute.assert_not_called()
     file_extractor.drive_core.drive_service.files().export_media.assert_called_once_with(
         fileId="file_id",
         mimeType='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
@@ -74,13 +102,15 @@ def test_convert_google_sheet_to_xlsx(file_extractor):
         file_extractor (FileExtractor): The FileExtractor instance to test.
     """
     mock_request = MagicMock()
-    mock_request.execute.return_value = b"mock xlsx content"
     file_extractor.drive_core.drive_service.files().export_media.return_value = mock_request
 
-    result = file_extractor.convert_google_sheet_to_xlsx("file_id")
+    with patch('app.services.google_drive.media_download.MediaIoBaseDownload',
+               side_effect=fake_downloader(b"mock xlsx content")):
+        result = file_extractor.convert_google_sheet_to_xlsx("file_id")
 
-    assert isinstance(result, BytesIO)
+    assert isinstance(result, SpooledDownload)
     assert result.getvalue() == b"mock xlsx content"
+    mock_request.execute.assert_not_called()
     file_extractor.drive_core.drive_service.files().export_media.assert_called_once_with(
         fileId="file_id",
         mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
@@ -105,7 +135,7 @@ def test_load_document_file_path(file_extractor, file_type, expected_loader):
         file_type (str): The type of file to test.
         expected_loader (str): The name of the expected loader class.
     """
-    with patch(f'app.services.natural_language.file_extractor.{expected_loader}') as mock_loader:
+    with patch(f'langchain_community.document_loaders.{expected_loader}') as mock_loader:
         mock_loader.return_value.load.return_value = [Document(page_content="mock content")]
         
         result = file_extractor.load_document(f"mock_file.{file_type}", file_type)
@@ -135,10 +165,10 @@ def test_load_document_bytesio(file_extractor, file_type, content):
     """
     mock_file = BytesIO(content)
     
-    with patch('app.services.natural_language.file_extractor.docx2txt.process', return_value="mock docx text"), \
-         patch('app.services.natural_language.file_extractor.chardet.detect', return_value={'encoding': 'utf-8'}), \
-         patch('app.services.natural_language.file_extractor.PdfReader') as mock_pdf_reader, \
-         patch('app.services.natural_language.file_extractor.openpyxl.load_workbook') as mock_load_workbook:
+    with patch('docx2txt.process', return_value="mock docx text"), \
+         patch('chardet.detect', return_value={'encoding': 'utf-8'}), \
+         patch('app.services.natural_language.pdf_extractor.PdfReader') as mock_pdf_reader, \
+         patch('openpyxl.load_workbook') as mock_load_workbook:
         
         if file_type == 'pdf':
             mock_pdf_reader.return_value.pages = [MagicMock(extract_text=lambda: "mock pdf text")]
@@ -146,7 +176,7 @@ def test_load_document_bytesio(file_extractor, file_type, content):
             mock_workbook = MagicMock()
             mock_workbook.sheetnames = ["Sheet1"]
             mock_sheet = MagicMock()
-            mock_sheet.iter_rows.return_value = [[MagicMock(value="cell1"), MagicMock(value="cell2")]]
+            mock_sheet.iter_rows.return_value = [("cell1", "cell2")]
             mock_workbook.__getitem__.return_value = mock_sheet
             mock_load_workbook.return_value = mock_workbook
         
@@ -196,14 +226,93 @@ def test_extract_text_from_drive_file(file_extractor):
     mock_files.get.return_value = mock_get
     mock_get.execute = mock_execute
 
-    with patch.object(file_extractor, 'convert_google_doc_to_docx', return_value=BytesIO(b"mock docx content")), \
-         patch.object(file_extractor, 'load_document', return_value=[Document(page_content="mock extracted text")]):
+    with patch('app.services.google_drive.media_download.MediaIoBaseDownload',
+               side_effect=fake_downloader("\ufeffmock extracted text".encode('utf-8'))), \
+         patch.object(file_extractor, 'convert_google_doc_to_docx') as mock_convert:
         
         result = file_extractor.extract_text_from_drive_file("file_id", "file_name")
         
         assert result == "mock extracted text"
         mock_files.get.assert_called_once_with(fileId="file_id", fields='mimeType')
         mock_execute.assert_called_once()
+        mock_files.export_media.assert_called_once_with(fileId="file_id", mimeType='text/plain')
+        mock_convert.assert_not_called()
+
+
+def test_extract_text_from_google_slides(file_extractor):
+    """
+    Test that Google Slides presentations are exported as plain text.
+
+    Args:
+        file_extractor (FileExtractor): The FileExtractor instance to test.
+    """
+    with patch('app.services.google_drive.media_download.MediaIoBaseDownload',
+               side_effect=fake_downloader(b"Slide title\nBullet point")):
+        result = file_extractor.extract_text_from_drive_file(
+            "file_id", "deck", mime_type='application/vnd.google-apps.presentation'
+        )
+
+    assert result == "Slide title\nBullet point"
+    file_extractor.drive_core.drive_service.files().export_media.assert_called_once_with(
+        fileId="file_id", mimeType='text/plain'
+    )
+
+
+def test_extract_text_from_google_sheet_reads_each_tab_through_sheets_api(file_extractor):
+    """
+    Test that each cell tab of a Google Sheet is read with the Sheets API instead of parsing an .xlsx export.
+
+    Args:
+        file_extractor (FileExtractor): The FileExtractor instance to test.
+    """
+    file_extractor.drive_core.sheets_service = Mock()
+    spreadsheets = file_extractor.drive_core.sheets_service.spreadsheets.return_value
+    spreadsheets.get.return_value.execute.return_value = {'sheets': [
+        {'properties': {'sheetId': 0, 'title': 'Sales', 'sheetType': 'GRID', 'gridProperties': {'rowCount': 3}}},
+        {'properties': {'sheetId': 5, 'title': 'Chart', 'sheetType': 'OBJECT'}},
+        {'properties': {'sheetId': 7, 'title': "Bob's costs", 'sheetType': 'GRID', 'gridProperties': {'rowCount': 2}}},
+    ]}
+    values = {
+        "'Sales'!1:3": [["region", "amount"], ["North", "100"], [""]],
+        "'Bob''s costs'!1:2": [["item", "cost"], ["Rent", "1,200"]]
+    }
+    spreadsheets.values.return_value.get.side_effect = lambda spreadsheetId, range, majorDimension: Mock(
+        execute=Mock(return_value={'values': values[range]}))
+
+    with patch.object(file_extractor, 'convert_google_sheet_to_xlsx') as mock_convert:
+        result = file_extractor.extract_text_from_drive_file(
+            "file_id", "budget", mime_type='application/vnd.google-apps.spreadsheet'
+        )
+
+    assert result == 'Sheet: Sales\nregion,amount\nNorth,100\n\nSheet: Bob\'s costs\nitem,cost\nRent,"1,200"'
+    assert [call.kwargs['range'] for call in spreadsheets.values.return_value.get.call_args_list] == [
+        "'Sales'!1:3", "'Bob''s costs'!1:2"]
+    mock_convert.assert_not_called()
+
+
+def test_google_sheet_tab_rows_are_read_in_pages(file_extractor):
+    """
+    Test that a long tab is read a page of rows at a time, and no further than the row cap needs.
+
+    Args:
+        file_extractor (FileExtractor): The FileExtractor instance to test.
+    """
+    file_extractor.drive_core.sheets_service = Mock()
+    values_get = file_extractor.drive_core.sheets_service.spreadsheets.return_value.values.return_value.get
+    values_get.return_value.execute.return_value = {'values': [["a"], ["b"]]}
+    tab = {'title': 'Data', 'gridProperties': {'rowCount': 12000}}
+
+    with patch('app.services.natural_language.file_extractor.SHEET_VALUES_PAGE_ROWS', 5000):
+        assert len(list(file_extractor.iter_google_sheet_tab_rows("file_id", tab))) == 6
+        assert [call.kwargs['range'] for call in values_get.call_args_list] == [
+            "'Data'!1:5000", "'Data'!5001:10000", "'Data'!10001:12000"]
+
+        values_get.reset_mock()
+        file_extractor.spreadsheet_extractor.max_rows_per_sheet = 1
+        lines = list(file_extractor.spreadsheet_extractor.iter_rows(
+            file_extractor.iter_google_sheet_tab_rows("file_id", tab)))
+    assert lines == ["a", "[truncated after 1 rows]"]
+    assert values_get.call_count == 1
 
 def test_extract_text_from_drive_file_unsupported_mime_type(file_extractor):
     """
@@ -219,4 +328,156 @@ def test_extract_text_from_drive_file_unsupported_mime_type(file_extractor):
     }
     
     with pytest.raises(ValueError, match="Unsupported MIME type: unsupported/mime-type"):
-        file_extractor.extract_text_from_drive_file("file_id", "file_name")
\ No newline at end of file
+        file_extractor.extract_text_from_drive_file("file_id", "file_name")
+
+def test_load_dataframes_csv(file_extractor):
+    """
+    Test the load_dataframes method of FileExtractor with a CSV file.
+
+    This test verifies that CSV content is loaded as a typed DataFrame.
+
+    Args:
+        file_extractor (FileExtractor): The FileExtractor instance to test.
+    """
+    frames = file_extractor.load_dataframes(BytesIO(b"region,amount\nNorth,100\nSouth,50\n"), 'csv')
+
+    assert list(frames.keys()) == ['Sheet1']
+    assert frames['Sheet1']['amount'].sum() == 150
+
+def test_iter_document_text_uses_sandbox(mock_drive_core):
+    """
+    Test that documents are parsed in the sandbox pool when one is configured.
+
+    Args:
+        mock_drive_core (Mock): A mock DriveCore object.
+    """
+    sandbox = Mock()
+    sandbox.run.return_value = ["parsed text"]
+    file_extractor = FileExtractor(drive_core=mock_drive_core, sandbox=sandbox)
+
+    result = list(file_extractor.iter_document_text(BytesIO(b"docx content"), 'docx'))
+
+    assert result == ["parsed text"]
+    sandbox.run.assert_called_once_with(parse_document_text, b"docx content", 'docx')
+
+
+def test_parse_document_text():
+    """
+    Test that the sandbox entry point parses document bytes into text parts.
+    """
+    assert parse_document_text(b"plain text", 'txt') == ["plain text"]
+
+
+def test_extract_dataframes_from_drive_file_sends_spill_path_to_sandbox(mock_drive_core):
+    """
+    Test that a download spilled to disk reaches the sandbox as a path and is removed afterwards.
+
+    Args:
+        mock_drive_core (Mock): A mock DriveCore object.
+    """
+    sandbox = Mock()
+    sandbox.run.return_value = {}
+    file_extractor = FileExtractor(drive_core=mock_drive_core, sandbox=sandbox)
+    download = SpooledDownload(spool_threshold=4)
+    download.write(b"region,amount\nNorth,100\n")
+    download.finish()
+
+    with patch.object(file_extractor, '_download', return_value=download):
+        file_extractor.extract_dataframes_from_drive_file("file_id", 'text/csv')
+
+    source = sandbox.run.call_args[0][1]
+    assert source == download.path
+    assert download.closed
+    assert not os.path.exists(source)
+
+
+def test_iter_text_from_drive_file_downloads_only_budgeted_bytes(file_extractor):
+    """
+    Test that a plain text file is fetched with a size limit and tagged as truncated when cut short.
+
+    Args:
+        file_extractor (FileExtractor): The FileExtractor instance to test.
+    """
+    download = SpooledDownload()
+    download.write(b"first line\n")
+    download.finish()
+    download.truncated = True
+    budget = ExtractionBudget(max_bytes=1000)
+
+    with patch.object(file_extractor, '_download', return_value=download) as mock_download:
+        parts = list(file_extractor.iter_text_from_drive_file("file_id", "log.txt", mime_type='text/plain',
+                                                              budget=budget))
+
+    assert parts == ["first line\n", TRUNCATION_MARKER]
+    assert budget.truncated is True
+    assert mock_download.call_args.kwargs["max_bytes"] == 1000
+    assert download.closed
+
+
+def test_iter_document_text_decodes_legacy_encoded_text(file_extractor):
+    """
+    Test that plain text which is not UTF-8 is decoded in its detected encoding instead of failing.
+
+    Args:
+        file_extractor (FileExtractor): The FileExtractor instance to test.
+    """
+    with patch('chardet.detect', return_value={'encoding': 'windows-1252'}):
+        parts = list(file_extractor.iter_document_text(BytesIO("Café menu\n".encode('cp1252')), 'txt'))
+
+    assert parts == ["Café menu\n"]
+
+
+def test_iter_document_text_streams_csv_rows_within_caps(file_extractor):
+    """
+    Test that CSV files are parsed in-process row by row, with the spreadsheet row cap applied.
+
+    Args:
+        file_extractor (FileExtractor): The FileExtractor instance to test.
+    """
+    file_extractor.sandbox = Mock()
+    file_extractor.spreadsheet_extractor.max_rows_per_sheet = 2
+    content = b"region,amount,\n\nNorth,100\nSouth,50\nEast,75\n"
+
+    parts = list(file_extractor.iter_document_text(BytesIO(content), 'csv'))
+
+    assert parts == ["region,amount\nNorth,100\n[truncated after 2 rows]"]
+    file_extractor.sandbox.run.assert_not_called()
+
+
+def test_iter_csv_text_stops_at_unreadable_row(file_extractor):
+    """
+    Test that a row the CSV parser rejects ends the text instead of failing the file.
+
+    Args:
+        file_extractor (FileExtractor): The FileExtractor instance to test.
+    """
+    content = b"name,notes\nA,ok\nB," + b"x" * 200000 + b"\nC,never\n"
+
+    assert list(file_extractor.iter_csv_text(BytesIO(content))) == ["name,notes\nA,ok"]
+
+
+def test_iter_text_from_upload_parses_buffered_content(file_extractor):
+    """
+    Test that uploaded content is extracted in memory, within the budget, without touching Drive.
+
+    Args:
+        file_extractor (FileExtractor): The FileExtractor instance to test.
+    """
+    budget = ExtractionBudget(max_bytes=5)
+
+    parts = list(file_extractor.iter_text_from_upload(BytesIO(b"uploaded text"), 'text/plain', budget))
+
+    assert parts == ["uploa", TRUNCATION_MARKER]
+    assert budget.truncated is True
+    file_extractor.drive_core.drive_service.files.assert_not_called()
+
+
+def test_normalisation_options_describe_text_layout():
+    """
+    Test that only PDFs are paged and only spreadsheets and CSV files are tabular.
+    """
+    assert FileExtractor.normalisation_options('application/pdf') == {"paged": True, "tabular": False}
+    assert FileExtractor.normalisation_options('text/csv') == {"paged": False, "tabular": True}
+    assert FileExtractor.normalisation_options('application/vnd.google-apps.spreadsheet') == {"paged": False, "tabular": True}
+    assert FileExtractor.normalisation_options('text/plain') == {"paged": False, "tabular": False}
+    assert FileExtractor.normalisation_options('application/vnd.google-apps.document') == {"paged": False, "tabular": False}
@@ -0,0 +1,58 @@
+"""
+Unit tests for the IngestPlanner class.
+
+This module contains pytest-based unit tests for the IngestPlanner class,
+which classifies files for ingestion using batched metadata lookups.
+"""
+
+import pytest
+from unittest.mock import Mock
+from app.services.natural_language.ingest_planner import (
+    IngestPlanner, SKIP, RESELECT, REINDEX, UNAVAILABLE
+)
+
+
+@pytest.mark.parametrize("file_details, existing_metadata, expected_action", [
+    ({"modifiedTime": "2023-01-01"}, {"lastModified": "2023-01-01", "isSelected": True}, SKIP),
+    ({"modifiedTime": "2023-01-01"}, {"lastModified": "2023-01-01", "isSelected": False}, RESELECT),
+    ({"modifiedTime": "2023-02-01"}, {"lastModified": "2023-01-01", "isSelected": True}, REINDEX),
+    ({"modifiedTime": "2023-01-01"}, {}, REINDEX),
+    ({"modifiedTime": "2023-01-01"}, None, REINDEX),
+    (None, {"lastModified": "2023-01-01", "isSelected": True}, UNAVAILABLE),
+])
+def test_classify(file_details, existing_metadata, expected_action):
+    """
+    Test the classify method of IngestPlanner.
+
+    Args:
+        file_details (dict): The file's Drive metadata.
+        existing_metadata (dict): The stored document metadata.
+        expected_action (str): The expected ingest action.
+    """
+    assert IngestPlanner.classify(file_details, existing_metadata) == expected_action
+
+
+def test_plan():
+    """
+    Test the plan method of IngestPlanner.
+
+    This test verifies that metadata is looked up once for all files and that
+    the plan preserves the input order.
+    """
+    drive_service = Mock()
+    drive_service.get_multiple_file_details.return_value = {
+        "file_1": {"modifiedTime": "2023-01-01"},
+        "file_2": {"modifiedTime": "2023-01-01"}
+    }
+    pinecone_manager = Mock()
+    pinecone_manager.get_multiple_document_metadata.return_value = {
+        "file_1": {},
+        "file_2": {"lastModified": "2023-01-01", "isSelected": True}
+    }
+
+    plan = IngestPlanner(drive_service, pinecone_manager).plan(["file_1", "file_2"], "user_id")
+
+    assert [entry["action"] for entry in plan] == [REINDEX, SKIP]
+    assert plan[0]["file_details"] == {"modifiedTime": "2023-01-01"}
+    drive_service.get_multiple_file_details.assert_called_once_with(["file_1", "file_2"])
+    pinecone_manager.get_multiple_document_metadata.assert_called_once_with(["file_1", "file_2"], "user_id")
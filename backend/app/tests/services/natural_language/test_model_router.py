@@ -0,0 +1,153 @@
+"""
+Unit tests for the ModelRouter class.
+
+This module contains pytest-based unit tests for the ModelRouter class,
+which routes chat requests across a chain of models with timeouts and failover.
+"""
+
+import pytest
+from unittest.mock import Mock
+from openai import APITimeoutError
+from app.services.natural_language.model_router import ModelRouter, parse_model_chain
+
+
+@pytest.fixture
+def llms():
+    """
+    Fixture to create mock chat models keyed by name.
+
+    Returns:
+        dict: Model names mapped to mock chat models.
+    """
+    return {"small": Mock(), "large": Mock()}
+
+
+@pytest.fixture
+def router(llms):
+    """
+    Fixture to create a ModelRouter over two mock models.
+
+    Args:
+        llms (dict): The mock chat models.
+
+    Returns:
+        ModelRouter: The router under test.
+    """
+    models = [{"name": "small", "timeout": 10}, {"name": "large", "timeout": 30}]
+    return ModelRouter(models, llm_factory=lambda name, timeout: llms[name])
+
+
+def test_parse_model_chain():
+    """
+    Test that model names and optional timeouts are parsed in order.
+    """
+    assert parse_model_chain("gpt-4o-mini:30, gpt-4o", 60) == [
+        {"name": "gpt-4o-mini", "timeout": 30.0},
+        {"name": "gpt-4o", "timeout": 60}
+    ]
+
+
+def test_route_by_complexity(router):
+    """
+    Test that complex questions prefer the more capable model but can still fall back.
+
+    Args:
+        router (ModelRouter): The router under test.
+    """
+    assert [model["name"] for model in router.route(100, False)] == ["small", "large"]
+    assert [model["name"] for model in router.route(100, True)] == ["large", "small"]
+
+
+def test_route_prefers_fastest_healthy_model(router):
+    """
+    Test that observed latency and health change the routing order.
+
+    Args:
+        router (ModelRouter): The router under test.
+    """
+    router._record_success("small", 5.0)
+    router._record_success("large", 1.0)
+    assert [model["name"] for model in router.route(100, False)] == ["large", "small"]
+
+    router._record_failure("large")
+    assert [model["name"] for model in router.route(100, False)] == ["small", "large"]
+
+
+def test_invoke_fails_over_on_timeout(router, llms):
+    """
+    Test that a timed-out model is skipped and recorded as unhealthy.
+
+    Args:
+        router (ModelRouter): The router under test.
+        llms (dict): The mock chat models.
+    """
+    llms["small"].invoke.side_effect = APITimeoutError(request=Mock())
+    llms["large"].invoke.return_value = Mock(content="answer")
+
+    response = router.invoke("prompt", question="What is this?")
+
+    assert response.content == "answer"
+    metrics = router.get_metrics()
+    assert metrics["small"]["failures"] == 1
+    assert metrics["small"]["healthy"] is False
+    assert metrics["large"]["calls"] == 1
+    assert sum(metrics["large"]["latency_histogram"].values()) == 1
+
+
+def test_invoke_records_usage(llms):
+    """
+    Test that a successful call records its token usage, model and failover retries.
+
+    Args:
+        llms (dict): The mock chat models.
+    """
+    usage_tracker = Mock()
+    models = [{"name": "small", "timeout": 10}, {"name": "large", "timeout": 30}]
+    router = ModelRouter(models, llm_factory=lambda name, timeout: llms[name], usage_tracker=usage_tracker)
+    llms["small"].invoke.side_effect = APITimeoutError(request=Mock())
+    llms["large"].invoke.return_value = Mock(content="answer", response_metadata={"token_usage": {
+        "prompt_tokens": 100, "completion_tokens": 20, "prompt_tokens_details": {"cached_tokens": 64}
+    }})
+
+    router.invoke("prompt", question="What is this?", user_id="owner")
+
+    usage_tracker.record.assert_called_once()
+    args, kwargs = usage_tracker.record.call_args
+    assert args == ('chat',)
+    assert kwargs["model"] == "large"
+    assert kwargs["prompt_tokens"] == 100
+    assert kwargs["completion_tokens"] == 20
+    assert kwargs["cached_tokens"] == 64
+    assert kwargs["retries"] == 1
+    assert kwargs["user_id"] == "owner"
+    assert router.get_metrics()["large"]["cache_hit_ratio"] == 0.64
+
+
+def test_invoke_raises_when_all_models_fail(router, llms):
+    """
+    Test that the last failover error is raised when every model fails.
+
+    Args:
+        router (ModelRouter): The router under test.
+        llms (dict): The mock chat models.
+    """
+    for llm in llms.values():
+        llm.invoke.side_effect = APITimeoutError(request=Mock())
+
+    with pytest.raises(APITimeoutError):
+        router.invoke("prompt")
+
+
+def test_invoke_does_not_fail_over_on_other_errors(router, llms):
+    """
+    Test that errors unrelated to load are raised immediately.
+
+    Args:
+        router (ModelRouter): The router under test.
+        llms (dict): The mock chat models.
+    """
+    llms["small"].invoke.side_effect = ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        router.invoke("prompt", question="Hi")
+    llms["large"].invoke.assert_not_called()
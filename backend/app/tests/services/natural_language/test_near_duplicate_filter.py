@@ -0,0 +1,104 @@
+"""
+Unit tests for the NearDuplicateFilter class.
+
+This module contains pytest-based unit tests for the NearDuplicateFilter class,
+which removes near-duplicate passages from query context using MinHash and LSH.
+"""
+
+import pytest
+from unittest.mock import patch
+from app.services.natural_language.near_duplicate_filter import NearDuplicateFilter
+
+CLAUSE = ("The supplier shall deliver all goods to the premises of the customer within thirty days "
+          "of the order date and shall bear all costs of transport insurance and handling")
+EDITED_CLAUSE = CLAUSE.replace("thirty days", "thirty calendar days")
+OTHER = ("Payment is due within sixty days of invoice and late payments accrue interest at "
+         "the statutory rate until settled in full by the customer")
+
+
+@pytest.fixture
+def duplicate_filter():
+    """
+    Fixture to create a NearDuplicateFilter.
+
+    Returns:
+        NearDuplicateFilter: The filter under test.
+    """
+    return NearDuplicateFilter(threshold=0.6)
+
+
+def test_find_clusters(duplicate_filter):
+    """
+    Test that near-identical passages are clustered and distinct ones are not.
+
+    Args:
+        duplicate_filter (NearDuplicateFilter): The filter under test.
+    """
+    assert duplicate_filter.find_clusters([CLAUSE, OTHER, EDITED_CLAUSE, "short text"]) == [[0, 2]]
+
+
+def test_signature_is_cached(duplicate_filter):
+    """
+    Test that signatures are computed once per passage.
+
+    Args:
+        duplicate_filter (NearDuplicateFilter): The filter under test.
+    """
+    first = duplicate_filter.signature(CLAUSE)
+    with patch('app.services.natural_language.near_duplicate_filter.zlib.crc32') as mock_crc32:
+        second = duplicate_filter.signature(CLAUSE)
+        mock_crc32.assert_not_called()
+    assert (first == second).all()
+
+
+def test_filter_documents_keeps_newest_copy(duplicate_filter):
+    """
+    Test that the copy from the most recently modified document is kept.
+
+    Args:
+        duplicate_filter (NearDuplicateFilter): The filter under test.
+    """
+    documents = [
+        {"metadata": {"id": "v1", "lastModified": "2023-01-01", "content": f"{CLAUSE}\n\n{OTHER}"}},
+        {"metadata": {"id": "final", "lastModified": "2023-03-01", "content": EDITED_CLAUSE}}
+    ]
+
+    filtered, removed_tokens = duplicate_filter.filter_documents(documents)
+
+    assert filtered[0]["metadata"]["content"] == OTHER
+    assert filtered[1] is documents[1]
+    assert removed_tokens > 0
+    assert documents[0]["metadata"]["content"] == f"{CLAUSE}\n\n{OTHER}"
+
+
+def test_filter_documents_rewrites_chunks(duplicate_filter):
+    """
+    Test that chunk contents are rewritten and emptied chunks dropped.
+
+    Args:
+        duplicate_filter (NearDuplicateFilter): The filter under test.
+    """
+    documents = [
+        {"metadata": {"id": "new", "lastModified": "2023-02-01", "content": CLAUSE,
+                      "chunks": [{"index": 0, "content": CLAUSE, "values": [1.0]}]}},
+        {"metadata": {"id": "old", "lastModified": "2023-01-01", "content": CLAUSE + OTHER,
+                      "chunks": [{"index": 0, "content": CLAUSE, "values": [1.0]},
+                                 {"index": 1, "content": OTHER, "values": [0.5]}]}}
+    ]
+
+    filtered, _ = duplicate_filter.filter_documents(documents)
+
+    assert filtered[1]["metadata"]["chunks"] == [{"index": 1, "content": OTHER, "values": [0.5]}]
+    assert filtered[1]["metadata"]["content"] == OTHER
+
+
+def test_filter_documents_without_duplicates(duplicate_filter):
+    """
+    Test that documents without duplicates are returned unchanged.
+
+    Args:
+        duplicate_filter (NearDuplicateFilter): The filter under test.
+    """
+    documents = [{"metadata": {"id": "a", "content": CLAUSE}}, {"metadata": {"id": "b", "content": OTHER}}]
+
+    assert duplicate_filter.filter_documents(documents) == (documents, 0)
@@ -0,0 +1,90 @@
+"""
+Unit tests for the PdfExtractor class.
+
+This module contains pytest-based unit tests for the PdfExtractor class, which
+extracts PDF text as a generator of pages, in-process or over a process pool.
+"""
+
+import time
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from app.services.natural_language.pdf_extractor import PdfExtractor, _time_limit, PageTimeoutError
+
+
+def mock_pages(count):
+    """
+    Create mock PDF pages whose text is their page number.
+
+    Args:
+        count (int): The number of pages.
+
+    Returns:
+        list: Mock pages.
+    """
+    return [MagicMock(extract_text=lambda number=number: f"page {number + 1}") for number in range(count)]
+
+
+def test_iter_pages_in_process():
+    """
+    Test that small PDFs are extracted in-process, in order, as a generator.
+    """
+    with patch('app.services.natural_language.pdf_extractor.PdfReader') as mock_reader:
+        mock_reader.return_value.pages = mock_pages(3)
+
+        pages = PdfExtractor().iter_pages(BytesIO(b"%PDF"))
+
+        assert next(pages) == "page 1"
+        assert list(pages) == ["page 2", "page 3"]
+
+
+def test_iter_pages_caps_page_count():
+    """
+    Test that only the first max_pages pages are extracted.
+    """
+    with patch('app.services.natural_language.pdf_extractor.PdfReader') as mock_reader:
+        mock_reader.return_value.pages = mock_pages(10)
+
+        assert list(PdfExtractor(max_pages=4).iter_pages(BytesIO(b"%PDF"))) == [
+            "page 1", "page 2", "page 3", "page 4"
+        ]
+
+
+def test_iter_pages_skips_failing_page():
+    """
+    Test that a page that cannot be parsed yields empty text without stopping extraction.
+    """
+    with patch('app.services.natural_language.pdf_extractor.PdfReader') as mock_reader:
+        pages = mock_pages(3)
+        pages[1].extract_text = MagicMock(side_effect=ValueError("bad stream"))
+        mock_reader.return_value.pages = pages
+
+        assert list(PdfExtractor().iter_pages(BytesIO(b"%PDF"))) == ["page 1", "", "page 3"]
+
+
+def test_iter_pages_parallel_preserves_order():
+    """
+    Test that large PDFs are extracted by page range on the executor and yielded in page order.
+    """
+    with patch('app.services.natural_language.pdf_extractor.PdfReader') as mock_reader, \
+         ThreadPoolExecutor(max_workers=2) as executor:
+        mock_reader.return_value.pages = mock_pages(10)
+        extractor = PdfExtractor(parallel_threshold=2, pages_per_task=3, max_workers=2, executor=executor)
+
+        pages = list(extractor.iter_pages(BytesIO(b"%PDF")))
+
+    assert pages == [f"page {number}" for number in range(1, 11)]
+
+
+def test_time_limit_interrupts_slow_block():
+    """
+    Test that a block running past its time limit is interrupted.
+    """
+    try:
+        with _time_limit(0.05):
+            time.sleep(1)
+        raised = False
+    except PageTimeoutError:
+        raised = True
+
+    assert raised is True
@@ -0,0 +1,105 @@
+"""
+Unit tests for the SpreadsheetExtractor class.
+
+This module contains pytest-based unit tests for the SpreadsheetExtractor class,
+which streams workbooks into compact delimiter-separated text.
+"""
+
+import datetime
+from io import BytesIO
+
+import openpyxl
+import pytest
+from app.services.natural_language.spreadsheet_extractor import SpreadsheetExtractor
+
+
+def workbook_bytes(sheets):
+    """
+    Build an xlsx workbook in memory.
+
+    Args:
+        sheets (dict): Sheet names mapped to lists of rows.
+
+    Returns:
+        BytesIO: The workbook content.
+    """
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    file = BytesIO()
+    workbook.save(file)
+    file.seek(0)
+    return file
+
+
+def test_iter_rows_skips_empty_cells_and_rows():
+    """
+    Test that empty rows and trailing empty cells are dropped and no "None" text is emitted.
+    """
+    rows = [("region", "amount", None), (None, None, None), ("North", 100.0, None), ("a,b", None, 3)]
+
+    lines = list(SpreadsheetExtractor().iter_rows(rows))
+
+    assert lines == ["region,amount", "North,100", '"a,b",,3']
+
+
+def test_iter_rows_caps_rows_and_cells():
+    """
+    Test that sheets are truncated at the row and cell caps with a marker.
+    """
+    rows = [(index, index) for index in range(10)]
+
+    assert list(SpreadsheetExtractor(max_rows_per_sheet=2).iter_rows(rows)) == ["0,0", "1,1", "[truncated after 2 rows]"]
+    assert list(SpreadsheetExtractor(max_cells_per_sheet=5).iter_rows(rows)) == ["0,0", "1,1", "[truncated after 2 rows]"]
+
+
+def test_format_cell():
+    """
+    Test the compact formatting of cell values.
+    """
+    assert SpreadsheetExtractor.format_cell(None) == ''
+    assert SpreadsheetExtractor.format_cell(2.0) == '2'
+    assert SpreadsheetExtractor.format_cell(2.5) == '2.5'
+    assert SpreadsheetExtractor.format_cell(datetime.date(2024, 1, 31)) == '2024-01-31'
+
+
+def test_iter_sheets_xlsx():
+    """
+    Test that each non-empty sheet of an xlsx workbook is emitted with its name.
+    """
+    file = workbook_bytes({"Sales": [["region", "amount"], ["North", 100]], "Empty": []})
+
+    sheets = list(SpreadsheetExtractor().iter_sheets(file, 'xlsx'))
+
+    assert sheets == ["Sheet: Sales\nregion,amount\nNorth,100"]
+
+
+def test_iter_sheets_yields_bounded_parts():
+    """
+    Test that long sheets are yielded in parts, with the sheet name before the first part only.
+    """
+    file = workbook_bytes({"Sales": [["region", "amount"], ["North", 100], ["South", 50]], "Costs": [["Rent", 9]]})
+
+    parts = list(SpreadsheetExtractor(part_chars=20).iter_sheets(file, 'xlsx'))
+
+    assert parts == ["Sheet: Sales\nregion,amount", "North,100\nSouth,50", "Sheet: Costs\nRent,9"]
+
+
+def test_iter_sheets_unsupported_type():
+    """
+    Test that a non-workbook type raises ValueError.
+    """
+    with pytest.raises(ValueError):
+        list(SpreadsheetExtractor().iter_sheets(BytesIO(b""), 'csv'))
+
+
+def test_iter_rows_drops_columns_beyond_cap():
+    """
+    Test that very wide rows are cut to the column cap.
+    """
+    extractor = SpreadsheetExtractor(max_columns_per_row=3)
+
+    assert list(extractor.iter_rows([list(range(10))])) == ["0,1,2"]
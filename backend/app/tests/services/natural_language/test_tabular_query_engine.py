@@ -0,0 +1,223 @@
+"""
+Unit tests for the TabularQueryEngine class.
+
+This module contains pytest-based unit tests for the TabularQueryEngine class,
+which answers questions over spreadsheets with locally executed aggregation plans.
+"""
+
+import json
+import pytest
+import pandas as pd
+from unittest.mock import Mock
+from app.services.natural_language.tabular_query_engine import TabularQueryEngine, TabularQueryError
+
+
+@pytest.fixture
+def frames():
+    """
+    Fixture to create sample spreadsheet data.
+
+    Returns:
+        dict: A sheet name mapped to a DataFrame of sales.
+    """
+    return {"Sales": pd.DataFrame({
+        "region": ["North", "South", "North", "East"],
+        "amount": [100, 50, 25, 10]
+    })}
+
+
+def make_engine(reply):
+    """
+    Create a TabularQueryEngine whose language model returns a fixed reply.
+
+    Args:
+        reply (str): The model reply.
+
+    Returns:
+        TabularQueryEngine: The engine under test.
+    """
+    llm = Mock()
+    llm.invoke.return_value = Mock(content=reply)
+    return TabularQueryEngine(llm)
+
+
+def test_execute_plan_group_by(frames):
+    """
+    Test that a grouped aggregation with sorting and a limit is executed locally.
+
+    Args:
+        frames (dict): The sample spreadsheet data.
+    """
+    plan = {
+        "sheet": "Sales",
+        "group_by": ["region"],
+        "aggregations": [{"column": "amount", "function": "sum"}],
+        "sort_by": {"column": "sum_amount", "ascending": False},
+        "limit": 2
+    }
+
+    result = make_engine("").execute_plan(plan, frames)
+
+    assert result.to_dict('records') == [
+        {"region": "North", "sum_amount": 125},
+        {"region": "South", "sum_amount": 50}
+    ]
+
+
+def test_execute_plan_filter_without_grouping(frames):
+    """
+    Test that filters and ungrouped aggregations are executed locally.
+
+    Args:
+        frames (dict): The sample spreadsheet data.
+    """
+    plan = {
+        "sheet": "Sales",
+        "filters": [{"column": "amount", "op": ">=", "value": 25}],
+        "aggregations": [{"column": "amount", "function": "count"}]
+    }
+
+    result = make_engine("").execute_plan(plan, frames)
+
+    assert result.to_dict('records') == [{"count_amount": 3}]
+
+
+def test_execute_plan_clamps_negative_limit(frames):
+    """
+    Test that a negative limit from the model returns one row rather than almost every row.
+
+    Args:
+        frames (dict): The sample spreadsheet data.
+    """
+    result = make_engine("").execute_plan({"sheet": "Sales", "limit": -1}, frames)
+
+    assert len(result) == 1
+
+
+@pytest.mark.parametrize("plan", [
+    {"sheet": "Missing"},
+    {"sheet": "Sales", "group_by": ["__class__"]},
+    {"sheet": "Sales", "filters": [{"column": "amount", "op": "eval", "value": 1}]},
+    {"sheet": "Sales", "aggregations": [{"column": "amount", "function": "apply"}]},
+])
+def test_execute_plan_rejects_invalid_plans(frames, plan):
+    """
+    Test that plans referencing unknown sheets, columns, operators or functions are rejected.
+
+    Args:
+        frames (dict): The sample spreadsheet data.
+        plan (dict): The invalid plan.
+    """
+    with pytest.raises(TabularQueryError):
+        make_engine("").execute_plan(plan, frames)
+
+
+def test_compute_adds_result_but_not_every_row(frames):
+    """
+    Test that the spreadsheet is described by its schema and the question answered by a computed result.
+
+    Args:
+        frames (dict): The sample spreadsheet data.
+    """
+    plan = {"sheet": "Sales", "group_by": ["region"], "aggregations": [{"column": "amount", "function": "sum"}]}
+    engine = make_engine(f"Here is the plan: {json.dumps(plan)}")
+    engine.sample_rows = 1
+
+    description = engine.describe_spreadsheet(frames, title="sales.xlsx")
+    result = engine.compute("Total by region?", {"sales.xlsx": frames})["sales.xlsx"]
+
+    assert "Columns: region (" in description
+    assert "amount (int64)" in description
+    assert "South" not in description
+    assert "East,10" in result
+    assert "South,50" in result
+
+
+def test_compute_is_separate_from_description(frames):
+    """
+    Test that the question-specific result is computed apart from the spreadsheet description.
+
+    Args:
+        frames (dict): The sample spreadsheet data.
+    """
+    plan = {"sheet": "Sales", "aggregations": [{"column": "amount", "function": "sum"}]}
+    engine = make_engine(json.dumps(plan))
+
+    description = engine.describe_spreadsheet(frames, title="sales.xlsx")
+    result = engine.compute("Total?", {"sales.xlsx": frames})["sales.xlsx"]
+
+    assert description.startswith("Spreadsheet sales.xlsx\nSheet: Sales")
+    assert "Computed result" not in description
+    assert result.startswith("Computed result from spreadsheet sales.xlsx")
+    assert make_engine('[]').compute("Total?", {"sales.xlsx": frames}) == {}
+
+
+def test_compute_plans_every_spreadsheet_in_one_call(frames):
+    """
+    Test that the plans for several spreadsheets are requested in a single model call.
+
+    Args:
+        frames (dict): The sample spreadsheet data.
+    """
+    plans = [{"spreadsheet": "sales.xlsx", "sheet": "Sales", "aggregations": [{"column": "amount", "function": "sum"}]},
+             {"spreadsheet": "missing.xlsx", "sheet": "Sales"}]
+    engine = make_engine(json.dumps(plans))
+
+    results = engine.compute("Total sales?", {"sales.xlsx": frames, "other.xlsx": frames})
+
+    engine.llm.invoke.assert_called_once()
+    assert "Spreadsheet: other.xlsx" in engine.llm.invoke.call_args.args[0]
+    assert list(results) == ["sales.xlsx"]
+    assert results["sales.xlsx"].endswith("sum_amount\n185")
+
+
+def test_compute_skips_questions_without_computation(frames):
+    """
+    Test that questions with no sign of a computation make no model call.
+
+    Args:
+        frames (dict): The sample spreadsheet data.
+    """
+    engine = make_engine('{"sheet": "Sales"}')
+
+    assert engine.compute("What is this sheet about?", {"sales.xlsx": frames}) == {}
+    engine.llm.invoke.assert_not_called()
+    assert TabularQueryEngine.needs_computation("How many rows have amount > 20?")
+    assert TabularQueryEngine.needs_computation("What are the top 5 regions sorted by amount?")
+
+
+@pytest.mark.parametrize("question", [
+    "Which sheet lists customers by region?",
+    "Where does the 2023 data come from?",
+    "What changed over the summer?",
+    "Summarise this spreadsheet",
+    "Which country is this about?"
+])
+def test_needs_computation_ignores_ordinary_questions(question):
+    """
+    Test that ordinary questions containing words like "by", "which" or numbers need no plan.
+
+    Args:
+        question (str): The question.
+    """
+    assert not TabularQueryEngine.needs_computation(question)
+
+
+def test_get_frames_caches_per_version(frames):
+    """
+    Test that DataFrames are loaded once per file version and evicted in LRU order.
+
+    Args:
+        frames (dict): The sample spreadsheet data.
+    """
+    engine = make_engine("")
+    engine.max_cached_files = 1
+    loader = Mock(return_value=frames)
+
+    engine.get_frames("file_id", "v1", loader)
+    engine.get_frames("file_id", "v1", loader)
+    assert loader.call_count == 1
+
+    engine.get_frames("file_id", "v2", loader)
+    engine.get_frames("file_id", "v1", loader)
+    assert loader.call_count == 3
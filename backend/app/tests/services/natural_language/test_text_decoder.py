@@ -0,0 +1,80 @@
+"""
+Unit tests for the streaming text decoder.
+
+These tests cover detecting encodings from a sample, decoding files incrementally
+without closing them, and splitting text into parts at line ends.
+"""
+
+import codecs
+from io import BytesIO
+from unittest.mock import patch
+
+from app.services.google_drive.media_download import SpooledDownload
+from app.services.natural_language.text_decoder import detect_encoding, open_text, iter_text_parts
+
+
+def test_detect_encoding_from_byte_order_mark():
+    """
+    Test that byte order marks decide the encoding.
+    """
+    assert detect_encoding(codecs.BOM_UTF8 + b"text") == 'utf-8-sig'
+    assert detect_encoding("text".encode('utf-16')) == 'utf-16'
+
+
+def test_detect_encoding_accepts_utf8_cut_mid_character():
+    """
+    Test that a UTF-8 sample ending part way through a character is still detected as UTF-8.
+    """
+    with patch('chardet.detect') as mock_detect:
+        assert detect_encoding("café".encode('utf-8')[:-1]) == 'utf-8'
+
+    mock_detect.assert_not_called()
+
+
+def test_detect_encoding_falls_back_to_chardet():
+    """
+    Test that samples which are not UTF-8 are passed to chardet, with cp1252 for unknown results.
+    """
+    with patch('chardet.detect', return_value={'encoding': 'ISO-8859-1'}):
+        assert detect_encoding(b"caf\xe9 au lait") == 'iso8859-1'
+    with patch('chardet.detect', return_value={'encoding': None}):
+        assert detect_encoding(b"caf\xe9 \xfd") == 'cp1252'
+
+
+def test_open_text_samples_only_leading_bytes():
+    """
+    Test that the encoding is detected from the sample only and undecodable bytes later on are replaced.
+    """
+    file = BytesIO(b"plain ascii\n" + b"caf\xe9\n")
+
+    with open_text(file, sample_size=8) as text:
+        content = text.read()
+
+    assert content == "plain ascii\ncaf�\n"
+
+
+def test_open_text_leaves_download_open():
+    """
+    Test that a SpooledDownload is rewound and left open after decoding.
+    """
+    download = SpooledDownload()
+    download.write("Grüße\n".encode('cp1252'))
+    download.finish()
+
+    with patch('chardet.detect', return_value={'encoding': 'windows-1252'}):
+        with open_text(download) as text:
+            assert text.read() == "Grüße\n"
+
+    assert not download.closed
+    assert download.tell() == 0
+
+
+def test_iter_text_parts_splits_at_line_ends():
+    """
+    Test that text is split into parts at line ends, with long lines split at the part size.
+    """
+    with open_text(BytesIO(b"one\ntwo\nthree\n" + b"x" * 10)) as text:
+        parts = list(iter_text_parts(text, part_chars=6))
+
+    assert parts == ["one\ntwo\n", "three\n", "xxxxxx", "xxxx"]
+    assert "".join(parts) == "one\ntwo\nthree\n" + "x" * 10
@@ -0,0 +1,117 @@
+"""
+Unit tests for the TextNormaliser class.
+
+These tests cover whitespace collapsing, joining hyphenated words in PDF pages, dropping
+empty spreadsheet cells, removing repeated page headers and footers, leaving prose and
+non-paged text alone, and token reporting.
+"""
+
+from unittest.mock import patch
+
+from app.services.natural_language.text_normaliser import TextNormaliser, NormalisationStats
+from app.utils.token_utils import count_tokens
+
+
+def test_normalise_text_collapses_whitespace_and_joins_hyphenation():
+    """
+    Test that runs of spaces and blank lines collapse and words split across lines are joined.
+    """
+    text = "The   quick  brown  \r\n\r\n\r\n\r\nfox jumps over the docu-\nment.  "
+
+    assert TextNormaliser.normalise_text(text, paged=True) == "The quick brown\n\nfox jumps over the document."
+
+
+def test_normalise_text_keeps_hyphenated_compounds_before_capitals():
+    """
+    Test that a line ending in a hyphen is only joined when the next word continues in lower case.
+    """
+    assert TextNormaliser.normalise_text("Anglo-\nSaxon", paged=True) == "Anglo-\nSaxon"
+
+
+def test_normalise_text_drops_empty_cells():
+    """
+    Test that "None" cells, empty rows and trailing empty cells are removed from delimited rows.
+    """
+    text = "region,amount,None\nNorth,None,100,,,\n,,,\nSouth,50"
+
+    assert TextNormaliser.normalise_text(text, tabular=True) == "region,amount,\nNorth,,100\n\nSouth,50"
+
+
+def test_normalise_text_keeps_none_in_prose():
+    """
+    Test that the word "None" in running text is left alone.
+    """
+    assert TextNormaliser.normalise_text("None of the figures changed.") == "None of the figures changed."
+
+
+def test_normalise_removes_repeated_headers_and_footers():
+    """
+    Test that lines repeating at the top or bottom of most pages are removed, including page numbers.
+    """
+    pages = [f"ACME Quarterly Report\nRevenue for region {number} grew.\nCosts were flat.\nPage {number} of 5"
+             for number in range(1, 6)]
+    stats = NormalisationStats()
+
+    result = list(TextNormaliser(sample_pages=3).normalise(pages, stats, paged=True))
+
+    assert result == [f"Revenue for region {number} grew.\nCosts were flat." for number in range(1, 6)]
+    assert stats.tokens_before > stats.tokens_after > 0
+    assert 0 < stats.reduction_ratio < 1
+
+
+def test_normalise_leaves_short_documents_alone():
+    """
+    Test that documents with too few pages are not checked for headers and footers.
+    """
+    pages = ["Title\nFirst body\nFooter", "Title\nSecond body\nFooter"]
+
+    assert list(TextNormaliser().normalise(pages, paged=True)) == pages
+
+
+def test_normalise_text_leaves_prose_cells_and_hyphens_alone():
+    """
+    Test that cell and hyphenation rules do not rewrite prose outside tabular and paged text.
+    """
+    assert TextNormaliser.normalise_text("Allowed values: red, green, None") == "Allowed values: red, green, None"
+    assert TextNormaliser.normalise_text("a, None, b") == "a, None, b"
+    assert TextNormaliser.normalise_text("a well-\nknown fact") == "a well-\nknown fact"
+
+
+def test_normalise_keeps_repeated_rows_of_unpaged_parts():
+    """
+    Test that the edge lines of CSV-style parts, which share a digit-masked pattern, are kept.
+    """
+    parts = ["\n".join(f"{row},{row * 2}" for row in range(start, start + 10)) for start in range(0, 100, 10)]
+
+    result = list(TextNormaliser(sample_pages=4).normalise(parts, tabular=True))
+
+    assert result == parts
+
+
+def test_get_metrics_accumulates_documents():
+    """
+    Test that token totals accumulate across documents.
+    """
+    normaliser = TextNormaliser()
+    list(normaliser.normalise(["a   b"]))
+    list(normaliser.normalise(["", "c"]))
+
+    metrics = normaliser.get_metrics()
+
+    assert metrics["documents"] == 2
+    assert metrics["tokens_after"] <= metrics["tokens_before"]
+
+
+def test_normalise_reuses_token_counts_of_the_source():
+    """
+    Test that pages already counted by their source are not tokenized again.
+    """
+    pages = ["First   page", "Second   page"]
+    stats = NormalisationStats()
+
+    with patch('app.services.natural_language.text_normaliser.count_tokens', wraps=count_tokens) as mock_count:
+        result = list(TextNormaliser().normalise(pages, stats, tokens_before=lambda: 42))
+
+    assert result == ["First page", "Second page"]
+    assert stats.tokens_before == 42
+    assert [call.args[0] for call in mock_count.call_args_list] == result
@@ -0,0 +1,150 @@
+"""
+Unit tests for the UsageTracker class.
+
+This module contains pytest-based unit tests for the UsageTracker class, which
+aggregates model and embedding usage into hourly Redis counters per user and endpoint.
+"""
+
+import pytest
+from unittest.mock import Mock
+from flask import Flask, session
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app.services.usage.usage_tracker import UsageTracker
+
+
+@pytest.fixture
+def mock_redis():
+    """
+    Fixture to create a mock Redis client.
+
+    Returns:
+        Mock: A mock object representing a Redis client.
+    """
+    return Mock()
+
+
+def test_record_increments_user_and_endpoint_counters(mock_redis):
+    """
+    Test that a model call increments the counters of both its user and its endpoint.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    pipe = mock_redis.pipeline.return_value
+
+    UsageTracker(mock_redis).record('chat', model='gpt-4o-mini', prompt_tokens=120, completion_tokens=30,
+                                    latency=1.5, retries=1, user_id='user1', endpoint='chat.query_llm')
+
+    increments = [call.args for call in pipe.hincrby.call_args_list]
+    user_keys = {args[0] for args in increments if ':user:user1:' in args[0]}
+    assert len(user_keys) == 1
+    user_key = user_keys.pop()
+    assert (user_key, 'chat:calls', 1) in increments
+    assert (user_key, 'chat:prompt_tokens', 120) in increments
+    assert (user_key, 'chat:latency_ms', 1500) in increments
+    assert (user_key, 'chat:retries', 1) in increments
+    assert (user_key, 'model:gpt-4o-mini:calls', 1) in increments
+    assert any(':endpoint:chat.query_llm:' in args[0] for args in increments)
+    pipe.sadd.assert_called_once_with('usage:endpoints', 'chat.query_llm')
+    pipe.execute.assert_called_once()
+
+
+def test_record_defaults_to_request_context(mock_redis):
+    """
+    Test that the user and endpoint default to the session user and request endpoint.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    app = Flask(__name__)
+    app.secret_key = 'test_secret_key'
+    pipe = mock_redis.pipeline.return_value
+
+    with app.test_request_context('/chat/query'):
+        session['user_id'] = 'user1'
+        UsageTracker(mock_redis).record('embedding', prompt_tokens=10)
+
+    keys = {call.args[0] for call in pipe.hincrby.call_args_list}
+    assert any(':user:user1:' in key for key in keys)
+    assert any(':endpoint:/chat/query:' in key for key in keys)
+
+
+def test_record_cache_hit_counts_no_call(mock_redis):
+    """
+    Test that a cache hit is counted without counting a model call.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    pipe = mock_redis.pipeline.return_value
+
+    UsageTracker(mock_redis).record('summary', cache_hit=True, user_id='user1', endpoint='background')
+
+    fields = {call.args[1] for call in pipe.hincrby.call_args_list}
+    assert fields == {'summary:cache_hits'}
+
+
+def test_record_ignores_redis_errors(mock_redis):
+    """
+    Test that a Redis failure does not propagate to the measured call.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.pipeline.return_value.execute.side_effect = RedisConnectionError()
+
+    UsageTracker(mock_redis).record('chat', prompt_tokens=1, user_id='user1', endpoint='e')
+
+
+def test_get_usage_sums_hourly_buckets(mock_redis):
+    """
+    Test that usage is summed across hourly buckets per kind and model.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.pipeline.return_value.execute.return_value = [
+        {'chat:calls': '2', 'chat:prompt_tokens': '300', 'model:gpt-4o:calls': '2'},
+        {},
+        {'chat:calls': '1', 'chat:prompt_tokens': '50', 'embedding:calls': '4', 'model:gpt-4o:calls': '1'}
+    ]
+
+    usage = UsageTracker(mock_redis).get_usage('user', 'user1', hours=3)
+
+    assert mock_redis.pipeline.return_value.hgetall.call_count == 3
+    assert usage['kinds']['chat']['calls'] == 3
+    assert usage['kinds']['chat']['prompt_tokens'] == 350
+    assert usage['kinds']['embedding']['calls'] == 4
+    assert usage['models'] == {'gpt-4o': 3}
+
+
+def test_tracker_without_redis():
+    """
+    Test that a tracker without a Redis client records nothing and reports empty usage.
+    """
+    tracker = UsageTracker(None)
+
+    tracker.record('chat', prompt_tokens=1)
+
+    assert tracker.get_usage('user', 'user1') == {"kinds": {}, "models": {}}
+    assert tracker.get_endpoint_usage() == {}
+
+
+def test_get_endpoint_usage_reads_all_endpoints_in_one_batch(mock_redis):
+    """
+    Test that every endpoint's hourly buckets are read in one pipelined round trip.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.smembers.return_value = {'/chat/ask', '/chat/index'}
+    mock_redis.pipeline.return_value.execute.return_value = [
+        {'chat:calls': '2'}, {'chat:calls': '1'},
+        {'embedding:calls': '5'}, {}
+    ]
+
+    usage = UsageTracker(mock_redis).get_endpoint_usage(hours=2)
+
+    assert mock_redis.pipeline.return_value.execute.call_count == 1
+    assert usage['/chat/ask']['kinds']['chat']['calls'] == 3
+    assert usage['/chat/index']['kinds']['embedding']['calls'] == 5
@@ -0,0 +1,59 @@
+"""
+Unit tests for the request-scoped credential helpers in drive_utils.
+
+These tests check that a user's credentials are loaded at most once per request and
+that storing or deleting them within the request is reflected immediately.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from app.utils.drive_utils import get_user_credentials, set_user_credentials, delete_user_credentials
+
+
+@pytest.fixture
+def app():
+    """
+    Create a Flask app for request contexts.
+
+    Returns:
+        Flask: The app.
+    """
+    return Flask(__name__)
+
+
+@patch('app.utils.drive_utils.credential_cache')
+def test_credentials_loaded_once_per_request(mock_credential_cache, app):
+    """
+    Test that repeated lookups in a request share one load, and a new request loads again.
+    """
+    mock_credential_cache.get.return_value = '{"token": "a"}'
+
+    with app.test_request_context():
+        assert get_user_credentials('user_1') == '{"token": "a"}'
+        assert get_user_credentials('user_1') == '{"token": "a"}'
+    assert mock_credential_cache.get.call_count == 1
+
+    with app.test_request_context():
+        get_user_credentials('user_1')
+    assert mock_credential_cache.get.call_count == 2
+
+
+@patch('app.utils.drive_utils.credential_cache')
+def test_set_and_delete_update_request_credentials(mock_credential_cache, app):
+    """
+    Test that credentials stored or deleted in a request are seen by later lookups in it.
+    """
+    with app.test_request_context():
+        set_user_credentials('user_1', '{"token": "b"}')
+        assert get_user_credentials('user_1') == '{"token": "b"}'
+        mock_credential_cache.get.assert_not_called()
+
+        mock_credential_cache.get.return_value = None
+        delete_user_credentials('user_1')
+        assert get_user_credentials('user_1') is None
+
+    mock_credential_cache.set.assert_called_once_with('user_1', '{"token": "b"}')
+    mock_credential_cache.delete.assert_called_once_with('user_1')
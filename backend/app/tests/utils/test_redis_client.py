@@ -0,0 +1,113 @@
+"""
+Unit tests for the shared Redis client module.
+
+These tests cover pool saturation metrics, sharing one client per response mode,
+and sending commands in pipelined batches.
+"""
+
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+from redis.connection import Connection
+from redis.exceptions import ConnectionError
+
+from app.utils import redis_client as redis_module
+from app.utils.redis_client import MonitoredConnectionPool, execute_batched, get_redis_client
+
+
+class OfflineConnection(Connection):
+    """A connection that never touches the network."""
+
+    def connect(self):
+        pass
+
+    def can_read(self, timeout=0):
+        return False
+
+    def disconnect(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture
+def pool():
+    """
+    Create a monitored pool of two offline connections that waits briefly for a free one.
+
+    Returns:
+        MonitoredConnectionPool: The pool.
+    """
+    return MonitoredConnectionPool(max_connections=2, timeout=0.5, connection_class=OfflineConnection)
+
+
+def test_pool_reports_saturation_and_timeouts(pool):
+    """
+    Test that connections in use, the peak and checkouts that gave up are reported.
+    """
+    first = pool.get_connection()
+    pool.get_connection()
+    pool.timeout = 0.01
+
+    with pytest.raises(ConnectionError):
+        pool.get_connection()
+    pool.release(first)
+
+    metrics = pool.get_metrics()
+    assert metrics["checkouts"] == 2
+    assert metrics["peak_in_use"] == 2
+    assert metrics["in_use"] == 1
+    assert metrics["saturation"] == 0.5
+    assert metrics["timeouts"] == 1
+
+
+def test_pool_counts_checkouts_that_waited(pool):
+    """
+    Test that a checkout made while every connection is in use waits for a release.
+    """
+    first = pool.get_connection()
+    pool.get_connection()
+    releaser = threading.Timer(0.05, pool.release, args=(first,))
+    releaser.start()
+
+    assert pool.get_connection() is first
+    releaser.join()
+
+    metrics = pool.get_metrics()
+    assert metrics["waits"] == 1
+    assert metrics["wait_seconds"] > 0
+    assert metrics["timeouts"] == 0
+
+
+def test_get_redis_client_shares_one_client_per_mode():
+    """
+    Test that each response mode has one shared client, and none without a Redis URL.
+    """
+    with patch.dict(redis_module._clients, clear=True), \
+            patch.object(redis_module.Config, 'REDIS_TOKEN_URL', 'redis://localhost:6379/3'):
+        text = get_redis_client()
+        binary = get_redis_client(decode_responses=False)
+
+        assert get_redis_client() is text
+        assert binary is not text
+        assert text.connection_pool.connection_kwargs['decode_responses'] is True
+        assert binary.connection_pool.connection_kwargs['decode_responses'] is False
+        assert text.connection_pool.max_connections == redis_module.Config.REDIS_MAX_CONNECTIONS
+        assert set(redis_module.get_pool_metrics()) == {'text', 'binary'}
+
+    with patch.object(redis_module.Config, 'REDIS_TOKEN_URL', None):
+        assert get_redis_client() is None
+
+
+def test_execute_batched_sends_batches():
+    """
+    Test that commands are sent in batches and their replies returned in order.
+    """
+    client = Mock()
+    pipe = client.pipeline.return_value
+    pipe.execute.side_effect = [['a', 'b'], ['c', 'd'], ['e']]
+
+    replies = execute_batched(client, ['k1', 'k2', 'k3', 'k4', 'k5'], lambda p, key: p.get(key), batch_size=2)
+
+    assert replies == ['a', 'b', 'c', 'd', 'e']
+    assert pipe.execute.call_count == 3
+    client.pipeline.assert_called_once_with(transaction=False)
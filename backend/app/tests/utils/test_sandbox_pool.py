@@ -0,0 +1,185 @@
+"""
+Unit tests for the SandboxPool.
+
+This module contains pytest-based unit tests for the SandboxPool class, which runs
+CPU-bound parsing in persistent, resource-limited subprocess workers.
+"""
+
+import os
+import sys
+import time
+import pytest
+from app.utils.sandbox_pool import SandboxPool, SandboxTimeoutError, SandboxCrashError, SandboxTaskError
+
+
+def add(a, b):
+    return a + b
+
+
+def worker_pid():
+    return os.getpid()
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def exit_abruptly():
+    os._exit(3)
+
+
+def raise_value_error():
+    raise ValueError("malformed file")
+
+
+def allocate(megabytes):
+    return len(bytearray(megabytes * 1024 * 1024))
+
+
+def is_imported(module_name):
+    return module_name in sys.modules
+
+
+# Changed by the parent process only; workers that were forked would see the change
+MARKER = 'imported'
+
+
+def marker():
+    return MARKER
+
+
+@pytest.fixture
+def pool():
+    """
+    Fixture to create a single-worker SandboxPool and stop it afterwards.
+
+    Yields:
+        SandboxPool: The pool under test.
+    """
+    pool = SandboxPool(size=1, memory_limit_mb=256, cpu_seconds=10, deadline=10)
+    yield pool
+    pool.shutdown()
+
+
+def test_run_returns_result_from_persistent_worker(pool):
+    """
+    Test that tasks run outside the calling process and reuse the same worker.
+
+    Args:
+        pool (SandboxPool): The pool under test.
+    """
+    assert pool.run(add, 2, 3) == 5
+    first_pid = pool.run(worker_pid)
+
+    assert first_pid != os.getpid()
+    assert pool.run(worker_pid) == first_pid
+    assert pool.get_metrics()["completed"] == 3
+
+
+def test_workers_start_fresh_with_preloaded_modules(monkeypatch):
+    """
+    Test that workers are not forked from the caller and import the preload modules.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): Used to change module state in the caller only.
+    """
+    monkeypatch.setattr(sys.modules[__name__], 'MARKER', 'changed')
+    pool = SandboxPool(size=1, memory_limit_mb=256, cpu_seconds=10, deadline=10, preload=['colorsys'])
+    try:
+        assert pool._context.get_start_method() in ('forkserver', 'spawn')
+        assert pool.run(is_imported, 'colorsys') is True
+        assert pool.run(marker) == 'imported'
+    finally:
+        pool.shutdown()
+
+
+def test_submit_returns_future(pool):
+    """
+    Test that submit schedules a task and returns a future for its result.
+
+    Args:
+        pool (SandboxPool): The pool under test.
+    """
+    assert pool.submit(add, 1, b=2).result(timeout=10) == 3
+
+
+def test_run_raises_task_error(pool):
+    """
+    Test that an exception inside the task is reported without losing the worker.
+
+    Args:
+        pool (SandboxPool): The pool under test.
+    """
+    first_pid = pool.run(worker_pid)
+
+    with pytest.raises(SandboxTaskError) as error:
+        pool.run(raise_value_error)
+
+    assert error.value.error_type == "ValueError"
+    assert pool.run(worker_pid) == first_pid
+    assert pool.get_metrics()["failed"] == 1
+
+
+def test_run_enforces_deadline_and_replaces_worker(pool):
+    """
+    Test that a task missing its deadline is killed and a fresh worker serves the next task.
+
+    Args:
+        pool (SandboxPool): The pool under test.
+    """
+    first_pid = pool.run(worker_pid)
+
+    with pytest.raises(SandboxTimeoutError):
+        pool.run(sleep_for, 5, deadline=0.2)
+
+    assert pool.run(worker_pid) != first_pid
+    assert pool.get_metrics()["timed_out"] == 1
+
+
+def test_run_isolates_crashes(pool):
+    """
+    Test that a worker dying mid-task raises SandboxCrashError and the pool recovers.
+
+    Args:
+        pool (SandboxPool): The pool under test.
+    """
+    with pytest.raises(SandboxCrashError):
+        pool.run(exit_abruptly)
+
+    assert pool.run(add, 1, 1) == 2
+    assert pool.get_metrics()["crashed"] == 1
+
+
+def test_run_enforces_memory_limit(pool):
+    """
+    Test that a task allocating beyond the memory limit fails instead of exhausting the host.
+
+    Args:
+        pool (SandboxPool): The pool under test.
+    """
+    with pytest.raises((SandboxTaskError, SandboxCrashError)):
+        pool.run(allocate, 1024)
+
+    assert pool.run(allocate, 1) == 1024 * 1024
+
+
+def test_metrics_report_queue_depth_and_utilisation(pool):
+    """
+    Test that waiting callers are reported as queue depth while the worker is busy.
+
+    Args:
+        pool (SandboxPool): The pool under test.
+    """
+    first = pool.submit(sleep_for, 0.5)
+    second = pool.submit(sleep_for, 0)
+    time.sleep(0.2)
+
+    metrics = pool.get_metrics()
+    assert metrics["busy"] == 1
+    assert metrics["utilisation"] == 1.0
+    assert metrics["queue_depth"] == 1
+
+    first.result(timeout=10)
+    second.result(timeout=10)
+    assert pool.get_metrics()["queue_depth"] == 0
@@ -0,0 +1,239 @@
+"""
+Unit tests for the SingleFlight guard.
+
+This module contains pytest-based unit tests for the SingleFlight class, which
+deduplicates concurrent work through a distributed Redis lock.
+"""
+
+import json
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from redis.exceptions import ConnectionError as RedisConnectionError, LockError
+from app.utils.single_flight import SingleFlight
+
+
+@pytest.fixture
+def mock_redis():
+    """
+    Fixture to create a mock Redis client.
+
+    Returns:
+        Mock: A mock object representing a Redis client.
+    """
+    return Mock()
+
+
+def test_do_runs_work_when_lock_acquired(mock_redis):
+    """
+    Test that the caller acquiring the lock runs the work and publishes the result.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.lock.return_value.acquire.return_value = True
+    mock_redis.get.return_value = None
+    func = Mock(return_value=True)
+
+    result = SingleFlight(mock_redis, namespace='ingest').do('user:file:v1', func)
+
+    assert result is True
+    func.assert_called_once()
+    token = mock_redis.lock.return_value.acquire.call_args.kwargs['token']
+    mock_redis.set.assert_called_once_with(
+        'ingest:user:file:v1:result', json.dumps({"flight": token, "result": True}), ex=60)
+    mock_redis.lock.return_value.release.assert_called_once()
+    mock_redis.hincrby.assert_called_with('ingest:metrics', 'executed', 1)
+
+
+def test_do_waits_for_concurrent_result(mock_redis):
+    """
+    Test that a caller finding the lock held returns the published result without running the work.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.lock.return_value.acquire.return_value = False
+    mock_redis.get.side_effect = ['holder', json.dumps({"flight": "holder", "result": True})]
+    func = Mock()
+
+    result = SingleFlight(mock_redis, poll_interval=0).do('key', func)
+
+    assert result is True
+    func.assert_not_called()
+    mock_redis.hincrby.assert_called_with('singleflight:metrics', 'deduplicated', 1)
+
+
+def test_do_ignores_result_of_another_flight(mock_redis):
+    """
+    Test that a waiting caller does not take the result published by an earlier flight.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.lock.return_value.acquire.side_effect = [False, True]
+    mock_redis.get.side_effect = ['holder', json.dumps({"flight": "earlier", "result": 'stale'})]
+    func = Mock(return_value='done')
+
+    assert SingleFlight(mock_redis, poll_interval=0).do('key', func) == 'done'
+    func.assert_called_once()
+
+
+def test_do_times_out(mock_redis):
+    """
+    Test that a caller gives up once the wait timeout has elapsed.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.lock.return_value.acquire.return_value = False
+    mock_redis.get.return_value = None
+
+    with pytest.raises(TimeoutError):
+        SingleFlight(mock_redis, wait_timeout=0.01, poll_interval=0).do('key', Mock())
+
+
+def test_do_records_expired_lock(mock_redis):
+    """
+    Test that a lock which expired during the work is recorded rather than raised.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.lock.return_value.acquire.return_value = True
+    mock_redis.lock.return_value.release.side_effect = LockError()
+    mock_redis.get.return_value = None
+
+    result = SingleFlight(mock_redis).do('key', Mock(return_value=False))
+
+    assert result is False
+    mock_redis.hincrby.assert_called_with('singleflight:metrics', 'lock_expired', 1)
+
+
+def test_do_without_redis():
+    """
+    Test that the work runs directly when Redis is unavailable.
+    """
+    broken_redis = Mock()
+    broken_redis.get.side_effect = RedisConnectionError()
+    broken_redis.lock.side_effect = RedisConnectionError()
+
+    assert SingleFlight(broken_redis).do('key', lambda: 'done') == 'done'
+    assert SingleFlight(None).do('key', lambda: 'done') == 'done'
+
+
+def test_get_metrics(mock_redis):
+    """
+    Test that recorded counters are returned as integers.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.hgetall.return_value = {'executed': '2', 'deduplicated': '5'}
+
+    assert SingleFlight(mock_redis).get_metrics() == {'executed': 2, 'deduplicated': 5}
+
+
+class ThreadSafeFakeRedis:
+    """An in-memory stand-in for the Redis commands SingleFlight uses, safe across threads."""
+
+    def __init__(self):
+        self.mutex = threading.Lock()
+        self.values = {}
+        self.metrics = {}
+
+    def get(self, key):
+        with self.mutex:
+            return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        with self.mutex:
+            self.values[key] = value
+
+    def delete(self, key):
+        with self.mutex:
+            self.values.pop(key, None)
+
+    def hincrby(self, key, field, amount):
+        with self.mutex:
+            self.metrics[field] = self.metrics.get(field, 0) + amount
+
+    def lock(self, key, timeout=None, blocking=True):
+        fake = self
+
+        class Lock:
+            def acquire(self, token=None):
+                with fake.mutex:
+                    if key in fake.values:
+                        return False
+                    fake.values[key] = token
+                    return True
+
+            def release(self):
+                fake.delete(key)
+        return Lock()
+
+
+def test_concurrent_callers_share_one_execution():
+    """
+    Test that callers arriving together in separate threads run the work once and share its result.
+    """
+    fake_redis = ThreadSafeFakeRedis()
+    guard = SingleFlight(fake_redis, poll_interval=0.01)
+    calls = []
+    start = threading.Barrier(4)
+    results = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'indexed'
+
+    def caller():
+        start.wait()
+        results.append(guard.do('file', work))
+
+    threads = [threading.Thread(target=caller) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ['indexed'] * 4
+    assert fake_redis.metrics == {'executed': 1, 'deduplicated': 3}
+
+
+def test_sequential_callers_each_run_the_work():
+    """
+    Test that a call made after an earlier flight finished runs the work rather than reusing its result.
+    """
+    fake_redis = ThreadSafeFakeRedis()
+    guard = SingleFlight(fake_redis, poll_interval=0.01)
+    results = iter([True, False])
+    calls = []
+
+    def work():
+        calls.append(1)
+        return next(results)
+
+    assert guard.do('user:file:v1', work) is True
+    assert guard.do('user:file:v1', work) is False
+    assert len(calls) == 2
+    assert fake_redis.metrics == {'executed': 2}
+
+
+def test_forget_deletes_results_of_every_version(mock_redis):
+    """
+    Test that forgetting a prefix deletes the published results under it.
+
+    Args:
+        mock_redis (Mock): The mock Redis client.
+    """
+    mock_redis.scan_iter.return_value = ['ingest:user:file:v1:result', 'ingest:user:file:v2:result']
+
+    SingleFlight(mock_redis, namespace='ingest').forget('user:file')
+
+    mock_redis.scan_iter.assert_called_once_with(match='ingest:user:file:*:result')
+    assert mock_redis.delete.call_count == 2
@@ -0,0 +1,23 @@
+"""
+Unit tests for the token counting utilities.
+"""
+
+from unittest.mock import patch
+from app.utils import token_utils
+from app.utils.token_utils import count_tokens
+
+
+def test_count_tokens_empty():
+    """
+    Test that empty text counts as zero tokens.
+    """
+    assert count_tokens("") == 0
+    assert count_tokens(None) == 0
+
+
+def test_count_tokens_without_encoding():
+    """
+    Test that a character-based estimate is used when no tokenizer is available.
+    """
+    with patch.object(token_utils, '_get_encoding', return_value=None):
+        assert count_tokens("a" * 10) == 3
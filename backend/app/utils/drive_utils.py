@@ -2,23 +2,110 @@
 This module provides utility functions for Google Drive operations.
 
 It includes functions for retrieving DriveCore instances based on user data stored in Redis.
+DriveCore instances are cached per worker. A user's stored credentials are loaded at most
+once per request, and are usually served from a per-process cache that Redis keyspace
+notifications keep up to date, so most requests do not read the token from Redis at all.
 """
 
 import json
-import redis
-from google.oauth2.credentials import Credentials
-from app.services.google_drive.core import DriveCore
+from flask import g, has_request_context
+from app.services.google_drive.client_cache import DriveCoreCache
+from app.services.google_drive.credential_cache import CredentialCache
+from app.services.google_drive.token_manager import TokenManager
+from app.utils.redis_client import get_redis_client
 from config import Config
 
-# Initialize Redis client
-redis_client = redis.StrictRedis.from_url(Config.REDIS_TOKEN_URL, decode_responses=True)
+# The worker's shared Redis client
+redis_client = get_redis_client()
+
+# Users' stored credentials, read recently by this process
+credential_cache = CredentialCache(
+    redis_client,
+    ttl=Config.CREDENTIAL_CACHE_TTL,
+    max_size=Config.CREDENTIAL_CACHE_SIZE
+)
+
+# Refreshes users' tokens shortly before they expire
+token_manager = TokenManager(
+    redis_client,
+    refresh_margin=Config.TOKEN_REFRESH_MARGIN,
+    poll_interval=Config.TOKEN_REFRESH_INTERVAL,
+    idle_timeout=Config.TOKEN_REFRESH_IDLE_TIMEOUT
+)
+
+# Authorised clients of recent users, reused across requests in this worker. Tokens
+# stored before their expiry was tracked are picked up when their client is first built
+drive_core_cache = DriveCoreCache(
+    max_size=Config.DRIVE_CLIENT_CACHE_SIZE,
+    on_create=lambda user_id, drive_core: token_manager.track(user_id, drive_core.credentials.expiry)
+)
+
+def _request_credentials():
+    """Credentials loaded in the current request, keyed by user ID, or None outside a request."""
+    if not has_request_context():
+        return None
+    if 'user_credentials' not in g:
+        g.user_credentials = {}
+    return g.user_credentials
+
+def get_user_credentials(user_id):
+    """
+    Get a user's stored credentials, loading them at most once per request.
+
+    Args:
+        user_id (str): The user's ID.
+
+    Returns:
+        Optional[str]: The credentials JSON, or None if the user has none stored.
+
+    Raises:
+        redis.exceptions.RedisError: If the credentials are not cached and Redis is unavailable.
+    """
+    loaded = _request_credentials()
+    if loaded is None:
+        return credential_cache.get(user_id)
+    if user_id not in loaded:
+        loaded[user_id] = credential_cache.get(user_id)
+    return loaded[user_id]
+
+def set_user_credentials(user_id, credentials_json):
+    """
+    Store a user's credentials, e.g. after they log in.
+
+    Args:
+        user_id (str): The user's ID.
+        credentials_json (str): The credentials JSON.
+
+    Raises:
+        redis.exceptions.RedisError: If Redis is unavailable.
+    """
+    credential_cache.set(user_id, credentials_json)
+    loaded = _request_credentials()
+    if loaded is not None:
+        loaded[user_id] = credentials_json
+
+def delete_user_credentials(user_id):
+    """
+    Delete a user's stored credentials, e.g. when they log out.
+
+    Args:
+        user_id (str): The user's ID.
+
+    Raises:
+        redis.exceptions.RedisError: If Redis is unavailable.
+    """
+    loaded = _request_credentials()
+    if loaded is not None:
+        loaded.pop(user_id, None)
+    credential_cache.delete(user_id)
 
 def get_drive_core(session):
     """
     Retrieve a DriveCore instance based on credentials stored in Redis.
 
     This function checks for the presence of a user_id in the provided session,
-    retrieves the corresponding credentials from Redis, and creates a DriveCore instance.
+    retrieves the corresponding credentials from Redis, and returns the DriveCore cached
+    for them, creating it if the user or their token is new.
 
     Args:
         session (dict): The session object containing user_id.
@@ -37,17 +124,13 @@ def get_drive_core(session):
         raise ValueError("User not authenticated")
     
     try:
-        # Retrieve credentials from Redis
-        credentials_json = redis_client.get(f'user:{user_id}:token')
+        # Retrieve credentials, from this request or the process cache if already loaded
+        credentials_json = get_user_credentials(user_id)
         if not credentials_json:
             raise ValueError("User credentials not found")
 
-        # Parse credentials JSON
-        credentials_dict = json.loads(credentials_json)
-        
-        # Create and return DriveCore instance
-        drive_core = DriveCore(credentials_dict)
-        return drive_core
+        # Reuse the DriveCore built for this token, or parse the credentials and build one
+        return drive_core_cache.get(user_id, credentials_json)
     
     except json.JSONDecodeError as e:
         # Handle invalid JSON format
@@ -0,0 +1,185 @@
+"""
+This module provides the Redis clients shared by the whole application.
+
+Every part of the app that talks to Redis takes its client from here, so each worker
+keeps one bounded connection pool per response mode (decoded text, and raw bytes for
+the extraction cache) instead of an unbounded pool per module. Connections have socket
+timeouts, periodic health checks and retry transient connection errors and timeouts
+with backoff. When every connection is in use, callers wait up to
+``REDIS_POOL_TIMEOUT`` seconds for one; the pools report how often that happens.
+
+It also provides the key names of the app's Redis schema that are shared between
+modules, and a helper that sends many commands in a few pipelined round trips.
+"""
+
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import redis
+from redis.backoff import ExponentialBackoff
+from redis.connection import BlockingConnectionPool
+from redis.exceptions import ConnectionError
+from redis.retry import Retry
+
+from config import Config
+
+
+class MonitoredConnectionPool(BlockingConnectionPool):
+    """
+    A blocking connection pool that records how close it runs to its connection limit.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._stats_lock = threading.Lock()
+        self._stats = {"checkouts": 0, "waits": 0, "wait_seconds": 0.0, "timeouts": 0, "peak_in_use": 0}
+        super().__init__(*args, **kwargs)
+
+    def get_connection(self, *args, **kwargs):
+        # The queue holds idle connections and placeholders for ones not yet opened, so
+        # an empty queue means every connection is checked out and the caller must wait
+        exhausted = self.pool.empty()
+        start = time.monotonic()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except ConnectionError:
+            if exhausted:
+                with self._stats_lock:
+                    self._stats["waits"] += 1
+                    self._stats["timeouts"] += 1
+            raise
+        waited = time.monotonic() - start
+        in_use = self.max_connections - self.pool.qsize()
+        with self._stats_lock:
+            self._stats["checkouts"] += 1
+            if exhausted:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += waited
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], in_use)
+        return connection
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Report pool saturation in this worker.
+
+        Returns:
+            Dict[str, Any]: The connection limit, connections in use now and at peak, the
+                fraction of the limit in use, and how many checkouts waited for a free
+                connection, for how long in total, and how many gave up.
+        """
+        with self._stats_lock:
+            metrics = dict(self._stats)
+        in_use = self.max_connections - self.pool.qsize()
+        metrics["max_connections"] = self.max_connections
+        metrics["in_use"] = in_use
+        metrics["saturation"] = in_use / self.max_connections if self.max_connections else 0.0
+        return metrics
+
+
+_clients: Dict[bool, redis.Redis] = {}
+_clients_lock = threading.Lock()
+
+
+def create_pool(url: str, decode_responses: bool = True) -> MonitoredConnectionPool:
+    """
+    Create a connection pool configured from the application settings.
+
+    Args:
+        url (str): The Redis URL.
+        decode_responses (bool): Whether replies are decoded to str rather than returned as bytes.
+
+    Returns:
+        MonitoredConnectionPool: The pool.
+    """
+    return MonitoredConnectionPool.from_url(
+        url,
+        max_connections=Config.REDIS_MAX_CONNECTIONS,
+        timeout=Config.REDIS_POOL_TIMEOUT,
+        socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=Config.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=Config.REDIS_HEALTH_CHECK_INTERVAL,
+        retry=Retry(ExponentialBackoff(cap=1, base=0.05), Config.REDIS_RETRIES),
+        decode_responses=decode_responses
+    )
+
+
+def get_redis_client(decode_responses: bool = True) -> Optional[redis.Redis]:
+    """
+    Get the worker's shared Redis client, creating it on first use.
+
+    Args:
+        decode_responses (bool): True for the client that returns str, False for the
+            one that returns bytes, such as for compressed cache entries.
+
+    Returns:
+        Optional[redis.Redis]: The client, or None if ``REDIS_TOKEN_URL`` is not set.
+    """
+    if not Config.REDIS_TOKEN_URL:
+        return None
+    with _clients_lock:
+        client = _clients.get(decode_responses)
+        if client is None:
+            client = redis.Redis(connection_pool=create_pool(Config.REDIS_TOKEN_URL, decode_responses))
+            _clients[decode_responses] = client
+        return client
+
+
+def get_pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Report saturation of the shared connection pools in this worker.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Metrics of each pool created so far, keyed 'text' or
+            'binary'. See ``MonitoredConnectionPool.get_metrics``.
+    """
+    with _clients_lock:
+        clients = dict(_clients)
+    return {('text' if decode_responses else 'binary'): client.connection_pool.get_metrics()
+            for decode_responses, client in clients.items()}
+
+
+def token_key(user_id: str) -> str:
+    """
+    Get the key of a user's stored OAuth credentials.
+
+    Args:
+        user_id (str): The user's ID.
+
+    Returns:
+        str: The key.
+    """
+    return f'user:{user_id}:token'
+
+
+def execute_batched(redis_client, items: Iterable[Any], add_commands: Callable[[Any, Any], None],
+                    batch_size: Optional[int] = None, transaction: bool = False) -> List[Any]:
+    """
+    Send commands for many items in pipelined batches rather than one round trip each.
+
+    Args:
+        redis_client: The Redis client.
+        items (Iterable[Any]): The items to send commands for.
+        add_commands (Callable[[Any, Any], None]): Called with the pipeline and an item to
+            queue that item's commands.
+        batch_size (int, optional): Items per round trip. Defaults to ``REDIS_PIPELINE_BATCH_SIZE``.
+        transaction (bool): Whether each batch runs atomically, as a MULTI/EXEC transaction.
+
+    Returns:
+        List[Any]: The replies of every queued command, in order.
+
+    Raises:
+        redis.exceptions.RedisError: If a batch fails.
+    """
+    batch_size = batch_size or Config.REDIS_PIPELINE_BATCH_SIZE
+    replies = []
+    pipe = redis_client.pipeline(transaction=transaction)
+    pending = 0
+    for item in items:
+        add_commands(pipe, item)
+        pending += 1
+        if pending >= batch_size:
+            replies.extend(pipe.execute())
+            pending = 0
+    if pending:
+        replies.extend(pipe.execute())
+    return replies
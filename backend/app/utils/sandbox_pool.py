@@ -0,0 +1,316 @@
+"""
+This module provides a pool of persistent, resource-limited subprocess workers.
+
+CPU-bound parsing of untrusted files runs in these workers instead of the web worker.
+Each worker caps its own address space and CPU time with rlimits, every task has a
+wall-clock deadline, and a worker that crashes, runs out of memory or misses its
+deadline is killed and replaced without affecting other requests.
+
+Workers start from a fresh interpreter, through a fork server or by spawning, rather
+than as forks of the web worker, so they inherit none of its threads, locks or open
+connections. Modules a task relies on having been imported, such as ones registering
+extractor plugins, are named as the pool's preload modules.
+"""
+
+import importlib
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class SandboxError(Exception):
+    """Base class for errors raised by the sandbox pool."""
+
+
+class SandboxTimeoutError(SandboxError):
+    """Raised when a task misses its wall-clock deadline."""
+
+
+class SandboxCrashError(SandboxError):
+    """Raised when a worker dies while running a task, e.g. on hitting a resource limit."""
+
+
+class SandboxTaskError(SandboxError):
+    """Raised when a task raises an exception inside its worker."""
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+
+
+def _limit_memory(memory_limit: int) -> None:
+    """Cap the worker's address space at its size after start-up plus ``memory_limit`` bytes."""
+    if resource is None or not memory_limit:
+        return
+    try:
+        with open('/proc/self/statm') as statm:
+            baseline = int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        baseline = 0
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (baseline + memory_limit, baseline + memory_limit))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not limit sandbox worker memory: {str(e)}")
+
+
+def _limit_cpu(cpu_seconds: int) -> None:
+    """Allow the next task ``cpu_seconds`` of CPU time on top of what the worker has used so far."""
+    if resource is None or not cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(usage.ru_utime + usage.ru_stime) + cpu_seconds + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not limit sandbox worker CPU time: {str(e)}")
+
+
+def _worker_main(conn, memory_limit: int, preload: tuple = ()) -> None:
+    """Import the ``preload`` modules, then serve tasks received over ``conn`` until the pipe is closed."""
+    for module_name in preload:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            logger.error(f"Sandbox worker could not import {module_name}: {str(e)}")
+    _limit_memory(memory_limit)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+
+        func, args, kwargs, cpu_seconds = message
+        _limit_cpu(cpu_seconds)
+        try:
+            reply = ('ok', func(*args, **kwargs))
+        except BaseException as e:
+            reply = ('error', type(e).__name__, str(e))
+
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send(('error', type(e).__name__, f"Could not return the task result: {str(e)}"))
+
+        if reply[0] == 'error' and reply[1] == 'MemoryError':
+            # The heap may be fragmented or exhausted; let the pool start a fresh worker
+            return
+
+
+class _Worker:
+    def __init__(self, context, memory_limit: int, preload: tuple = ()):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit, preload), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    Run picklable callables in persistent worker processes with resource limits.
+
+    Workers are started lazily, up to ``size``, and reused across tasks; each is replaced
+    after ``max_tasks_per_worker`` tasks. Callers block while every worker is busy, and
+    the number of blocked callers is reported as the queue depth.
+    """
+
+    def __init__(self, size: int = 2, memory_limit_mb: int = 1024, cpu_seconds: int = 120,
+                 deadline: float = 180, max_tasks_per_worker: int = 100,
+                 start_method: str = 'forkserver', preload: Iterable[str] = ()):
+        """
+        Initialize the SandboxPool.
+
+        Args:
+            size (int): Maximum number of worker processes.
+            memory_limit_mb (int): Address space each worker may use on top of its start-up size.
+            cpu_seconds (int): CPU seconds allowed per task before the worker is killed.
+            deadline (float): Default wall-clock seconds allowed per task.
+            max_tasks_per_worker (int): Tasks a worker runs before it is replaced.
+            start_method (str): How workers are started, 'forkserver' or 'spawn'. Falls back
+                to 'spawn' where the fork server is unavailable.
+            preload (Iterable[str]): Modules each worker imports before serving tasks.
+        """
+        self.size = size
+        self.memory_limit = memory_limit_mb * 1024 * 1024
+        self.cpu_seconds = cpu_seconds
+        self.deadline = deadline
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.preload = tuple(preload)
+        if start_method not in multiprocessing.get_all_start_methods():
+            start_method = 'spawn'
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver' and self.preload:
+            # Imported once by the fork server, so each new worker starts with them loaded
+            self._context.set_forkserver_preload(list(self.preload))
+        self._condition = threading.Condition()
+        self._idle = []
+        self._started = 0
+        self._busy = 0
+        self._queued = 0
+        self._dispatcher = None
+        self._counters = {"completed": 0, "failed": 0, "timed_out": 0, "crashed": 0}
+        self._busy_seconds = 0.0
+        self._created_at = time.monotonic()
+
+    def _acquire(self) -> _Worker:
+        with self._condition:
+            while not self._idle and self._started >= self.size:
+                self._condition.wait()
+            self._queued -= 1
+            self._busy += 1
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return _Worker(self._context, self.memory_limit, self.preload)
+        except Exception:
+            self._release(None)
+            raise
+
+    def _release(self, worker: Optional[_Worker], busy_seconds: float = 0.0) -> None:
+        if worker is not None and (not worker.is_alive() or worker.tasks >= self.max_tasks_per_worker):
+            worker.stop()
+            worker = None
+        with self._condition:
+            self._busy -= 1
+            self._busy_seconds += busy_seconds
+            if worker is None:
+                self._started -= 1
+            else:
+                self._idle.append(worker)
+            self._condition.notify()
+
+    def _count(self, counter: str) -> None:
+        with self._condition:
+            self._counters[counter] += 1
+
+    def _run_queued(self, func: Callable, args: tuple, kwargs: dict, deadline: Optional[float]) -> Any:
+        worker = self._acquire()
+        start = time.monotonic()
+        deadline = self.deadline if deadline is None else deadline
+        try:
+            worker.tasks += 1
+            worker.conn.send((func, args, kwargs, self.cpu_seconds))
+            if not worker.conn.poll(deadline):
+                worker.kill()
+                self._count("timed_out")
+                raise SandboxTimeoutError(f"Task {getattr(func, '__name__', func)} exceeded {deadline} seconds")
+            reply = worker.conn.recv()
+            if reply[0] == 'error' and reply[1] == 'MemoryError':
+                # The worker exits after a MemoryError, so it must not be handed out again
+                worker.tasks = self.max_tasks_per_worker
+        except (EOFError, OSError, BrokenPipeError):
+            worker.kill()
+            self._count("crashed")
+            raise SandboxCrashError(
+                f"Worker running {getattr(func, '__name__', func)} exited with code {worker.process.exitcode}"
+            )
+        finally:
+            self._release(worker, time.monotonic() - start)
+
+        if reply[0] == 'ok':
+            self._count("completed")
+            return reply[1]
+        self._count("failed")
+        raise SandboxTaskError(reply[1], reply[2])
+
+    def run(self, func: Callable, *args, deadline: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a callable in a worker and wait for its result.
+
+        Args:
+            func (Callable): A module-level function; it, its arguments and its result must be picklable.
+            *args: Positional arguments for ``func``.
+            deadline (float, optional): Wall-clock seconds allowed for the task. Defaults to the pool's deadline.
+            **kwargs: Keyword arguments for ``func``.
+
+        Returns:
+            Any: The function's return value.
+
+        Raises:
+            SandboxTimeoutError: If the task missed its deadline.
+            SandboxCrashError: If the worker died, e.g. on hitting its memory or CPU limit.
+            SandboxTaskError: If the function raised an exception.
+        """
+        with self._condition:
+            self._queued += 1
+        return self._run_queued(func, args, kwargs, deadline)
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        Schedule a callable on a worker, like ``concurrent.futures.Executor.submit``.
+
+        Args:
+            func (Callable): A module-level function; it, its arguments and its result must be picklable.
+            *args: Positional arguments for ``func``.
+            **kwargs: Keyword arguments for ``func``.
+
+        Returns:
+            Future: A future resolving to the function's return value or one of the sandbox errors.
+        """
+        with self._condition:
+            if self._dispatcher is None:
+                self._dispatcher = ThreadPoolExecutor(max_workers=self.size * 4, thread_name_prefix='sandbox')
+            self._queued += 1
+        return self._dispatcher.submit(self._run_queued, func, args, kwargs, None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Report worker utilisation, queue depth and task outcome counters.
+
+        Returns:
+            Dict[str, Any]: The pool's current state and counters since it was created.
+        """
+        with self._condition:
+            busy_seconds = self._busy_seconds
+            elapsed = max(time.monotonic() - self._created_at, 1e-9)
+            return {
+                "size": self.size,
+                "workers": self._started,
+                "busy": self._busy,
+                "queue_depth": self._queued,
+                "utilisation": self._busy / self.size,
+                "average_utilisation": min(busy_seconds / (elapsed * self.size), 1.0),
+                **self._counters
+            }
+
+    def shutdown(self) -> None:
+        """Stop all idle workers. Busy workers are stopped when their task finishes."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+        for worker in idle:
+            worker.stop()
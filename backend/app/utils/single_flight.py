@@ -0,0 +1,160 @@
+"""
+This module provides a Redis-backed single-flight guard.
+
+It ensures that only one caller performs a given unit of work at a time across
+all workers, while concurrent callers for the same key wait for and share the
+result of the caller doing the work. Callers that arrive after the work finished
+run it again, so a result is never reused once its flight is over.
+"""
+
+import json
+import time
+import uuid
+from redis.exceptions import LockError, RedisError
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls for the same key using a distributed Redis lock.
+
+    The first caller to acquire the lock for a key runs the work and publishes
+    its result, tagged with the lock's token, for ``result_ttl`` seconds. Callers
+    that find the lock held read that token and poll for the result of that flight
+    only, instead of repeating the work; results of earlier flights are ignored.
+    Locks expire after ``lock_timeout`` seconds so a crashed worker cannot block a
+    key forever.
+    """
+
+    def __init__(self, redis_client, namespace='singleflight', lock_timeout=300,
+                 result_ttl=60, wait_timeout=330, poll_interval=0.25):
+        """
+        Initialize the SingleFlight guard.
+
+        Args:
+            redis_client: A Redis client with ``decode_responses=True``, or None to disable deduplication.
+            namespace (str): Prefix for all keys written by this guard.
+            lock_timeout (int): Seconds after which an unreleased lock expires.
+            result_ttl (int): Seconds a published result stays readable by waiting callers.
+            wait_timeout (int): Maximum seconds a caller waits for a result before giving up.
+            poll_interval (float): Seconds between polls while waiting for a result.
+        """
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.lock_timeout = lock_timeout
+        self.result_ttl = result_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    def _key(self, key, suffix):
+        return f"{self.namespace}:{key}:{suffix}"
+
+    def _record(self, field):
+        try:
+            self.redis_client.hincrby(f"{self.namespace}:metrics", field, 1)
+        except RedisError:
+            pass
+
+    def do(self, key, func):
+        """
+        Run ``func`` once for ``key``, sharing its result with concurrent callers.
+
+        Args:
+            key (str): The deduplication key.
+            func (callable): A zero-argument callable returning a JSON-serialisable result.
+
+        Returns:
+            The result of ``func``, either computed by this caller or by a concurrent one.
+
+        Raises:
+            TimeoutError: If no result became available within ``wait_timeout`` seconds.
+            Exception: Any exception raised by ``func`` when this caller runs it.
+        """
+        if self.redis_client is None:
+            return func()
+
+        lock_key = self._key(key, 'lock')
+        result_key = self._key(key, 'result')
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        flight = None
+
+        try:
+            while time.monotonic() < deadline:
+                if flight is not None:
+                    published = self._published(result_key, flight)
+                    if published is not None:
+                        return published[0]
+
+                lock = self.redis_client.lock(lock_key, timeout=self.lock_timeout, blocking=False)
+                if lock.acquire(token=token):
+                    break
+                # The holder's token identifies the flight whose result this caller waits for
+                flight = self.redis_client.get(lock_key) or flight
+                time.sleep(self.poll_interval)
+            else:
+                self._record('timed_out')
+                raise TimeoutError(f"Timed out waiting for in-flight work on {key}")
+        except RedisError:
+            return func()
+
+        self._record('executed')
+        try:
+            result = func()
+            try:
+                self.redis_client.set(result_key, json.dumps({"flight": token, "result": result}),
+                                      ex=self.result_ttl)
+            except RedisError:
+                pass
+            return result
+        finally:
+            self._release(lock)
+
+    def _published(self, result_key, flight):
+        """Return the result of the given flight in a one-item tuple, counting the reuse, or None if not published."""
+        cached = self.redis_client.get(result_key)
+        if cached is None:
+            return None
+        published = json.loads(cached)
+        if published.get('flight') != flight:
+            return None
+        self._record('deduplicated')
+        return (published['result'],)
+
+    def forget(self, key_prefix):
+        """
+        Delete the published results of every key starting with a prefix.
+
+        Args:
+            key_prefix (str): The prefix, such as ``user:file`` for every version of a file.
+        """
+        if self.redis_client is None:
+            return
+        try:
+            for result_key in self.redis_client.scan_iter(match=self._key(f"{key_prefix}:*", 'result')):
+                self.redis_client.delete(result_key)
+        except RedisError:
+            pass
+
+    def _release(self, lock):
+        try:
+            lock.release()
+        except LockError:
+            # The lock expired while the work was running
+            self._record('lock_expired')
+        except RedisError:
+            pass
+
+    def get_metrics(self):
+        """
+        Retrieve the counters recorded by this guard.
+
+        Returns:
+            dict: Counter names mapped to integer values, or an empty dict if Redis is unavailable.
+        """
+        if self.redis_client is None:
+            return {}
+        try:
+            metrics = self.redis_client.hgetall(f"{self.namespace}:metrics")
+            return {name: int(value) for name, value in metrics.items()}
+        except RedisError:
+            return {}
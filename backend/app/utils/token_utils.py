@@ -0,0 +1,42 @@
+"""
+This module provides utility functions for estimating LLM token counts.
+
+It uses tiktoken where the encoding is available and falls back to a
+character-based estimate otherwise, so callers never fail on token counting.
+"""
+
+from functools import lru_cache
+import tiktoken
+
+DEFAULT_MODEL = "gpt-4o-mini"
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model):
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    """
+    Count the tokens in a piece of text.
+
+    Args:
+        text (str): The text to count.
+        model (str, optional): The model whose tokenizer should be used.
+
+    Returns:
+        int: The number of tokens, or an estimate if the tokenizer is unavailable.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,75 @@
+"""
+Measure how long a fresh worker takes to import the text extraction modules.
+
+Each scenario runs in a new interpreter, several times, and the median wall-clock import
+time is reported. The "eager" scenario imports the parser libraries that file_extractor
+used to import at module load, for comparison with the lazy plugin registry.
+
+Usage (from the backend directory, with the application's environment variables set):
+    python benchmarks/import_time.py --runs 7
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARSER_IMPORTS = (
+    "import docx2txt, chardet, PyPDF2, openpyxl, xlrd\n"
+    "from langchain_community.document_loaders import "
+    "Docx2txtLoader, CSVLoader, TextLoader, UnstructuredExcelLoader, PyPDFLoader\n"
+)
+
+SCENARIOS = {
+    "file_extractor (lazy)": "import app.services.natural_language.file_extractor\n",
+    "file_extractor + parsers (eager)": "import app.services.natural_language.file_extractor\n" + PARSER_IMPORTS,
+    "chat_service (lazy)": "import app.services.natural_language.chat_service\n",
+    "chat_service + parsers (eager)": "import app.services.natural_language.chat_service\n" + PARSER_IMPORTS,
+}
+
+TIMER = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "{imports}"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def time_import(imports: str) -> float:
+    """
+    Import modules in a fresh interpreter and return the seconds taken.
+
+    Args:
+        imports (str): The import statements to time.
+
+    Returns:
+        float: The wall-clock import time in seconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", TIMER.format(imports=imports)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="runs per scenario (default: 5)")
+    args = parser.parse_args()
+
+    medians = {}
+    for name, imports in SCENARIOS.items():
+        timings = [time_import(imports) for _ in range(args.runs)]
+        medians[name] = statistics.median(timings)
+        print(f"{name:<36} median {medians[name] * 1000:8.1f} ms  (min {min(timings) * 1000:.1f} ms)")
+
+    for module in ("file_extractor", "chat_service"):
+        saved = medians[f"{module} + parsers (eager)"] - medians[f"{module} (lazy)"]
+        print(f"{module}: deferring parser imports saves {saved * 1000:.1f} ms per worker start")
+
+
+if __name__ == "__main__":
+    main()
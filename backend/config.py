@@ -6,6 +6,7 @@ This module defines configuration classes for different environments
 """
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -29,6 +30,16 @@ class Config:
 
     # Redis configuration for storing tokens
     REDIS_TOKEN_URL = os.getenv('REDIS_TOKEN_URL')
+    # Shared Redis connection pools: connections per pool in each worker, seconds to wait
+    # for a free one, socket timeout in seconds, retries of a command after a connection
+    # error or timeout, seconds between health checks of idle connections, and commands
+    # sent per round trip by batched pipelines
+    REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+    REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', 5))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 5))
+    REDIS_RETRIES = int(os.getenv('REDIS_RETRIES', 3))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))
+    REDIS_PIPELINE_BATCH_SIZE = int(os.getenv('REDIS_PIPELINE_BATCH_SIZE', 500))
 
     # Pinecone configuration
     PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
@@ -38,6 +49,102 @@ class Config:
     # OpenAI configuration
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+    # Chat models ordered from cheapest to most capable, each optionally with its own
+    # timeout in seconds (e.g. "gpt-4o-mini:30,gpt-4o:60")
+    LLM_MODEL_CHAIN = os.getenv('LLM_MODEL_CHAIN', 'gpt-4o-mini,gpt-4o')
+    LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 60))
+    # Seconds a throttled or timed-out model is skipped for
+    LLM_FAILOVER_COOLDOWN = float(os.getenv('LLM_FAILOVER_COOLDOWN', 30))
+
+    # Hours that hourly model and embedding usage counters are kept in Redis
+    USAGE_RETENTION_HOURS = int(os.getenv('USAGE_RETENTION_HOURS', 24 * 7))
+    # Comma-separated IDs of users who may read usage of every endpoint and service metrics
+    METRICS_ADMIN_USER_IDS = frozenset(
+        user_id.strip() for user_id in os.getenv('METRICS_ADMIN_USER_IDS', '').split(',') if user_id.strip())
+
+    # PDF extraction limits: pages read per file, seconds per page, and when and how
+    # pages are spread over the parser workers
+    PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 2000))
+    PDF_PAGE_TIMEOUT = float(os.getenv('PDF_PAGE_TIMEOUT', 10))
+    PDF_PARALLEL_PAGE_THRESHOLD = int(os.getenv('PDF_PARALLEL_PAGE_THRESHOLD', 32))
+    PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', 16))
+
+    # Rows and cells of each spreadsheet sheet included in extracted text
+    SPREADSHEET_MAX_ROWS_PER_SHEET = int(os.getenv('SPREADSHEET_MAX_ROWS_PER_SHEET', 10000))
+    SPREADSHEET_MAX_CELLS_PER_SHEET = int(os.getenv('SPREADSHEET_MAX_CELLS_PER_SHEET', 200000))
+    # Cells of a spreadsheet or CSV row beyond this many columns are dropped
+    SPREADSHEET_MAX_COLUMNS = int(os.getenv('SPREADSHEET_MAX_COLUMNS', 256))
+
+    # Plain text and CSV files: leading KB sampled to detect the encoding, and the
+    # characters of decoded text yielded per part
+    TEXT_ENCODING_SAMPLE_KB = int(os.getenv('TEXT_ENCODING_SAMPLE_KB', 64))
+    TEXT_PART_CHARS = int(os.getenv('TEXT_PART_CHARS', 64 * 1024))
+
+    # Extraction budget per document: tokens, pages and UTF-8 bytes of text (0 for no limit).
+    # Extraction stops early once any is reached and the document is tagged as truncated
+    EXTRACTION_MAX_TOKENS = int(os.getenv('EXTRACTION_MAX_TOKENS', 400000))
+    EXTRACTION_MAX_PAGES = int(os.getenv('EXTRACTION_MAX_PAGES', 1000))
+    EXTRACTION_MAX_BYTES = int(os.getenv('EXTRACTION_MAX_BYTES', 8 * 1024 * 1024))
+
+    # Users whose authorised Drive clients each web worker keeps between requests
+    DRIVE_CLIENT_CACHE_SIZE = int(os.getenv('DRIVE_CLIENT_CACHE_SIZE', 256))
+
+    # Stored credentials each process keeps in memory: seconds an entry is served without
+    # reading Redis (0 disables the cache; changes are normally pushed by keyspace
+    # notifications sooner) and the number of users kept
+    CREDENTIAL_CACHE_TTL = float(os.getenv('CREDENTIAL_CACHE_TTL', 30))
+    CREDENTIAL_CACHE_SIZE = int(os.getenv('CREDENTIAL_CACHE_SIZE', 1024))
+
+    # Background OAuth token refresh: whether workers run it, seconds before expiry a
+    # token is refreshed, seconds between checks for tokens due a refresh, and seconds of
+    # inactivity after which a user's token is no longer refreshed (the session lifetime)
+    TOKEN_REFRESH_ENABLED = os.getenv('TOKEN_REFRESH_ENABLED', 'true').lower() == 'true'
+    TOKEN_REFRESH_MARGIN = int(os.getenv('TOKEN_REFRESH_MARGIN', 300))
+    TOKEN_REFRESH_INTERVAL = float(os.getenv('TOKEN_REFRESH_INTERVAL', 30))
+    TOKEN_REFRESH_IDLE_TIMEOUT = int(os.getenv('TOKEN_REFRESH_IDLE_TIMEOUT', 1800))
+
+    # Google API transport: hosts with kept-alive connection pools, idle connections kept
+    # per host (set to at least the worker's thread count), and seconds per request
+    GOOGLE_HTTP_POOL_CONNECTIONS = int(os.getenv('GOOGLE_HTTP_POOL_CONNECTIONS', 10))
+    GOOGLE_HTTP_POOL_MAXSIZE = int(os.getenv('GOOGLE_HTTP_POOL_MAXSIZE', 20))
+    GOOGLE_HTTP_TIMEOUT = float(os.getenv('GOOGLE_HTTP_TIMEOUT', 60))
+
+    # Drive downloads: size kept in memory before spilling to a temporary file, bytes
+    # requested per chunk, and the spill directory (the system temp directory if unset)
+    DOWNLOAD_SPOOL_THRESHOLD_MB = int(os.getenv('DOWNLOAD_SPOOL_THRESHOLD_MB', 32))
+    DOWNLOAD_CHUNK_SIZE_MB = int(os.getenv('DOWNLOAD_CHUNK_SIZE_MB', 8))
+    DOWNLOAD_TEMP_DIR = os.getenv('DOWNLOAD_TEMP_DIR') or None
+
+    # Sandboxed file parser workers: count, extra memory and CPU seconds per worker task,
+    # wall-clock seconds before a task is abandoned, and comma-separated modules each
+    # worker imports at start-up, such as ones registering extractor plugins
+    PARSER_WORKERS = int(os.getenv('PARSER_WORKERS', 2))
+    PARSER_MEMORY_LIMIT_MB = int(os.getenv('PARSER_MEMORY_LIMIT_MB', 1024))
+    PARSER_CPU_SECONDS = int(os.getenv('PARSER_CPU_SECONDS', 120))
+    PARSER_DEADLINE = float(os.getenv('PARSER_DEADLINE', 180))
+    PARSER_PRELOAD_MODULES = [name.strip() for name in os.getenv('PARSER_PRELOAD_MODULES', '').split(',') if name.strip()]
+
+    # Extracted text cache: 'redis' or 'disk' storage, the directory used for disk storage,
+    # and the maximum total size of the compressed entries
+    EXTRACTION_CACHE_BACKEND = os.getenv('EXTRACTION_CACHE_BACKEND', 'redis')
+    EXTRACTION_CACHE_DIR = os.getenv('EXTRACTION_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'extraction-cache'))
+    EXTRACTION_CACHE_MAX_MB = int(os.getenv('EXTRACTION_CACHE_MAX_MB', 512))
+
+    # Threads uploading files from the chat interface to Drive while their text is extracted
+    UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', 4))
+
+    # Seconds before a stale ingest lock expires
+    INGEST_LOCK_TIMEOUT = int(os.getenv('INGEST_LOCK_TIMEOUT', 300))
+
+    # Use document summaries as query context once this many documents are selected
+    # and their full text exceeds the token threshold
+    SUMMARY_CONTEXT_MIN_DOCUMENTS = int(os.getenv('SUMMARY_CONTEXT_MIN_DOCUMENTS', 3))
+    SUMMARY_CONTEXT_TOKEN_THRESHOLD = int(os.getenv('SUMMARY_CONTEXT_TOKEN_THRESHOLD', 12000))
+
+    # Token budget and relevance/diversity trade-off for packing document chunks into query context
+    CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', 24000))
+    MMR_RELEVANCE_WEIGHT = float(os.getenv('MMR_RELEVANCE_WEIGHT', 0.7))
+
     @classmethod
     def init_app(cls, app):
         """
@@ -20,8 +20,8 @@ from config import DevelopmentConfig, ProductionConfig
 import os
 from datetime import datetime, timedelta, timezone
 from app.services.database.db_service import init_db, get_db
+from app.utils.drive_utils import get_user_credentials, credential_cache, token_manager
 import json
-import redis
 
 def https_redirect():
     proto = request.headers.get('X-Forwarded-Proto', 'http')
@@ -49,8 +49,12 @@ def create_app():
     # Initialize database
     init_db(app)
 
-    # Initialize Redis client
-    redis_client = redis.StrictRedis.from_url(app.config['REDIS_TOKEN_URL'], decode_responses=True)
+    # Keep cached credentials in step with Redis through keyspace notifications
+    credential_cache.start()
+
+    # Refresh users' OAuth tokens in the background before they expire
+    if app.config['TOKEN_REFRESH_ENABLED']:
+        token_manager.start()
 
     # Register blueprints
     app.register_blueprint(auth_bp)
@@ -110,8 +114,9 @@ def create_app():
         It performs the following tasks:
         1. Sets the session to be permanent and updates its lifetime.
         2. Checks for user authentication by verifying the presence of user_id in the session.
-        3. Verifies the presence of user credentials in Redis.
-        4. Updates the last active timestamp for the current request.
+        3. Verifies the presence of user credentials, loading them once for the request.
+        4. Records the user's activity, so their token keeps being refreshed in the background.
+        5. Updates the last active timestamp for the current request.
         """
         session.permanent = True
         app.permanent_session_lifetime = timedelta(minutes=30)
@@ -119,8 +124,11 @@ def create_app():
  
         user_id = session.get('user_id')
         if user_id:
-            credentials_json = redis_client.get(f'user:{user_id}:token')
+            credentials_json = get_user_credentials(user_id)
             if credentials_json:
+                if app.config['TOKEN_REFRESH_ENABLED']:
+                    # Keep refreshing the token in the background while the user is active
+                    token_manager.touch(user_id)
                 if 'last_active' in session:
                     try:
                         last_active = datetime.fromisoformat(session['last_active'])
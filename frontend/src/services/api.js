@@ -481,6 +481,23 @@ export const uploadSelectedDocuments = async (selectedFiles) => {
   return response.json();
 };
 
+export const uploadAndIndexDocument = async (folderId, file) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  formData.append('folderId', folderId);
+
+  const response = await fetch(`${API_URL}/chat/upload-and-index`, {
+    method: 'POST',
+    credentials: 'include',
+    body: formData,
+  });
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new Error(errorData.error || 'Failed to upload and index document');
+  }
+  return response.json();
+};
+
 export const setDocumentsUnselected = async (documentIds) => {
   const response = await fetch(`${API_URL}/chat/set-documents-unselected`, {
     method: 'POST',
@@ -31,6 +31,7 @@ import {
     fetchUserInfo,
     updateDocumentSelection,
     uploadSelectedDocuments,
+    uploadAndIndexDocument,
   } from '../../services/api';
   
   // Mock fetch globally
@@ -559,6 +560,26 @@ import {
     expect(result).toEqual({ success: true });
   });
 
+  test('uploadAndIndexDocument makes a POST request with FormData to the chat endpoint', async () => {
+    fetch.mockResolvedValueOnce({
+      ok: true,
+      json: () => Promise.resolve({ id: 'file1', indexed: true }),
+    });
+
+    const file = new File(['Test content'], 'notes.txt', { type: 'text/plain' });
+    const result = await uploadAndIndexDocument('folder1', file);
+
+    expect(fetch).toHaveBeenCalledWith(
+      `${API_URL}/chat/upload-and-index`,
+      expect.objectContaining({
+        method: 'POST',
+        credentials: 'include',
+        body: expect.any(FormData),
+      })
+    );
+    expect(result).toEqual({ id: 'file1', indexed: true });
+  });
+
   test('fetchFolderDetails makes a GET request to the correct endpoint', async () => {
     fetch.mockResolvedValueOnce({
       ok: true,